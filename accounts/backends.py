@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from .cache import aget_cached_user, get_cached_user
+
+User = get_user_model()
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that resolves the session user through the user cache.
+
+    Authentication (password checks) still goes to the database; only the
+    per-request ``get_user`` lookup done by ``AuthenticationMiddleware`` is
+    served from cache, as is ``aget_user`` behind ``request.auser()``.
+    """
+
+    def get_user(self, user_id):
+        try:
+            user = get_cached_user(user_id, self._load_user)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    @staticmethod
+    def _load_user(user_id):
+        return User._default_manager.get(pk=user_id)
+
+    async def aget_user(self, user_id):
+        try:
+            user = await aget_cached_user(user_id, self._aload_user)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    @staticmethod
+    async def _aload_user(user_id):
+        return await User._default_manager.aget(pk=user_id)
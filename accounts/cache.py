@@ -0,0 +1,222 @@
+"""
+Cached user resolution.
+
+``AuthenticationMiddleware`` loads the logged-in ``CustomUser`` from the
+database on every request. The helpers here keep recently used users in a
+two-level cache instead:
+
+* a per-process LRU with a TTL holding ready-to-use instances, and
+* the shared Django cache (``USER_CACHE_ALIAS``; Redis when configured),
+  which also stores a version stamp per user.
+
+Only ``USER_CACHE_FIELDS`` and the session auth hash are cached, never the
+password hash; users are rebuilt from them with every other field
+deferred, so reading e.g. ``password`` loads it from the database.
+
+Entries are keyed by user id plus the current version stamp, and the stamp
+is bumped whenever the user is saved. That only keeps other processes from
+serving stale copies when ``USER_CACHE_ALIAS`` is shared between them, so
+the cache is bypassed unless ``USER_CACHE_ENABLED`` is set (the default
+when ``REDIS_URL`` is configured); with a per-process backend such as
+locmem, a password change or deactivation in one worker would otherwise go
+unseen by the others for up to ``USER_CACHE_TTL``. Writes that bypass
+``save()`` (e.g. ``QuerySet.update``) must call :func:`invalidate_user`
+themselves.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from finmate.perf import record_cache
+
+
+class LocalLRUCache:
+    """Thread-safe in-process LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local_users = LocalLRUCache(
+    maxsize=getattr(settings, 'USER_CACHE_LOCAL_SIZE', 1024),
+    ttl=getattr(settings, 'USER_CACHE_LOCAL_TTL', 30),
+)
+
+
+def _enabled():
+    return getattr(settings, 'USER_CACHE_ENABLED', False)
+
+
+def _shared_cache():
+    return caches[getattr(settings, 'USER_CACHE_ALIAS', 'default')]
+
+
+def _version_key(user_id):
+    return f'accounts:user-version:{user_id}'
+
+
+def _user_key(user_id, version):
+    return f'accounts:user:{user_id}:{version}'
+
+
+def get_user_version(user_id):
+    """Return the current version stamp for a user, creating one if missing."""
+    cache = _shared_cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # Seed with a timestamp rather than 1 so a stamp evicted from the
+        # shared cache can never collide with an older local entry.
+        cache.add(_version_key(user_id), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def invalidate_user(user_id):
+    """Bump a user's version stamp so every cached copy becomes unreachable."""
+    cache = _shared_cache()
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), time.time_ns(), timeout=None)
+
+
+def schedule_invalidation(user_id, using=None):
+    """
+    Invalidate a user now and again once the surrounding transaction
+    commits, so a reader cannot re-cache the pre-commit row.
+    """
+    invalidate_user(user_id)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: invalidate_user(user_id), using=using)
+
+
+# What authentication, permission checks and templates read from request.user.
+USER_CACHE_FIELDS = frozenset({
+    'id', 'email', 'username', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser',
+    'onboarding_completed', 'last_login',
+})
+
+
+def cached_fields(user):
+    """The cached form of ``user``: its USER_CACHE_FIELDS and session auth hash."""
+    return {
+        'db': user._state.db,
+        'fields': {name: getattr(user, name) for name in USER_CACHE_FIELDS},
+        'session_auth_hash': user.get_session_auth_hash(),
+    }
+
+
+def restore_user(data):
+    """Rebuild a user from :func:`cached_fields`, other fields deferred."""
+    User = get_user_model()
+    fields = data['fields']
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in fields]
+    user = User.from_db(data['db'], names, [fields[name] for name in names])
+    user._session_auth_hash = data['session_auth_hash']
+    return user
+
+
+def get_cached_user(user_id, loader):
+    """
+    Return a private copy of the user with ``user_id``.
+
+    ``loader(user_id)`` is called on a miss and must return the user or raise
+    ``DoesNotExist``. Callers get a copy so per-request mutations never leak
+    into the cache. Without a shared cache every call goes to ``loader``.
+    """
+    if not _enabled():
+        return loader(user_id)
+    key = _user_key(user_id, get_user_version(user_id))
+    user = _local_users.get(key)
+    if user is not None:
+        return _hand_out(key, user, 'local')
+    shared = _shared_cache()
+    data = shared.get(key)
+    if data is not None:
+        return _hand_out(key, restore_user(data), 'shared')
+    data = cached_fields(loader(user_id))
+    shared.set(key, data, timeout=getattr(settings, 'USER_CACHE_TTL', 300))
+    return _hand_out(key, restore_user(data), 'loader')
+
+
+def _hand_out(key, user, source):
+    """
+    Count a lookup answered from ``source`` ('local', 'shared' or 'loader'),
+    keep users not already held locally in the process LRU, and return the
+    caller's private copy.
+    """
+    if source == 'loader':
+        record_cache(misses=1)
+    else:
+        record_cache(hits=1)
+    if source != 'local':
+        _local_users.set(key, user)
+    return copy.copy(user)
+
+
+def clear_local_cache():
+    """Drop every entry from this process's user cache."""
+    _local_users.clear()
+
+
+async def aget_user_version(user_id):
+    """:func:`get_user_version` for async code."""
+    cache = _shared_cache()
+    version = await cache.aget(_version_key(user_id))
+    if version is None:
+        await cache.aadd(_version_key(user_id), time.time_ns(), timeout=None)
+        version = await cache.aget(_version_key(user_id))
+    return version
+
+
+async def aget_cached_user(user_id, loader):
+    """:func:`get_cached_user` for async code; ``loader`` is a coroutine function."""
+    if not _enabled():
+        return await loader(user_id)
+    key = _user_key(user_id, await aget_user_version(user_id))
+    user = _local_users.get(key)
+    if user is not None:
+        return _hand_out(key, user, 'local')
+    shared = _shared_cache()
+    data = await shared.aget(key)
+    if data is not None:
+        return _hand_out(key, restore_user(data), 'shared')
+    data = cached_fields(await loader(user_id))
+    await shared.aset(key, data, timeout=getattr(settings, 'USER_CACHE_TTL', 300))
+    return _hand_out(key, restore_user(data), 'loader')
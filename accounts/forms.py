@@ -15,7 +15,7 @@ class SignUpForm(UserCreationForm):
 
     def clean_email(self):
         email = self.cleaned_data.get('email')
-        if User.objects.filter(email__iexact=email).exists():
+        if User.objects.for_email(email).exists():
             raise forms.ValidationError('A user with that email already exists.')
         return email
 
@@ -0,0 +1,14 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class Argon2idPasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id at the OWASP minimum (19 MiB, 2 passes, 1 lane).
+
+    Django's defaults use 100 MiB and 8 lanes per hash, which is costly when
+    a pool of workers hashes concurrently. Hashes made with other
+    parameters are re-hashed on login.
+    """
+    time_cost = 2
+    memory_cost = 19 * 1024
+    parallelism = 1
@@ -0,0 +1,166 @@
+"""
+Pluggable password hashing.
+
+``CustomUser.set_password``/``check_password`` go through the service named
+by ``PASSWORD_HASHING_SERVICE``:
+
+* :class:`InlineHashingService` hashes in the calling thread (Django's
+  behaviour);
+* :class:`ProcessPoolHashingService` runs hashing in a bounded pool of
+  worker processes, so a threaded WSGI worker keeps serving other requests
+  while one waits for its hash, and hashing is spread over every core.
+
+Both report whether a verified password should be re-hashed (its hasher is
+not the preferred one, or its work factor changed); the user model then
+re-hashes it on login, moving old PBKDF2 hashes to the configured hasher.
+"""
+import asyncio
+import multiprocessing
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    UNUSABLE_PASSWORD_PREFIX, UNUSABLE_PASSWORD_SUFFIX_LENGTH,
+    get_hasher, identify_hasher, is_password_usable, make_password,
+)
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+def verify_password(raw_password, encoded):
+    """Return ``(is_correct, must_update)`` for a raw password and stored hash."""
+    if raw_password is None or not is_password_usable(encoded):
+        return False, False
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+    preferred = get_hasher('default')
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    is_correct = hasher.verify(raw_password, encoded)
+    if not is_correct and not hasher_changed and must_update:
+        # Keep failed checks as slow as successful ones (see Django's check_password).
+        hasher.harden_runtime(raw_password, encoded)
+    return is_correct, is_correct and must_update
+
+
+class InlineHashingService:
+    """Hash and verify in the calling thread."""
+
+    def make_password(self, raw_password):
+        return make_password(raw_password)
+
+    def verify_password(self, raw_password, encoded):
+        return verify_password(raw_password, encoded)
+
+    def make_passwords(self, raw_passwords):
+        """Hash many passwords (``None`` gives an unusable password)."""
+        return _make_passwords(raw_passwords)
+
+    async def amake_password(self, raw_password):
+        return await asyncio.to_thread(self.make_password, raw_password)
+
+    async def averify_password(self, raw_password, encoded):
+        return await asyncio.to_thread(self.verify_password, raw_password, encoded)
+
+    def close(self):
+        pass
+
+
+def unusable_password():
+    """Same format as ``make_password(None)``, without per-character random.choice."""
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_hex(UNUSABLE_PASSWORD_SUFFIX_LENGTH // 2)
+
+
+def _make_passwords(raw_passwords):
+    return [unusable_password() if raw is None else make_password(raw) for raw in raw_passwords]
+
+
+def _init_worker(password_hashers):
+    # Workers are spawned, not forked, and only need the parent's hashers.
+    # Settings may already be configured if the parent's __main__ set them
+    # up on import; the parent's list still wins.
+    if settings.configured:
+        settings.PASSWORD_HASHERS = password_hashers
+    else:
+        settings.configure(PASSWORD_HASHERS=password_hashers)
+
+
+class ProcessPoolHashingService(InlineHashingService):
+    """
+    Hash and verify in a pool of ``workers`` processes.
+
+    At most ``max_pending`` hashes are queued at once; further callers wait
+    for a slot, which bounds memory and latency during bursts. The pool is
+    started on first use with the current ``PASSWORD_HASHERS``.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or getattr(settings, 'PASSWORD_HASHING_WORKERS', 0) or multiprocessing.cpu_count()
+        self._slots = threading.BoundedSemaphore(max_pending or self.workers * 4)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(list(settings.PASSWORD_HASHERS),),
+                )
+            return self._pool
+
+    def _run(self, func, *args):
+        with self._slots:
+            return self._executor().submit(func, *args).result()
+
+    def make_password(self, raw_password):
+        if raw_password is None:
+            return unusable_password()
+        return self._run(make_password, raw_password)
+
+    def verify_password(self, raw_password, encoded):
+        if raw_password is None or not is_password_usable(encoded):
+            return False, False
+        return self._run(verify_password, raw_password, encoded)
+
+    def make_passwords(self, raw_passwords, chunk_size=64):
+        """Hash many passwords across all workers, preserving order."""
+        encoded = [unusable_password() if raw is None else None for raw in raw_passwords]
+        pending = [i for i, raw in enumerate(raw_passwords) if raw is not None]
+        chunks = [
+            [raw_passwords[i] for i in pending[start:start + chunk_size]]
+            for start in range(0, len(pending), chunk_size)
+        ]
+        hashed = (value for chunk in self._executor().map(_make_passwords, chunks) for value in chunk)
+        for i, value in zip(pending, hashed):
+            encoded[i] = value
+        return encoded
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+@lru_cache(maxsize=None)
+def get_hashing_service():
+    """Return the configured hashing service (one per process)."""
+    path = getattr(settings, 'PASSWORD_HASHING_SERVICE', 'accounts.hashing.InlineHashingService')
+    return import_string(path)()
+
+
+@receiver(setting_changed)
+def reset_hashing_service(*, setting, **kwargs):
+    if setting in ('PASSWORD_HASHING_SERVICE', 'PASSWORD_HASHING_WORKERS', 'PASSWORD_HASHERS'):
+        if get_hashing_service.cache_info().currsize:
+            get_hashing_service().close()
+        get_hashing_service.cache_clear()
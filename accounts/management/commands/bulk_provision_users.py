@@ -0,0 +1,39 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from accounts.provisioning import RosterFormatError, UserProvisioner
+from transactions.parsers import StatementFormatError
+
+
+class Command(BaseCommand):
+    help = "Create users (and optional survey profiles) in bulk from a CSV or XLSX roster."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Roster file (.csv or .xlsx) with an email column.')
+        parser.add_argument('--format', choices=('csv', 'xlsx'), help='Override the type detected from the extension.')
+        parser.add_argument('--batch-size', type=int, default=1_000, help='Users hashed and inserted per batch (default: 1000).')
+        parser.add_argument('--chunk-size', type=int, default=10_000, help='Rows read per chunk (default: 10000).')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Password hashing processes (default: CPU count).',
+        )
+
+    def handle(self, *args, **options):
+        provisioner = UserProvisioner(
+            batch_size=options['batch_size'],
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+        )
+        try:
+            stats = provisioner.provision_file(options['path'], file_type=options['format'])
+        except (OSError, StatementFormatError, RosterFormatError) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Provisioned {stats.users_created} users ({stats.profiles_created} profiles, '
+            f'{stats.goals_created} goals) from {stats.rows_read} rows '
+            f'({stats.rows_skipped} skipped, {stats.rows_existing} already registered) '
+            f'in {stats.elapsed:.1f}s, {stats.users_per_second:,.0f} users/sec.'
+        ))
@@ -1,11 +1,35 @@
 from django.contrib.auth.models import AbstractUser, UserManager as DefaultUserManager
 from django.db import models
+from django.db.models.functions import Lower
 from django.core.validators import MinValueValidator
+from .cache import schedule_invalidation
+from .hashing import get_hashing_service
 
 
-class CustomUserManager(DefaultUserManager):
+class CustomUserQuerySet(models.QuerySet):
+
+    def for_email(self, email):
+        """
+        Case-insensitive email match.
+
+        Compares ``LOWER(email)`` so the lookup can use the functional
+        unique index; ``email__iexact`` compiles to LIKE/UPPER() and scans
+        the table instead.
+        """
+        return self.alias(email_lower=Lower('email')).filter(email_lower=email.lower())
+
+    def for_emails(self, emails):
+        """Case-insensitive ``email IN (...)`` on the same index."""
+        return self.alias(email_lower=Lower('email')).filter(email_lower__in=[email.lower() for email in emails])
+
+
+class CustomUserManager(DefaultUserManager.from_queryset(CustomUserQuerySet)):
     """Custom user manager for email-based authentication."""
-    
+
+    def get_by_natural_key(self, email):
+        """Look users up by email regardless of case (used by authentication)."""
+        return self.for_email(email).get()
+
     def create_user(self, email, password=None, **extra_fields):
         """Create and save a regular user with email as username."""
         if not email:
@@ -65,10 +89,83 @@ class CustomUser(AbstractUser):
     class Meta:
         verbose_name = "User"
         verbose_name_plural = "Users"
+        constraints = [
+            models.UniqueConstraint(Lower('email'), name='unique_customuser_email_lower'),
+        ]
 
     def __str__(self):
         return f"{self.get_full_name() or self.email}"
 
+    # Set on users rebuilt from the user cache, which holds no password hash.
+    _session_auth_hash = None
+
+    def get_session_auth_hash(self):
+        if self._session_auth_hash is not None:
+            return self._session_auth_hash
+        return super().get_session_auth_hash()
+
+    def set_password(self, raw_password):
+        """Hash through the configured hashing service."""
+        self.password = get_hashing_service().make_password(raw_password)
+        self._password = raw_password
+        self._session_auth_hash = None
+
+    def check_password(self, raw_password):
+        """
+        Verify through the hashing service, re-hashing with the preferred
+        hasher when the stored hash is outdated.
+        """
+        is_correct, must_update = get_hashing_service().verify_password(raw_password, self.password)
+        if must_update:
+            self._rehash(raw_password)
+        return is_correct
+
+    async def acheck_password(self, raw_password):
+        is_correct, must_update = await get_hashing_service().averify_password(raw_password, self.password)
+        if must_update:
+            self.password = await get_hashing_service().amake_password(raw_password)
+            self._password = None
+            await self.asave(update_fields=['password'])
+        return is_correct
+
+    def _rehash(self, raw_password):
+        self.set_password(raw_password)
+        self._password = None
+        self.save(update_fields=['password'])
+
+    def save(self, *args, **kwargs):
+        """Save the user and bump its cache version stamp."""
+        super().save(*args, **kwargs)
+        schedule_invalidation(self.pk, using=kwargs.get('using'))
+
+    def delete(self, *args, **kwargs):
+        """Delete the user and drop any cached copies."""
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        schedule_invalidation(user_id, using=kwargs.get('using'))
+        return result
+
+
+class UserProfileManager(models.Manager):
+
+    def upsert(self, user, **values):
+        """
+        Insert or update ``user``'s profile in one statement.
+
+        Compiles to ``INSERT ... ON CONFLICT (user_id) DO UPDATE``, so there
+        is no read first and no race between concurrent submissions. Like
+        ``bulk_create`` it sends no model signals. Returns the profile
+        written (its pk is set only where bulk inserts return ids).
+        """
+        profile = self.model(user=user, **values)
+        self.bulk_create(
+            [profile],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=[*values, 'updated_at'],
+        )
+        return profile
+
 
 class UserProfile(models.Model):
     """
@@ -110,6 +207,8 @@ class UserProfile(models.Model):
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = UserProfileManager()
     
     class Meta:
         verbose_name = "User Profile"
@@ -1,5 +1,20 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from django.core.cache import cache
 from django.test import TestCase, override_settings
-from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import CaptureQueriesContext
+from django.db import IntegrityError, connection, transaction
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
+from accounts.backends import CachedModelBackend
+from accounts.cache import clear_local_cache, get_user_version
+from accounts.hashing import ProcessPoolHashingService, get_hashing_service
+from accounts.models import UserProfile
+from accounts.provisioning import UserProvisioner
 from accounts.forms import SignUpForm, LoginForm
 
 User = get_user_model()
@@ -24,6 +39,40 @@ class CustomUserModelTests(TestCase):
         self.assertEqual(str(user), 'john@example.com')
 
 
+class CaseInsensitiveEmailTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='Test@example.com', password='testpass123')
+
+    def test_email_unique_ignoring_case(self):
+        """Test the lower(email) constraint rejects a case variant."""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user(email='test@example.com', password='testpass123')
+
+    def test_signup_rejects_case_variant(self):
+        """Test signup validation matches emails regardless of case."""
+        form = SignUpForm(data={
+            'email': 'TEST@EXAMPLE.COM',
+            'password1': 'SecurePass123!',
+            'password2': 'SecurePass123!',
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('email', form.errors)
+
+    def test_authenticate_ignores_case(self):
+        """Test login finds the user whatever case the email is typed in."""
+        self.assertEqual(authenticate(username='test@EXAMPLE.com', password='testpass123'), self.user)
+
+    def test_email_lookup_uses_index(self):
+        """Test the signup/login email query is planned on the lower(email) index."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # A near-empty table is cheaper to scan; make the planner show the index.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = User.objects.for_email('test@example.com').explain()
+        self.assertIn('unique_customuser_email_lower', plan)
+        self.assertNotIn('SCAN accounts_customuser', plan)
+
+
 class SignUpFormTests(TestCase):
     def test_signup_form_valid(self):
         """Test valid signup form."""
@@ -204,6 +253,43 @@ class SurveyViewTests(TestCase):
         self.user.refresh_from_db()
         self.assertTrue(self.user.onboarding_completed)
 
+    def test_survey_get_creates_no_profile(self):
+        """Test GET renders the survey without creating a profile row."""
+        self.client.login(username='test@example.com', password='testpass123')
+        response = self.client.get('/accounts/survey/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(UserProfile.objects.filter(user=self.user).exists())
+
+    def test_survey_post_updates_existing_profile(self):
+        """Test POST overwrites a profile that already exists."""
+        UserProfile.objects.create(user=self.user, monthly_income=1000, goals_and_wants='Bike: 100 by Jan 2026')
+        self.client.login(username='test@example.com', password='testpass123')
+        self.client.post('/accounts/survey/', data={
+            'monthly_income': '50000',
+            'necessary_needs': '30000',
+            'goals_and_wants': 'Car: 500000 by Dec 2026',
+            'monthly_unwanted_limit': '5000',
+        })
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(profile.monthly_income, Decimal('50000'))
+        self.assertEqual(profile.goals_and_wants, 'Car: 500000 by Dec 2026')
+        self.assertEqual(list(self.user.goals.values_list('name', flat=True)), ['Car'])
+
+    def test_survey_post_query_count(self):
+        """Test the submission stays at a fixed number of queries."""
+        self.client.login(username='test@example.com', password='testpass123')
+        data = {
+            'monthly_income': '50000',
+            'necessary_needs': '30000',
+            'goals_and_wants': 'Car: 500000 by Dec 2026, Vacation: 100000 by Jul 2026',
+            'monthly_unwanted_limit': '5000',
+        }
+        # Session and user load, then in one transaction (a savepoint under
+        # TestCase): profile upsert, survey goal lookup and insert, user update.
+        with self.assertNumQueries(8):
+            response = self.client.post('/accounts/survey/', data=data)
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+
     def test_survey_view_skip_if_onboarded(self):
         """Test that survey redirects to dashboard if already onboarded."""
         self.user.onboarding_completed = True
@@ -212,3 +298,193 @@ class SurveyViewTests(TestCase):
         response = self.client.get('/accounts/survey/')
         # Redirect to dashboard (root path)
         self.assertRedirects(response, '/')
+
+
+@override_settings(USER_CACHE_ENABLED=True)
+class CachedUserResolutionTests(TestCase):
+    def setUp(self):
+        """Create and log in a test user."""
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.login(username='test@example.com', password='testpass123')
+
+    def user_queries(self, path):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(path)
+        return response, [q['sql'] for q in ctx.captured_queries if 'accounts_customuser' in q['sql']]
+
+    def test_hot_request_skips_user_query(self):
+        """Test a warm dashboard request does not load the user from the DB."""
+        self.client.get('/')
+        response, queries = self.user_queries('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_backend_returns_private_copy(self):
+        """Test mutating a resolved user does not leak into the cache."""
+        backend = CachedModelBackend()
+        first = backend.get_user(self.user.pk)
+        first.onboarding_completed = True
+        self.assertFalse(backend.get_user(self.user.pk).onboarding_completed)
+
+    def test_shared_cache_holds_no_password_hash(self):
+        """Test only the listed fields are cached and the password is loaded on access."""
+        clear_local_cache()
+        user = CachedModelBackend().get_user(self.user.pk)
+        key = f'accounts:user:{self.user.pk}:{get_user_version(self.user.pk)}'
+        cached = cache.get(key)
+        self.assertNotIn('password', cached['fields'])
+        self.assertNotIn(self.user.password, repr(cached))
+        self.assertEqual(user.get_session_auth_hash(), self.user.get_session_auth_hash())
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('testpass123'))
+
+    def test_password_change_on_cached_user(self):
+        """Test a cached user's session hash follows a password change."""
+        user = CachedModelBackend().get_user(self.user.pk)
+        user.set_password('N3w-pass-phrase')
+        user.save()
+        fresh = User.objects.get(pk=self.user.pk)
+        self.assertTrue(fresh.check_password('N3w-pass-phrase'))
+        self.assertEqual(user.get_session_auth_hash(), fresh.get_session_auth_hash())
+        self.assertNotEqual(user.get_session_auth_hash(), self.user.get_session_auth_hash())
+
+    def test_save_invalidates_cached_user(self):
+        """Test CustomUser.save() bumps the version so the new row is seen."""
+        backend = CachedModelBackend()
+        self.assertFalse(backend.get_user(self.user.pk).onboarding_completed)
+        self.user.onboarding_completed = True
+        self.user.save()
+        self.assertTrue(backend.get_user(self.user.pk).onboarding_completed)
+
+    def test_survey_flip_is_visible_on_next_request(self):
+        """Test completing the survey is not hidden by a stale cached user."""
+        response = self.client.get('/accounts/survey/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/accounts/survey/', data={
+            'monthly_income': '50000',
+            'necessary_needs': '30000',
+            'goals_and_wants': '',
+            'monthly_unwanted_limit': '5000',
+        })
+        self.assertRedirects(response, '/')
+        response = self.client.get('/accounts/survey/')
+        self.assertRedirects(response, '/')
+
+    def test_admin_flip_back_is_visible(self):
+        """Test resetting onboarding elsewhere sends the user back to the survey."""
+        self.user.onboarding_completed = True
+        self.user.save()
+        self.assertRedirects(self.client.get('/accounts/survey/'), '/')
+        self.user.onboarding_completed = False
+        self.user.save()
+        self.assertEqual(self.client.get('/accounts/survey/').status_code, 200)
+
+    def test_deleted_user_is_not_resolved(self):
+        """Test a deleted user is no longer served from cache."""
+        backend = CachedModelBackend()
+        user_id = self.user.pk
+        backend.get_user(user_id)
+        self.user.delete()
+        self.assertIsNone(backend.get_user(user_id))
+
+    @override_settings(USER_CACHE_ENABLED=False)
+    def test_disabled_without_shared_cache(self):
+        """Test every lookup hits the DB when no shared cache is configured."""
+        backend = CachedModelBackend()
+        backend.get_user(self.user.pk)
+        with self.assertNumQueries(1):
+            backend.get_user(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(backend.get_user(self.user.pk))
+
+
+class PasswordHashingServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='placeholder')
+        self.user.password = make_password('testpass123', hasher='pbkdf2_sha256')
+        self.user.save()
+
+    def test_login_rehashes_legacy_hash(self):
+        """Test a PBKDF2 hash is replaced by the preferred hasher on login."""
+        self.assertEqual(authenticate(username='test@example.com', password='testpass123'), self.user)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith(get_hasher('default').algorithm + '$'))
+        self.assertTrue(self.user.check_password('testpass123'))
+
+    def test_failed_login_keeps_hash(self):
+        """Test a wrong password does not trigger a re-hash."""
+        old = self.user.password
+        self.assertIsNone(authenticate(username='test@example.com', password='wrong'))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, old)
+
+    async def test_async_check_rehashes(self):
+        """Test the async check verifies and upgrades the hash too."""
+        self.assertTrue(await self.user.acheck_password('testpass123'))
+        self.assertFalse(self.user.password.startswith('pbkdf2_sha256$'))
+
+    @override_settings(
+        PASSWORD_HASHING_SERVICE='accounts.hashing.ProcessPoolHashingService',
+        PASSWORD_HASHING_WORKERS=1,
+    )
+    def test_process_pool_service(self):
+        """Test hashing and verification through the worker pool."""
+        service = get_hashing_service()
+        self.assertIsInstance(service, ProcessPoolHashingService)
+        user = User.objects.create_user(email='pool@example.com', password='SecurePass123!')
+        self.assertTrue(user.check_password('SecurePass123!'))
+        self.assertFalse(user.check_password('nope'))
+        self.assertTrue(self.user.check_password('testpass123'))
+        self.assertFalse(self.user.password.startswith('pbkdf2_sha256$'))
+
+
+class BulkProvisioningTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(email='Taken@student.edu', password='testpass123')
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_csv(self, content):
+        path = os.path.join(self.tmpdir.name, 'roster.csv')
+        with open(path, 'w') as handle:
+            handle.write(content)
+        return path
+
+    def test_provision_users_and_profiles(self):
+        """Test users, profiles and survey goals are created in bulk."""
+        path = self.write_csv(
+            'Email,Password,First Name,Monthly Income,Necessary Needs,Goals and Wants\n'
+            'asha@student.edu,SecurePass123!,Asha,"50,000",30000,"Laptop: 80000 by Dec 2026"\n'
+            'ravi@student.edu,,Ravi,,,\n'
+            'taken@STUDENT.edu,x,,,,\n'
+            'ASHA@student.edu,x,,,,\n'
+            'not-an-email,x,,,,\n'
+        )
+        out = StringIO()
+        call_command('bulk_provision_users', path, workers=1, batch_size=2, stdout=out)
+        self.assertIn('Provisioned 2 users (1 profiles, 1 goals) from 5 rows (2 skipped, 1 already registered)',
+                      out.getvalue())
+
+        asha = User.objects.get(email='asha@student.edu')
+        self.assertTrue(asha.check_password('SecurePass123!'))
+        self.assertTrue(asha.onboarding_completed)
+        self.assertEqual(asha.first_name, 'Asha')
+        self.assertEqual(asha.profile.monthly_income, Decimal('50000.00'))
+        self.assertEqual(asha.goals.get().target_amount, Decimal('80000.00'))
+
+        ravi = User.objects.get(email='ravi@student.edu')
+        self.assertFalse(ravi.has_usable_password())
+        self.assertFalse(ravi.onboarding_completed)
+        self.assertFalse(UserProfile.objects.filter(user=ravi).exists())
+
+    def test_missing_email_column(self):
+        """Test a roster without emails is rejected."""
+        with self.assertRaises(CommandError):
+            call_command('bulk_provision_users', self.write_csv('Name\nAsha\n'), workers=1, stdout=StringIO())
+
+    def test_process_pool_hashing(self):
+        """Test passwords hashed in worker processes verify normally."""
+        path = self.write_csv('email,password\n' + ''.join(f'u{i}@student.edu,pw-{i}-Secure!\n' for i in range(6)))
+        stats = UserProvisioner(batch_size=4, workers=2).provision_file(path)
+        self.assertEqual(stats.users_created, 6)
+        self.assertTrue(User.objects.get(email='u5@student.edu').check_password('pw-5-Secure!'))
@@ -3,7 +3,9 @@ from django.contrib.auth import login
 from django.contrib.auth.views import LoginView as DjangoLoginView, LogoutView as DjangoLogoutView
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.views.decorators.http import require_http_methods
+from goals.models import Goal
 from .forms import SignUpForm, FinancialSurveyForm
 from .models import UserProfile
 
@@ -51,19 +53,23 @@ def survey_view(request):
 	if request.user.onboarding_completed:
 		return redirect('dashboard:home')
 
-	# Get or create user profile
-	profile, created = UserProfile.objects.get_or_create(user=request.user)
-
 	if request.method == 'POST':
-		form = FinancialSurveyForm(request.POST, instance=profile)
+		# Validated against a fresh instance: the upsert below overwrites
+		# every survey field, so the stored profile never has to be read.
+		form = FinancialSurveyForm(request.POST, instance=UserProfile(user=request.user))
 		if form.is_valid():
-			profile = form.save()
-			# Mark onboarding as completed
-			request.user.onboarding_completed = True
-			request.user.save()
+			with transaction.atomic():
+				UserProfile.objects.upsert(request.user, **form.cleaned_data)
+				# Store parsed goals as rows so nothing has to re-parse the text
+				Goal.objects.replace_from_text(request.user, form.cleaned_data['goals_and_wants'])
+				# Mark onboarding as completed
+				request.user.onboarding_completed = True
+				request.user.save(update_fields=['onboarding_completed', 'updated_at'])
 			messages.success(request, 'Financial profile completed! Welcome to FinMate.')
 			return redirect('dashboard:home')
 	else:
+		# Prefill from an existing profile without creating one on GET
+		profile = UserProfile.objects.filter(user=request.user).first()
 		form = FinancialSurveyForm(instance=profile)
 
 	return render(request, 'accounts/survey.html', {'form': form})
@@ -1,3 +1,38 @@
 from django.contrib import admin
+from .models import AnomalyBaseline, FinancialHealthScore, HealthScoreRun, TransactionAnomaly
 
-# Register your models here.
+
+@admin.register(TransactionAnomaly)
+class TransactionAnomalyAdmin(admin.ModelAdmin):
+	model = TransactionAnomaly
+	list_display = ('transaction', 'user', 'anomaly_type', 'score', 'expected_amount', 'is_dismissed', 'detected_at')
+	list_filter = ('anomaly_type', 'is_dismissed')
+	search_fields = ('user__email',)
+	raw_id_fields = ('user', 'transaction')
+
+
+@admin.register(AnomalyBaseline)
+class AnomalyBaselineAdmin(admin.ModelAdmin):
+	model = AnomalyBaseline
+	list_display = ('user', 'scope', 'key', 'count', 'mean', 'updated_at')
+	list_filter = ('scope',)
+	search_fields = ('user__email', 'key')
+	raw_id_fields = ('user',)
+
+
+@admin.register(FinancialHealthScore)
+class FinancialHealthScoreAdmin(admin.ModelAdmin):
+	model = FinancialHealthScore
+	list_display = ('user', 'scored_on', 'score', 'savings_health', 'debt_health', 'investment_health', 'goal_progress')
+	list_filter = ('scored_on',)
+	search_fields = ('user__email',)
+	raw_id_fields = ('user',)
+
+
+@admin.register(HealthScoreRun)
+class HealthScoreRunAdmin(admin.ModelAdmin):
+	model = HealthScoreRun
+	list_display = (
+		'scored_on', 'partition_size', 'last_user_id', 'partitions', 'users', 'started_at', 'finished_at', 'abandoned',
+	)
+	list_filter = ('abandoned',)
@@ -0,0 +1,225 @@
+"""
+Batch anomaly detection over transactions.
+
+A batch of users' expenses is loaded once into columns and scored without
+per-row Python:
+
+* ``unusual_amount``: the amount's robust z-score against the trailing
+  ``window`` expenses at the same merchant (falling back to the same
+  category when the merchant has too little history), using the median and
+  the median absolute deviation (MAD) of that window;
+* ``new_merchant``: the first expense at a merchant once the user has
+  ``min_history`` earlier expenses.
+
+Trailing windows are built as an ``(n, window)`` matrix over rows sorted by
+group and date, masked where a row belongs to another group, and reduced
+by sorting each row; memory is ``n * window`` floats per batch, so batches
+are sized in users. :func:`detect_anomalies` spreads batches over a process
+pool; workers only read and score, the parent does all writes.
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from django.db import connections
+from transactions.fingerprints import merchant_keys
+from transactions.models import Transaction
+from .models import TransactionAnomaly
+
+# 0.6745 is the 75th percentile of the standard normal, so MAD / 0.6745
+# estimates the standard deviation for normally distributed amounts.
+MAD_SCALE = 0.6745
+LOAD_FIELDS = ('id', 'user_id', 'transaction_date', 'amount', 'merchant', 'description', 'category_id')
+
+
+@dataclass(frozen=True)
+class AnomalyConfig:
+    window: int = 20
+    min_history: int = 5
+    threshold: float = 3.5
+    # Floors on the spread (MAD or standard deviation) so a perfectly
+    # regular merchant (a fixed subscription) still flags a changed amount
+    # without dividing by zero.
+    min_spread_fraction: float = 0.05
+    min_spread: float = 1.0
+
+
+@dataclass
+class DetectionStats:
+    users: int = 0
+    transactions: int = 0
+    anomalies: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def transactions_per_second(self):
+        return self.transactions / self.elapsed if self.elapsed else 0.0
+
+
+def frame_from_queryset(queryset):
+    """Load ``queryset``'s LOAD_FIELDS as columns with merchant keys."""
+    rows = queryset.values_list(*LOAD_FIELDS)
+    frame = pd.DataFrame.from_records(rows.iterator(chunk_size=20_000), columns=LOAD_FIELDS)
+    frame['amount'] = frame['amount'].astype(float)
+    frame['merchant'] = merchant_keys(frame['merchant'].astype(str), frame['description'].astype(str))
+    return frame.drop(columns='description')
+
+
+def load_frame(user_ids):
+    """Load the expenses of ``user_ids`` as columns sorted by user, date and id."""
+    return frame_from_queryset(
+        Transaction.objects
+        .filter(user_id__in=user_ids, transaction_type='expense')
+        .order_by('user_id', 'transaction_date', 'pk')
+    )
+
+
+def _row_medians(matrix, count):
+    """Median of the first ``count`` non-NaN values of each row (NaN if none)."""
+    ordered = np.sort(matrix, axis=1)  # NaNs sort last
+    rows = np.arange(len(matrix))
+    low = np.maximum(count - 1, 0) // 2
+    high = np.maximum(count, 1) // 2
+    high = np.where(count % 2 == 1, low, high)
+    median = (ordered[rows, low] + ordered[rows, high]) / 2
+    return np.where(count > 0, median, np.nan)
+
+
+def trailing_stats(values, groups, window):
+    """
+    Median, MAD and count of the previous ``window`` values in each row's group.
+
+    ``values`` and ``groups`` must be sorted so each group's rows are
+    contiguous and in time order.
+    """
+    n = len(values)
+    positions = np.arange(n)[:, None] + np.arange(window)[None, :]
+    padded_values = np.concatenate([np.full(window, np.nan), values])[positions]
+    padded_groups = np.concatenate([np.full(window, -1), groups])[positions]
+    padded_values[padded_groups != groups[:, None]] = np.nan
+    count = window - np.isnan(padded_values).sum(axis=1)
+    # Sorting each row and indexing by count is much faster than nanmedian.
+    median = _row_medians(padded_values, count)
+    mad = _row_medians(np.abs(padded_values - median[:, None]), count)
+    return median, mad, count
+
+
+def _robust_z(frame, keys, config):
+    codes = frame.groupby(keys, sort=False).ngroup().to_numpy()
+    # Stable, so each group keeps the frame's date order.
+    order = np.argsort(codes, kind='stable')
+    values = frame['amount'].to_numpy()[order]
+    median, mad, count = trailing_stats(values, codes[order], config.window)
+    mad = np.maximum(mad, np.maximum(config.min_spread_fraction * np.abs(median), config.min_spread))
+    z, expected, history = np.empty(len(frame)), np.empty(len(frame)), np.empty(len(frame), dtype=int)
+    z[order] = MAD_SCALE * (values - median) / mad
+    expected[order] = median
+    history[order] = count
+    return z, expected, history
+
+
+def score_frame(frame, config=AnomalyConfig()):
+    """
+    Score a frame from :func:`load_frame` (sorted by user, date, id).
+
+    Returns a frame of anomalies with transaction_id, user_id,
+    anomaly_type, score and expected_amount.
+    """
+    columns = ['transaction_id', 'user_id', 'anomaly_type', 'score', 'expected_amount']
+    if frame.empty:
+        return pd.DataFrame(columns=columns)
+    frame = frame.reset_index(drop=True)
+    by_merchant = _robust_z(frame, ['user_id', 'merchant'], config)
+    with_category = frame.assign(category_id=frame['category_id'].fillna(-1).astype('int64'))
+    by_category = _robust_z(with_category, ['user_id', 'category_id'], config)
+
+    use_merchant = by_merchant[2] >= config.min_history
+    z = np.where(use_merchant, by_merchant[0], by_category[0])
+    expected = np.where(use_merchant, by_merchant[1], by_category[1])
+    history = np.where(use_merchant, by_merchant[2], by_category[2])
+    unusual = (history >= config.min_history) & (z > config.threshold)
+
+    user_history = frame.groupby('user_id', sort=False).cumcount().to_numpy()
+    first_visit = ~frame.duplicated(['user_id', 'merchant']).to_numpy()
+    new_merchant = first_visit & (user_history >= config.min_history)
+
+    found = []
+    for anomaly_type, mask, scores, baseline in (
+        (TransactionAnomaly.UNUSUAL_AMOUNT, unusual, z, expected),
+        (TransactionAnomaly.NEW_MERCHANT, new_merchant, np.zeros(len(frame)), np.full(len(frame), np.nan)),
+    ):
+        found.append(pd.DataFrame({
+            'transaction_id': frame['id'].to_numpy()[mask],
+            'user_id': frame['user_id'].to_numpy()[mask],
+            'anomaly_type': anomaly_type,
+            'score': scores[mask],
+            'expected_amount': baseline[mask],
+        }))
+    return pd.concat(found, ignore_index=True)[columns]
+
+
+def score_users(user_ids, config=AnomalyConfig()):
+    """Load and score one batch of users; returns ``(rows_scored, anomalies)``."""
+    frame = load_frame(user_ids)
+    return len(frame), score_frame(frame, config)
+
+
+def write_anomalies(anomalies, batch_size=2_000):
+    """Bulk-insert scored anomalies; re-detected ones are ignored. Returns rows passed."""
+    objs = [
+        TransactionAnomaly(
+            transaction_id=int(transaction_id),
+            user_id=int(user_id),
+            anomaly_type=anomaly_type,
+            score=round(float(score), 3),
+            expected_amount=None if np.isnan(expected) else round(float(expected), 2),
+        )
+        for transaction_id, user_id, anomaly_type, score, expected
+        in anomalies.itertuples(index=False, name=None)
+    ]
+    TransactionAnomaly.objects.bulk_create(objs, batch_size=batch_size, ignore_conflicts=True)
+    return len(objs)
+
+
+def user_batches(user_ids, batch_size):
+    user_ids = list(user_ids)
+    return [user_ids[start:start + batch_size] for start in range(0, len(user_ids), batch_size)]
+
+
+def _init_worker():
+    # Never share the parent's database connections across processes.
+    connections.close_all()
+
+
+def detect_anomalies(user_ids, workers=1, batch_size=1_000, config=AnomalyConfig()):
+    """
+    Score ``user_ids`` in batches and store the anomalies found.
+
+    With ``workers > 1`` batches are scored in a forked process pool while
+    the parent writes results as they arrive.
+    """
+    stats = DetectionStats()
+    started = time.perf_counter()
+    batches = user_batches(user_ids, batch_size)
+
+    def record(batch, result):
+        scored, anomalies = result
+        stats.users += len(batch)
+        stats.transactions += scored
+        stats.anomalies += write_anomalies(anomalies)
+
+    if workers > 1 and len(batches) > 1:
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as pool:
+            for batch, result in zip(batches, pool.map(score_users, batches, [config] * len(batches))):
+                record(batch, result)
+    else:
+        for batch in batches:
+            record(batch, score_users(batch, config))
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
@@ -0,0 +1,283 @@
+"""
+Financial health scores.
+
+Every user with a survey profile gets a score from 0 to 100 per day, the
+weighted sum of four sub-scores that are also 0-100:
+
+* savings: the share of income kept over the last ``months`` full months,
+  from the monthly rollups (the profile's income stands in when no income
+  was recorded, and its planned surplus when nothing was), with full marks
+  at ``target_savings_rate``;
+* debt: what is still owed on active debt-payoff goals against a year's
+  income, reaching zero at ``max_debt_to_income``;
+* investment: the balance of investment and retirement goals in months of
+  income, with full marks at ``target_invested_months``;
+* goal progress: amount saved over amount targeted across active goals.
+
+Users are split into partitions of consecutive ids. A partition is read
+with three range queries (profiles, rollups and goals) and scored as
+arrays. :func:`compute_health_scores` spreads partitions over a process
+pool; workers only read and score, and the parent upserts each partition's
+scores in order, recording its progress in a HealthScoreRun in the same
+transaction, so an interrupted run resumes after the last partition written
+if it is restarted the same day.
+"""
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import FloatField, Max, Min, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+from accounts.models import UserProfile
+from dashboard.models import MonthlyBudget
+from finmate.workers import database_names, setup_worker
+from goals.models import Goal
+from goals.projections import add_months
+from .models import FinancialHealthScore, HealthScoreRun
+
+WEIGHTS = {'savings_health': 0.35, 'debt_health': 0.25, 'investment_health': 0.20, 'goal_progress': 0.20}
+INVESTMENT_CATEGORIES = ('investment', 'retirement')
+SCORE_COLUMNS = ['user_id', 'score', 'savings_health', 'debt_health', 'investment_health', 'goal_progress', 'categories']
+
+
+@dataclass(frozen=True)
+class HealthConfig:
+    months: int = 3
+    target_savings_rate: float = 0.20
+    max_debt_to_income: float = 0.5
+    target_invested_months: float = 6.0
+
+
+@dataclass
+class HealthStats:
+    users: int = 0
+    partitions: int = 0
+    resumed_after: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def users_per_second(self):
+        return self.users / self.elapsed if self.elapsed else 0.0
+
+
+def _as_float(field):
+    return Coalesce(Cast(field, FloatField()), Value(0.0))
+
+
+def id_partitions(first, last, size):
+    """``(first, last)`` id ranges of ``size`` ids covering ``first..last``."""
+    return [(start, min(start + size - 1, last)) for start in range(first, last + 1, size)]
+
+
+def load_partition(first, last, scored_on, config=HealthConfig()):
+    """Profiles, rollups of the scoring window and active goals of users ``first..last``."""
+    in_range = {'user_id__gte': first, 'user_id__lte': last}
+    window_end = scored_on.replace(day=1)
+    profiles = pd.DataFrame.from_records(
+        UserProfile.objects.filter(**in_range).order_by('user_id')
+        .annotate(income=_as_float('monthly_income'), needs=_as_float('necessary_needs'),
+                  limit=_as_float('monthly_unwanted_limit'))
+        .values_list('user_id', 'income', 'needs', 'limit'),
+        columns=['user_id', 'income', 'needs', 'limit'],
+    )
+    budgets = pd.DataFrame.from_records(
+        MonthlyBudget.objects.filter(month__gte=add_months(window_end, -config.months), month__lt=window_end, **in_range)
+        .annotate(spent=_as_float('spent_amount'), earned=_as_float('income_amount'),
+                  budget=Cast('budget_amount', FloatField()))
+        .values_list('user_id', 'category__name', 'spent', 'earned', 'budget'),
+        columns=['user_id', 'category', 'spent', 'earned', 'budget'],
+    )
+    goals = pd.DataFrame.from_records(
+        Goal.objects.filter(status='active', **in_range)
+        .annotate(target=_as_float('target_amount'), current=_as_float('current_amount'))
+        .values_list('user_id', 'category', 'target', 'current'),
+        columns=['user_id', 'category', 'target', 'current'],
+    )
+    return profiles, budgets, goals
+
+
+def _percent(values):
+    return np.rint(np.clip(values, 0.0, 1.0) * 100).astype(np.int64)
+
+
+def category_scores(budgets):
+    """
+    ``{user_id: {category: score}}`` for budgeted categories: 100 within
+    budget, falling to 0 at twice the budget.
+    """
+    budgeted = budgets[budgets['budget'] > 0]
+    if budgeted.empty:
+        return {}
+    totals = (
+        budgeted.assign(category=budgeted['category'].fillna('Uncategorised'))
+        .groupby(['user_id', 'category'], sort=False)[['spent', 'budget']].sum()
+    )
+    scores = _percent(2.0 - totals['spent'].to_numpy() / totals['budget'].to_numpy())
+    found = {}
+    for (user_id, category), score in zip(totals.index, scores.tolist()):
+        found.setdefault(user_id, {})[category] = score
+    return found
+
+
+def score_frames(profiles, budgets, goals, config=HealthConfig()):
+    """Scores for the users in ``profiles`` from :func:`load_partition`'s frames."""
+    profiles = profiles.sort_values('user_id')
+    users = profiles['user_id'].to_numpy(np.int64)
+    count = len(users)
+    if not count:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+    budgets = budgets[budgets['user_id'].isin(users)]
+    goals = goals[goals['user_id'].isin(users)]
+    income = profiles['income'].to_numpy(float)
+    planned = income - profiles['needs'].to_numpy(float) - profiles['limit'].to_numpy(float)
+
+    def totals(frame, weights):
+        return np.bincount(np.searchsorted(users, frame['user_id'].to_numpy(np.int64)),
+                           weights=weights, minlength=count)
+
+    spent = totals(budgets, budgets['spent'].to_numpy(float))
+    earned = totals(budgets, budgets['earned'].to_numpy(float))
+    basis = np.where(earned > 0, earned, income * config.months)
+    kept = np.where((earned > 0) | (spent > 0), basis - spent, planned * config.months)
+    savings_rate = np.divide(kept, basis, out=np.zeros(count), where=basis > 0)
+
+    target = goals['target'].to_numpy(float)
+    current = goals['current'].to_numpy(float)
+    category = goals['category'].to_numpy(object)
+    owed = totals(goals, np.where(category == 'debt_payoff', np.maximum(target - current, 0.0), 0.0))
+    invested = totals(goals, np.where(np.isin(category, INVESTMENT_CATEGORIES), current, 0.0))
+    saved = totals(goals, current)
+    targeted = totals(goals, target)
+    debt_ratio = np.divide(owed, 12 * income, out=np.where(owed > 0, np.inf, 0.0), where=income > 0)
+    invested_months = np.divide(invested, income, out=np.zeros(count), where=income > 0)
+
+    scores = pd.DataFrame({
+        'user_id': users,
+        'savings_health': _percent(savings_rate / config.target_savings_rate),
+        'debt_health': _percent(1.0 - debt_ratio / config.max_debt_to_income),
+        'investment_health': _percent(invested_months / config.target_invested_months),
+        'goal_progress': _percent(np.divide(saved, targeted, out=np.zeros(count), where=targeted > 0)),
+    })
+    scores['score'] = np.rint(sum(scores[name] * weight for name, weight in WEIGHTS.items())).astype(np.int64)
+    by_user = category_scores(budgets)
+    scores['categories'] = [by_user.get(user_id, {}) for user_id in users.tolist()]
+    return scores[SCORE_COLUMNS]
+
+
+def score_partition(partition, scored_on, config=HealthConfig()):
+    """Load and score one ``(first, last, user_ids)`` partition (``user_ids`` None for all)."""
+    first, last, user_ids = partition
+    profiles, budgets, goals = load_partition(first, last, scored_on, config)
+    if user_ids is not None:
+        profiles = profiles[profiles['user_id'].isin(user_ids)]
+    return score_frames(profiles, budgets, goals, config)
+
+
+def write_scores(scores, scored_on, batch_size=2_000):
+    """Upsert a day's scores on (user, scored_on). Returns the number written."""
+    objs = [
+        FinancialHealthScore(
+            user_id=int(user_id),
+            scored_on=scored_on,
+            score=int(score),
+            savings_health=int(savings),
+            debt_health=int(debt),
+            investment_health=int(investment),
+            goal_progress=int(progress),
+            categories=categories,
+        )
+        for user_id, score, savings, debt, investment, progress, categories
+        in scores.itertuples(index=False, name=None)
+    ]
+    FinancialHealthScore.objects.bulk_create(
+        objs,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['user', 'scored_on'],
+        update_fields=[name for name in SCORE_COLUMNS if name != 'user_id'] + ['generated_at'],
+    )
+    return len(objs)
+
+
+def compute_health_scores(user_ids=None, workers=1, partition_size=5_000, resume=True,
+                          config=HealthConfig(), scored_on=None):
+    """
+    Score every user with a profile for ``scored_on`` (default today),
+    partition by partition, as one HealthScoreRun; with ``resume`` an
+    unfinished run for the same day and partition size is continued after
+    its last written partition instead. Any other unfinished run is closed
+    as abandoned.
+
+    Given ``user_ids``, only those users are scored, in partitions of
+    ``partition_size`` users, without recording a run.
+    """
+    stats = HealthStats()
+    started = time.perf_counter()
+    run = None
+    scored_on = scored_on or timezone.localdate()
+    if user_ids is not None:
+        user_ids = sorted(user_ids)
+        partitions = [
+            (chunk[0], chunk[-1], chunk)
+            for chunk in (user_ids[start:start + partition_size] for start in range(0, len(user_ids), partition_size))
+        ]
+    else:
+        unfinished = HealthScoreRun.objects.filter(finished_at__isnull=True)
+        if resume:
+            run = (
+                unfinished.filter(scored_on=scored_on, partition_size=partition_size)
+                .order_by('-started_at').first()
+            )
+        if run is None:
+            run = HealthScoreRun.objects.create(scored_on=scored_on, partition_size=partition_size)
+        # A run for another day, or one restarted over, is never resumed.
+        unfinished.exclude(pk=run.pk).update(finished_at=timezone.now(), abandoned=True)
+        stats.resumed_after = run.last_user_id
+        bounds = UserProfile.objects.aggregate(first=Min('user_id'), last=Max('user_id'))
+        partitions = []
+        if bounds['last'] is not None:
+            first = max(bounds['first'], run.last_user_id + 1)
+            partitions = [(start, end, None) for start, end in id_partitions(first, bounds['last'], partition_size)]
+
+    def record(partition, scores):
+        with transaction.atomic():
+            written = write_scores(scores, scored_on)
+            if run is not None:
+                run.last_user_id = partition[1]
+                run.partitions += 1
+                run.users += written
+                run.save(update_fields=['last_user_id', 'partitions', 'users'])
+        stats.users += written
+        stats.partitions += 1
+
+    if workers > 1 and len(partitions) > 1:
+        # Spawned rather than forked: no inherited connections or threads.
+        # At most two partitions per worker are in flight, so scored frames
+        # waiting to be written never pile up in the parent.
+        context = multiprocessing.get_context('spawn')
+        pending = deque()
+        with ProcessPoolExecutor(
+            workers, mp_context=context, initializer=setup_worker, initargs=(database_names(),),
+        ) as pool:
+            for partition in partitions:
+                if len(pending) >= 2 * workers:
+                    done, future = pending.popleft()
+                    record(done, future.result())
+                pending.append((partition, pool.submit(score_partition, partition, scored_on, config)))
+            for partition, future in pending:
+                record(partition, future.result())
+    else:
+        for partition in partitions:
+            record(partition, score_partition(partition, scored_on, config))
+
+    if run is not None:
+        run.finished_at = timezone.now()
+        run.save(update_fields=['finished_at'])
+    stats.elapsed = time.perf_counter() - started
+    return stats
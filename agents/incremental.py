@@ -0,0 +1,232 @@
+"""
+Incremental anomaly scoring for newly imported transactions.
+
+Instead of re-reading a user's history, each (user, merchant) and (user,
+category) keeps running count/mean/M2 in ``AnomalyBaseline``. A new batch
+is scored in O(batch):
+
+* rows are compared with the persisted statistics merged with the batch
+  rows before them in the same group (Chan et al.'s parallel update), so
+  the result matches scoring the rows one at a time;
+* the z-score is ``(amount - mean) / std``, with the same spread floors,
+  threshold and merchant-to-category fallback as the batch engine;
+* the baselines are then advanced by the whole batch in one bulk write.
+
+Baselines only see transactions passed to :func:`score_transactions`
+(statement imports); after edits, deletes or when enabling this on
+existing data, run ``check_anomaly_baselines --fix`` to rebuild them.
+"""
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from transactions.models import Transaction
+from .anomalies import AnomalyConfig, frame_from_queryset, write_anomalies
+from .models import AnomalyBaseline, TransactionAnomaly
+
+STAT_COLUMNS = ['count', 'mean', 'm2']
+
+
+def category_keys(category_id):
+    """Baseline keys for category ids; '' for uncategorised."""
+    return category_id.map(lambda value: '' if pd.isna(value) else str(int(value))).astype(object)
+
+
+def merge_stats(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    """Combine two sets of (count, mean, M2) element-wise."""
+    n = n_a + n_b
+    safe_n = np.where(n > 0, n, 1)
+    delta = mean_b - mean_a
+    mean = np.where(n > 0, mean_a + delta * n_b / safe_n, 0.0)
+    m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / safe_n
+    return n, mean, m2
+
+
+def group_stats(amounts, keys):
+    """Exact (count, mean, M2) per key of ``amounts``, as a frame indexed by key."""
+    grouped = amounts.groupby(keys.to_numpy(), sort=False)
+    stats = grouped.agg(['count', 'mean'])
+    stats['m2'] = grouped.var(ddof=0) * stats['count']
+    return stats
+
+
+def _prior_stats(amounts, keys, persisted):
+    """Per row: statistics of everything before it in its group (persisted + earlier batch rows)."""
+    x = amounts.to_numpy()
+    grouped = pd.Series(x).groupby(keys.to_numpy(), sort=False)
+    k = grouped.cumcount().to_numpy()
+    before_sum = grouped.cumsum().to_numpy() - x
+    before_sq = pd.Series(x * x).groupby(keys.to_numpy(), sort=False).cumsum().to_numpy() - x * x
+    safe_k = np.where(k > 0, k, 1)
+    mean_k = np.where(k > 0, before_sum / safe_k, 0.0)
+    m2_k = np.maximum(np.where(k > 0, before_sq - before_sum ** 2 / safe_k, 0.0), 0.0)
+
+    base = persisted.reindex(keys.to_numpy()).fillna(0)
+    return merge_stats(
+        base['count'].to_numpy(), base['mean'].to_numpy(), base['m2'].to_numpy(), k, mean_k, m2_k,
+    )
+
+
+def _z_scores(amounts, stats, config):
+    n, mean, m2 = stats
+    std = np.sqrt(np.where(n > 1, m2 / np.where(n > 1, n - 1, 1), 0.0))
+    spread = np.maximum(std, np.maximum(config.min_spread_fraction * np.abs(mean), config.min_spread))
+    return (amounts.to_numpy() - mean) / spread
+
+
+def _persisted(baselines, scope):
+    rows = [(b.key, b.count, b.mean, b.m2) for b in baselines if b.scope == scope]
+    return pd.DataFrame(rows, columns=['key'] + STAT_COLUMNS).set_index('key').astype(float)
+
+
+def score_transactions(user_id, frame, config=AnomalyConfig()):
+    """
+    Score a user's new expenses and advance their baselines.
+
+    ``frame`` is in the :func:`agents.anomalies.frame_from_queryset` format,
+    ordered by date and id. Returns the anomalies found (also written).
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=['transaction_id', 'user_id', 'anomaly_type', 'score', 'expected_amount'])
+    frame = frame.reset_index(drop=True)
+    amounts = frame['amount']
+    keys = {
+        AnomalyBaseline.SCOPE_MERCHANT: frame['merchant'].astype(object),
+        AnomalyBaseline.SCOPE_CATEGORY: category_keys(frame['category_id']),
+    }
+
+    with transaction.atomic():
+        baselines = list(
+            AnomalyBaseline.objects.select_for_update().filter(user_id=user_id).filter(
+                Q(scope=AnomalyBaseline.SCOPE_CATEGORY)
+                | Q(scope=AnomalyBaseline.SCOPE_MERCHANT, key__in=list(keys[AnomalyBaseline.SCOPE_MERCHANT].unique()))
+            )
+        )
+        persisted = {scope: _persisted(baselines, scope) for scope in keys}
+        prior = {scope: _prior_stats(amounts, keys[scope], persisted[scope]) for scope in keys}
+
+        merchant, category = prior[AnomalyBaseline.SCOPE_MERCHANT], prior[AnomalyBaseline.SCOPE_CATEGORY]
+        use_merchant = merchant[0] >= config.min_history
+        z = np.where(use_merchant, _z_scores(amounts, merchant, config), _z_scores(amounts, category, config))
+        expected = np.where(use_merchant, merchant[1], category[1])
+        history = np.where(use_merchant, merchant[0], category[0])
+        unusual = (history >= config.min_history) & (z > config.threshold)
+
+        user_history = persisted[AnomalyBaseline.SCOPE_CATEGORY]['count'].sum() + np.arange(len(frame))
+        new_merchant = (merchant[0] == 0) & (user_history >= config.min_history)
+
+        anomalies = pd.concat([
+            pd.DataFrame({
+                'transaction_id': frame['id'][mask].to_numpy(),
+                'user_id': user_id,
+                'anomaly_type': anomaly_type,
+                'score': scores[mask],
+                'expected_amount': baseline[mask],
+            })
+            for anomaly_type, mask, scores, baseline in (
+                (TransactionAnomaly.UNUSUAL_AMOUNT, unusual, z, expected),
+                (TransactionAnomaly.NEW_MERCHANT, new_merchant, np.zeros(len(frame)), np.full(len(frame), np.nan)),
+            )
+        ], ignore_index=True)
+        write_anomalies(anomalies)
+        _advance_baselines(user_id, baselines, persisted, amounts, keys)
+    return anomalies
+
+
+def _advance_baselines(user_id, baselines, persisted, amounts, keys):
+    now = timezone.now()
+    existing = {(b.scope, b.key): b for b in baselines}
+    updated, created = [], []
+    for scope, scope_keys in keys.items():
+        batch = group_stats(amounts, scope_keys)
+        base = persisted[scope].reindex(batch.index).fillna(0)
+        n, mean, m2 = merge_stats(
+            base['count'].to_numpy(), base['mean'].to_numpy(), base['m2'].to_numpy(),
+            batch['count'].to_numpy(), batch['mean'].to_numpy(), batch['m2'].to_numpy(),
+        )
+        for key, count, key_mean, key_m2 in zip(batch.index, n, mean, m2):
+            baseline = existing.get((scope, key))
+            if baseline is None:
+                created.append(AnomalyBaseline(
+                    user_id=user_id, scope=scope, key=key, count=int(count), mean=float(key_mean), m2=float(key_m2),
+                ))
+            else:
+                baseline.count, baseline.mean, baseline.m2 = int(count), float(key_mean), float(key_m2)
+                baseline.updated_at = now
+                updated.append(baseline)
+    AnomalyBaseline.objects.bulk_update(updated, ['count', 'mean', 'm2', 'updated_at'], batch_size=1000)
+    AnomalyBaseline.objects.bulk_create(created, batch_size=1000)
+
+
+def score_imported(user_id, fingerprints, batch_size=2_000, config=AnomalyConfig()):
+    """Score the expenses just inserted by a statement import, looked up by fingerprint."""
+    frames = [
+        frame_from_queryset(
+            Transaction.objects
+            .filter(user_id=user_id, transaction_type='expense', fingerprint__in=fingerprints[start:start + batch_size])
+        )
+        for start in range(0, len(fingerprints), batch_size)
+    ]
+    if not frames:
+        return score_transactions(user_id, pd.DataFrame(), config)
+    frame = pd.concat(frames, ignore_index=True).sort_values(['transaction_date', 'id'], kind='stable')
+    return score_transactions(user_id, frame, config)
+
+
+def baseline_frame(frame):
+    """
+    Full-history statistics for a :func:`agents.anomalies.load_frame` frame.
+
+    Returns one row per (user_id, scope, key) with count, mean and m2.
+    """
+    parts = []
+    for scope, scope_keys in (
+        (AnomalyBaseline.SCOPE_MERCHANT, frame['merchant'].astype(object)),
+        (AnomalyBaseline.SCOPE_CATEGORY, category_keys(frame['category_id'])),
+    ):
+        grouped = frame['amount'].groupby([frame['user_id'], scope_keys.rename('key')], sort=False)
+        stats = grouped.agg(['count', 'mean'])
+        stats['m2'] = grouped.var(ddof=0) * stats['count']
+        parts.append(stats.reset_index().assign(scope=scope))
+    columns = ['user_id', 'scope', 'key'] + STAT_COLUMNS
+    if not parts or frame.empty:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)[columns]
+
+
+def rebuild_baselines(user_ids, frame):
+    """Replace the baselines of ``user_ids`` with statistics recomputed from ``frame``."""
+    expected = baseline_frame(frame)
+    with transaction.atomic():
+        AnomalyBaseline.objects.filter(user_id__in=user_ids).delete()
+        AnomalyBaseline.objects.bulk_create([
+            AnomalyBaseline(user_id=int(user_id), scope=scope, key=key, count=int(count), mean=mean, m2=m2)
+            for user_id, scope, key, count, mean, m2 in expected.itertuples(index=False, name=None)
+        ], batch_size=1000)
+    return len(expected)
+
+
+def compare_baselines(user_ids, frame, tolerance=1e-6):
+    """
+    Compare stored baselines of ``user_ids`` with a full recompute from ``frame``.
+
+    Returns a frame of mismatched (user_id, scope, key) rows with the stored
+    and expected statistics; a missing side shows as NaN.
+    """
+    expected = baseline_frame(frame)
+    stored = pd.DataFrame.from_records(
+        AnomalyBaseline.objects.filter(user_id__in=user_ids).values_list('user_id', 'scope', 'key', *STAT_COLUMNS),
+        columns=['user_id', 'scope', 'key'] + STAT_COLUMNS,
+    )
+    index = ['user_id', 'scope', 'key']
+    joined = stored.astype({'user_id': 'int64'}).set_index(index).join(
+        expected.astype({'user_id': 'int64'}).set_index(index), how='outer', lsuffix='_stored', rsuffix='_expected',
+    )
+    mismatch = np.zeros(len(joined), dtype=bool)
+    for column in STAT_COLUMNS:
+        stored_values = joined[f'{column}_stored'].astype(float).to_numpy()
+        expected_values = joined[f'{column}_expected'].astype(float).to_numpy()
+        close = np.isclose(stored_values, expected_values, rtol=tolerance, atol=tolerance * 100)
+        mismatch |= ~close
+    return joined[mismatch].reset_index()
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from agents.anomalies import load_frame, user_batches
+from agents.incremental import compare_baselines, rebuild_baselines
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the incremental anomaly baselines with a full recompute from "
+        "transactions; --fix rebuilds the users that differ."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only check this user (email).')
+        parser.add_argument('--batch-size', type=int, default=1_000, help='Users per batch (default: 1000).')
+        parser.add_argument('--tolerance', type=float, default=1e-6, help='Relative tolerance (default: 1e-6).')
+        parser.add_argument('--fix', action='store_true', help='Rebuild baselines of users that differ.')
+
+    def handle(self, *args, batch_size, tolerance, fix, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.for_email(options['user'])
+            if not users.exists():
+                raise CommandError(f"No user with email '{options['user']}'")
+
+        total_users = mismatched = rebuilt = 0
+        for batch in user_batches(users.values_list('pk', flat=True), batch_size):
+            frame = load_frame(batch)
+            differences = compare_baselines(batch, frame, tolerance=tolerance)
+            total_users += len(batch)
+            mismatched += len(differences)
+            for row in differences.head(5).itertuples(index=False):
+                self.stdout.write(
+                    f'  user {row.user_id} {row.scope}:{row.key!r} '
+                    f'stored n={row.count_stored} mean={row.mean_stored} '
+                    f'expected n={row.count_expected} mean={row.mean_expected}'
+                )
+            if fix and not differences.empty:
+                stale = sorted(set(differences['user_id'].astype(int)))
+                rebuild_baselines(stale, frame[frame['user_id'].isin(stale)])
+                rebuilt += len(stale)
+
+        summary = f'Checked {total_users} users: {mismatched} baselines differ from a full recompute'
+        if fix:
+            self.stdout.write(self.style.SUCCESS(f'{summary}; rebuilt {rebuilt} users.'))
+        elif mismatched:
+            raise CommandError(f'{summary}. Run with --fix to rebuild them.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{summary}.'))
@@ -0,0 +1,65 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from agents.health import HealthConfig, compute_health_scores
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Compute a day's financial health scores for every user with a profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only score this user (email).')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Scoring processes (default: CPU count).',
+        )
+        parser.add_argument(
+            '--partition-size',
+            type=int,
+            default=5_000,
+            help='User ids per partition (default: 5000).',
+        )
+        parser.add_argument('--date', help='Day the scores are for, YYYY-MM-DD (default: today).')
+        parser.add_argument('--months', type=int, default=3, help='Full months of spending scored (default: 3).')
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Start a new run instead of resuming an unfinished one.',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['user']:
+            user_ids = list(User.objects.for_email(options['user']).values_list('pk', flat=True))
+            if not user_ids:
+                raise CommandError(f"No user with email '{options['user']}'")
+
+        scored_on = None
+        if options['date']:
+            try:
+                scored_on = parse_date(options['date'])
+            except ValueError:
+                pass
+            if scored_on is None:
+                raise CommandError(f"Invalid date '{options['date']}', expected YYYY-MM-DD")
+
+        stats = compute_health_scores(
+            user_ids,
+            workers=options['workers'],
+            partition_size=options['partition_size'],
+            resume=not options['restart'],
+            config=HealthConfig(months=options['months']),
+            scored_on=scored_on,
+        )
+        if stats.resumed_after:
+            self.stdout.write(f'Resumed after user id {stats.resumed_after}.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Scored {stats.users} users in {stats.partitions} partitions in {stats.elapsed:.1f}s, '
+            f'{stats.users_per_second:,.0f} users/sec.'
+        ))
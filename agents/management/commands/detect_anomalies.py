@@ -0,0 +1,42 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from agents.anomalies import AnomalyConfig, detect_anomalies
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Score users' expenses for unusual amounts and new merchants."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only score this user (email).')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Scoring processes (default: CPU count).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1_000, help='Users per batch (default: 1000).')
+        parser.add_argument('--window', type=int, default=20, help='Trailing transactions per merchant (default: 20).')
+        parser.add_argument('--threshold', type=float, default=3.5, help='Robust z-score cut-off (default: 3.5).')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.for_email(options['user'])
+            if not users.exists():
+                raise CommandError(f"No user with email '{options['user']}'")
+
+        stats = detect_anomalies(
+            users.values_list('pk', flat=True),
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            config=AnomalyConfig(window=options['window'], threshold=options['threshold']),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Scored {stats.transactions} transactions for {stats.users} users, '
+            f'{stats.anomalies} anomalies in {stats.elapsed:.1f}s, '
+            f'{stats.transactions_per_second:,.0f} transactions/sec.'
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-17 21:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('transactions', '0004_transaction_category'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anomaly_type', models.CharField(choices=[('unusual_amount', 'Unusual Amount'), ('new_merchant', 'New Merchant')], max_length=20)),
+                ('score', models.FloatField(default=0)),
+                ('expected_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('is_dismissed', models.BooleanField(default=False)),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomalies', to='transactions.transaction')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomalies', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Transaction Anomaly',
+                'verbose_name_plural': 'Transaction Anomalies',
+                'ordering': ['-detected_at'],
+                'indexes': [models.Index(fields=['user', 'is_dismissed', 'detected_at'], name='agents_tran_user_id_92943b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('transaction', 'anomaly_type'), name='unique_anomaly_per_transaction')],
+            },
+        ),
+    ]
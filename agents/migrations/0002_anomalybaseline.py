@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-17 22:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnomalyBaseline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('merchant', 'Merchant'), ('category', 'Category')], max_length=10)),
+                ('key', models.CharField(help_text="Merchant key, or category id ('' for uncategorised)", max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('mean', models.FloatField(default=0)),
+                ('m2', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomaly_baselines', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Anomaly Baseline',
+                'verbose_name_plural': 'Anomaly Baselines',
+                'constraints': [models.UniqueConstraint(fields=('user', 'scope', 'key'), name='unique_anomaly_baseline')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-17 23:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0002_anomalybaseline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthScoreRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scored_on', models.DateField()),
+                ('partition_size', models.PositiveIntegerField()),
+                ('last_user_id', models.PositiveBigIntegerField(default=0)),
+                ('partitions', models.PositiveIntegerField(default=0)),
+                ('users', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Health Score Run',
+                'verbose_name_plural': 'Health Score Runs',
+                'get_latest_by': 'started_at',
+            },
+        ),
+        migrations.CreateModel(
+            name='FinancialHealthScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scored_on', models.DateField()),
+                ('score', models.PositiveSmallIntegerField(default=0)),
+                ('categories', models.JSONField(blank=True, default=dict)),
+                ('savings_health', models.PositiveSmallIntegerField(default=0)),
+                ('debt_health', models.PositiveSmallIntegerField(default=0)),
+                ('investment_health', models.PositiveSmallIntegerField(default=0)),
+                ('goal_progress', models.PositiveSmallIntegerField(default=0)),
+                ('generated_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='health_scores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Financial Health Score',
+                'verbose_name_plural': 'Financial Health Scores',
+                'ordering': ['-scored_on'],
+                'get_latest_by': 'scored_on',
+                'constraints': [models.UniqueConstraint(fields=('user', 'scored_on'), name='unique_health_score_per_day')],
+            },
+        ),
+    ]
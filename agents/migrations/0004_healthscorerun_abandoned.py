@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0003_health_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='healthscorerun',
+            name='abandoned',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,3 +1,135 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class TransactionAnomaly(models.Model):
+    """
+    A transaction flagged by the anomaly engine (see ``agents.anomalies``).
+
+    ``score`` is the robust z-score for unusual amounts and ``expected_amount``
+    the trailing median it was compared with.
+    """
+    UNUSUAL_AMOUNT = 'unusual_amount'
+    NEW_MERCHANT = 'new_merchant'
+    ANOMALY_TYPES = (
+        (UNUSUAL_AMOUNT, 'Unusual Amount'),
+        (NEW_MERCHANT, 'New Merchant'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='anomalies')
+    transaction = models.ForeignKey(
+        'transactions.Transaction',
+        on_delete=models.CASCADE,
+        related_name='anomalies'
+    )
+    anomaly_type = models.CharField(max_length=20, choices=ANOMALY_TYPES)
+    score = models.FloatField(default=0)
+    expected_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    is_dismissed = models.BooleanField(default=False)
+    detected_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Transaction Anomaly"
+        verbose_name_plural = "Transaction Anomalies"
+        ordering = ['-detected_at']
+        constraints = [
+            models.UniqueConstraint(fields=['transaction', 'anomaly_type'], name='unique_anomaly_per_transaction'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'is_dismissed', 'detected_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_anomaly_type_display()}: {self.transaction_id}"
+
+
+class AnomalyBaseline(models.Model):
+    """
+    Running statistics of a user's expense amounts at one merchant or in one
+    category, kept with Welford's method (count, mean and M2, the sum of
+    squared deviations) so new transactions are scored without re-reading
+    history. See ``agents.incremental``.
+    """
+    SCOPE_MERCHANT = 'merchant'
+    SCOPE_CATEGORY = 'category'
+    SCOPES = (
+        (SCOPE_MERCHANT, 'Merchant'),
+        (SCOPE_CATEGORY, 'Category'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='anomaly_baselines')
+    scope = models.CharField(max_length=10, choices=SCOPES)
+    key = models.CharField(max_length=255, help_text="Merchant key, or category id ('' for uncategorised)")
+    count = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(default=0)
+    m2 = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Anomaly Baseline"
+        verbose_name_plural = "Anomaly Baselines"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'scope', 'key'], name='unique_anomaly_baseline'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.scope}:{self.key} (n={self.count})"
+
+    @property
+    def std(self):
+        return (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+
+
+class FinancialHealthScore(models.Model):
+    """
+    A user's financial health on one day, from 0 to 100 overall and per
+    area, computed in bulk by ``agents.health``. ``categories`` maps the
+    names of budgeted categories to how well spending kept to the budget.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='health_scores')
+    scored_on = models.DateField()
+    score = models.PositiveSmallIntegerField(default=0)
+    categories = models.JSONField(default=dict, blank=True)
+    savings_health = models.PositiveSmallIntegerField(default=0)
+    debt_health = models.PositiveSmallIntegerField(default=0)
+    investment_health = models.PositiveSmallIntegerField(default=0)
+    goal_progress = models.PositiveSmallIntegerField(default=0)
+    generated_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Financial Health Score"
+        verbose_name_plural = "Financial Health Scores"
+        ordering = ['-scored_on']
+        get_latest_by = 'scored_on'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'scored_on'], name='unique_health_score_per_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} on {self.scored_on}: {self.score}"
+
+
+class HealthScoreRun(models.Model):
+    """
+    Progress of one ``compute_health_scores`` run over user id partitions.
+
+    ``last_user_id`` is the upper bound of the last partition written; an
+    interrupted run resumes after it on the same ``scored_on`` day. Runs left
+    unfinished when another run starts are closed as ``abandoned``.
+    """
+    scored_on = models.DateField()
+    partition_size = models.PositiveIntegerField()
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    partitions = models.PositiveIntegerField(default=0)
+    users = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    abandoned = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = "Health Score Run"
+        verbose_name_plural = "Health Score Runs"
+        get_latest_by = 'started_at'
+
+    def __str__(self):
+        return f"Health scores for {self.scored_on} (up to user {self.last_user_id})"
@@ -0,0 +1,15 @@
+"""
+Scheduled agent jobs, e.g. from Celery beat.
+
+Celery's prefork workers can't start process pools of their own, so the
+nightly health scoring runs its partitions inline here; run the
+``compute_health_scores`` command to spread them over processes.
+"""
+from celery import shared_task
+from .health import compute_health_scores
+
+
+@shared_task(ignore_result=True)
+def compute_health_scores_task(partition_size=5_000):
+    # Resumes the previous run if a worker was lost part way through.
+    compute_health_scores(partition_size=partition_size)
@@ -1,3 +1,246 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+import pandas as pd
+from django.test import TestCase, SimpleTestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth import get_user_model
+from accounts.models import UserProfile
+from agents.anomalies import (
+    AnomalyConfig, detect_anomalies, frame_from_queryset, load_frame, merchant_keys, score_frame, trailing_stats,
+)
+from agents.health import compute_health_scores, score_frames
+from agents.incremental import compare_baselines, score_transactions
+from agents.models import AnomalyBaseline, FinancialHealthScore, HealthScoreRun, TransactionAnomaly
+from transactions.importers import StatementImporter
+from dashboard.models import MonthlyBudget
+from goals.models import Goal
+from transactions.models import Transaction
 
-# Create your tests here.
+User = get_user_model()
+
+
+class AnomalyScoringTests(SimpleTestCase):
+    def frame(self, rows):
+        return pd.DataFrame(rows, columns=['id', 'user_id', 'transaction_date', 'amount', 'merchant', 'category_id'])
+
+    def test_trailing_stats_stay_within_group(self):
+        """Test windows only look back over earlier rows of the same group."""
+        values = pd.Series([10.0, 12.0, 11.0, 500.0, 5.0, 6.0]).to_numpy()
+        groups = pd.Series([0, 0, 0, 0, 1, 1]).to_numpy()
+        median, mad, count = trailing_stats(values, groups, window=2)
+        self.assertEqual(count.tolist(), [0, 1, 2, 2, 0, 1])
+        self.assertEqual(median[3], 11.5)
+        self.assertEqual(median[5], 5.0)
+
+    def test_unusual_amount_and_new_merchant(self):
+        """Test a spike at a regular merchant and a first visit are flagged."""
+        day = date(2026, 1, 1)
+        rows = [(i, 1, day + timedelta(days=i), 100.0 + i % 3, 'grocer', None) for i in range(8)]
+        rows.append((8, 1, day + timedelta(days=8), 900.0, 'grocer', None))
+        rows.append((9, 1, day + timedelta(days=9), 50.0, 'cinema', None))
+        found = score_frame(self.frame(rows), AnomalyConfig(min_history=5))
+        self.assertEqual(
+            sorted(zip(found['transaction_id'], found['anomaly_type'])),
+            [(8, 'unusual_amount'), (9, 'new_merchant')],
+        )
+        spike = found[found['transaction_id'] == 8].iloc[0]
+        self.assertEqual(spike['expected_amount'], 101.0)
+
+    def test_merchant_keys_fall_back_to_description(self):
+        """Test descriptions lose reference numbers when used as merchant."""
+        keys = merchant_keys(pd.Series(['', 'Swiggy ']), pd.Series(['UPI/ZOMATO/4412 ref 99', 'anything']))
+        self.assertEqual(keys.tolist(), ['upi zomato ref', 'swiggy'])
+
+
+class DetectAnomaliesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        day = date(2026, 1, 1)
+        for i in range(10):
+            Transaction.objects.create(
+                user=self.user, transaction_date=day + timedelta(days=i), amount=Decimal('499'),
+                description='NETFLIX', merchant='Netflix', transaction_type='expense',
+            )
+        self.spike = Transaction.objects.create(
+            user=self.user, transaction_date=day + timedelta(days=11), amount=Decimal('1499'),
+            description='NETFLIX', merchant='Netflix', transaction_type='expense',
+        )
+
+    def test_detect_and_rerun_is_idempotent(self):
+        """Test anomalies are written once even when detection reruns."""
+        stats = detect_anomalies([self.user.pk])
+        self.assertEqual((stats.transactions, stats.anomalies), (11, 1))
+        detect_anomalies([self.user.pk])
+        anomaly = TransactionAnomaly.objects.get()
+        self.assertEqual((anomaly.transaction, anomaly.anomaly_type), (self.spike, 'unusual_amount'))
+        self.assertEqual(anomaly.expected_amount, Decimal('499.00'))
+
+    def test_detect_anomalies_command(self):
+        """Test the command reports throughput."""
+        out = StringIO()
+        call_command('detect_anomalies', user='test@example.com', workers=1, stdout=out)
+        self.assertIn('Scored 11 transactions for 1 users, 1 anomalies', out.getvalue())
+
+
+class IncrementalScoringTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.day = date(2026, 1, 1)
+
+    def expense(self, offset, amount, merchant='Grocer'):
+        return Transaction.objects.create(
+            user=self.user, transaction_date=self.day + timedelta(days=offset), amount=Decimal(amount),
+            description=merchant.upper(), merchant=merchant, transaction_type='expense',
+        )
+
+    def score(self, transactions):
+        ids = [t.pk for t in transactions]
+        frame = frame_from_queryset(Transaction.objects.filter(pk__in=ids).order_by('transaction_date', 'pk'))
+        return score_transactions(self.user.pk, frame)
+
+    def test_batches_match_full_recompute(self):
+        """Test baselines built batch by batch equal a full recompute."""
+        first = [self.expense(i, 100 + i % 4) for i in range(7)]
+        second = [self.expense(7 + i, 100 + i % 3) for i in range(3)] + [self.expense(11, 42, 'Cinema')]
+        self.score(first)
+        anomalies = self.score(second)
+        self.assertEqual(list(anomalies['anomaly_type']), ['new_merchant'])
+        self.assertTrue(compare_baselines([self.user.pk], load_frame([self.user.pk])).empty)
+        baseline = AnomalyBaseline.objects.get(scope='merchant', key='grocer')
+        self.assertEqual(baseline.count, 10)
+
+    def test_spike_scored_against_earlier_rows_in_same_batch(self):
+        """Test rows in one batch are scored as if they arrived one by one."""
+        rows = [self.expense(i, 250) for i in range(6)] + [self.expense(6, 2500)]
+        anomalies = self.score(rows)
+        self.assertEqual(list(anomalies['transaction_id']), [rows[-1].pk])
+        self.assertEqual(TransactionAnomaly.objects.get().expected_amount, Decimal('250.00'))
+
+    def test_import_scores_new_rows(self):
+        """Test statement imports update baselines for inserted expenses only."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'statement.csv')
+            with open(path, 'w') as handle:
+                handle.write('Date,Description,Amount\n2026-01-10,COFFEE,-120\n2026-01-11,SALARY,50000\n')
+            StatementImporter(self.user).import_file(path)
+            StatementImporter(self.user).import_file(path)
+        self.assertEqual(
+            list(AnomalyBaseline.objects.order_by('scope').values_list('scope', 'key', 'count')),
+            [('category', '', 1), ('merchant', 'coffee', 1)],
+        )
+
+    def test_check_command_detects_and_fixes_drift(self):
+        """Test the consistency check flags drift and --fix rebuilds it."""
+        self.score([self.expense(i, 100) for i in range(3)])
+        self.expense(3, 500)  # not scored incrementally
+        with self.assertRaises(CommandError):
+            call_command('check_anomaly_baselines', stdout=StringIO())
+        out = StringIO()
+        call_command('check_anomaly_baselines', fix=True, stdout=out)
+        self.assertIn('rebuilt 1 users', out.getvalue())
+        call_command('check_anomaly_baselines', stdout=out)
+        self.assertIn('0 baselines differ', out.getvalue())
+
+
+class HealthScoreFrameTests(SimpleTestCase):
+    def frames(self, budgets=(), goals=()):
+        profiles = pd.DataFrame(
+            [(1, 50000.0, 20000.0, 5000.0), (2, 40000.0, 30000.0, 8000.0), (3, 0.0, 0.0, 0.0)],
+            columns=['user_id', 'income', 'needs', 'limit'],
+        )
+        return (
+            profiles,
+            pd.DataFrame(list(budgets), columns=['user_id', 'category', 'spent', 'earned', 'budget']),
+            pd.DataFrame(list(goals), columns=['user_id', 'category', 'target', 'current']),
+        )
+
+    def test_sub_scores(self):
+        """Test each sub-score from rollups, goals and the profile."""
+        scores = score_frames(*self.frames(
+            budgets=[(1, 'Food', 30000.0, 0.0, 20000.0), (1, None, 90000.0, 150000.0, None)],
+            goals=[(1, 'debt_payoff', 400000.0, 100000.0), (1, 'investment', 200000.0, 150000.0),
+                   (2, 'travel', 10000.0, 5000.0)],
+        )).set_index('user_id')
+        # User 1 kept 30k of 150k (20%); owes 300k against 600k a year; 3 months invested.
+        self.assertEqual(scores.loc[1, ['savings_health', 'debt_health', 'investment_health']].tolist(), [100, 0, 50])
+        self.assertEqual(scores.loc[1, 'goal_progress'], 42)
+        self.assertEqual(scores.loc[1, 'categories'], {'Food': 50})
+        self.assertEqual(scores.loc[1, 'score'], 53)
+        # User 2 has no transactions: planned surplus 2k of 40k (5%).
+        self.assertEqual(scores.loc[2, ['savings_health', 'debt_health', 'goal_progress']].tolist(), [25, 100, 50])
+        self.assertEqual(scores.loc[3, 'score'], 25)
+
+    def test_rows_of_unlisted_users_are_ignored(self):
+        """Test rollups and goals of users without a profile are dropped."""
+        scores = score_frames(*self.frames(goals=[(9, 'debt_payoff', 100.0, 0.0)]))
+        self.assertEqual(scores['user_id'].tolist(), [1, 2, 3])
+
+
+class ComputeHealthScoresTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(email=f'user{i}@example.com', password='testpass123') for i in range(5)]
+        for user in self.users:
+            UserProfile.objects.create(
+                user=user, monthly_income=Decimal('50000'), necessary_needs=Decimal('30000'),
+                monthly_unwanted_limit=Decimal('10000'), goals_and_wants='',
+            )
+        Goal.objects.create(user=self.users[0], name='Fund', category='retirement',
+                            target_amount=Decimal('600000'), current_amount=Decimal('300000'))
+        MonthlyBudget.objects.create(user=self.users[0], month=date(2026, 9, 1), spent_amount=Decimal('100000'))
+        self.today = date(2026, 10, 17)
+
+    def test_scores_all_users_and_rerun_upserts(self):
+        """Test every profile is scored in partitions and a rerun rewrites the day's rows."""
+        stats = compute_health_scores(workers=1, partition_size=2, scored_on=self.today)
+        self.assertEqual((stats.users, stats.partitions), (5, 3))
+        compute_health_scores(workers=1, partition_size=2, scored_on=self.today)
+        self.assertEqual(FinancialHealthScore.objects.count(), 5)
+        score = FinancialHealthScore.objects.get(user=self.users[0])
+        # Spent 100k of 150k income over three months.
+        self.assertEqual((score.savings_health, score.investment_health, score.goal_progress), (100, 100, 50))
+        self.assertEqual(HealthScoreRun.objects.filter(finished_at__isnull=False).count(), 2)
+
+    def test_resumes_after_last_partition(self):
+        """Test an unfinished run continues after its last written partition."""
+        HealthScoreRun.objects.create(scored_on=self.today, partition_size=2, last_user_id=self.users[1].pk)
+        stats = compute_health_scores(workers=1, partition_size=2, scored_on=self.today)
+        self.assertEqual((stats.users, stats.resumed_after), (3, self.users[1].pk))
+        self.assertEqual(
+            set(FinancialHealthScore.objects.values_list('user_id', flat=True)), {user.pk for user in self.users[2:]},
+        )
+        run = HealthScoreRun.objects.get()
+        self.assertEqual((run.users, run.last_user_id), (3, self.users[-1].pk))
+        self.assertIsNotNone(run.finished_at)
+
+    def test_unfinished_run_of_another_day_is_abandoned(self):
+        """Test a run left unfinished on an earlier day is closed, not resumed."""
+        stale = HealthScoreRun.objects.create(
+            scored_on=date(2026, 10, 16), partition_size=2, last_user_id=self.users[1].pk,
+        )
+        stats = compute_health_scores(workers=1, partition_size=2, scored_on=self.today)
+        self.assertEqual((stats.users, stats.resumed_after), (5, 0))
+        self.assertEqual(FinancialHealthScore.objects.filter(scored_on=self.today).count(), 5)
+        stale.refresh_from_db()
+        self.assertTrue(stale.abandoned)
+        self.assertIsNotNone(stale.finished_at)
+        run = HealthScoreRun.objects.get(scored_on=self.today)
+        self.assertEqual((run.users, run.abandoned), (5, False))
+
+    def test_command_reports_throughput(self):
+        """Test the command scores one user and reports users/sec."""
+        out = StringIO()
+        call_command('compute_health_scores', user='user0@example.com', workers=1, stdout=out)
+        self.assertIn('Scored 1 users in 1 partitions', out.getvalue())
+        self.assertIn('users/sec', out.getvalue())
+        self.assertFalse(HealthScoreRun.objects.exists())
+
+    def test_command_scores_requested_date(self):
+        """Test --date picks the day scored and a malformed date is rejected."""
+        call_command('compute_health_scores', date='2026-10-16', workers=1, stdout=StringIO())
+        self.assertEqual(set(FinancialHealthScore.objects.values_list('scored_on', flat=True)), {date(2026, 10, 16)})
+        with self.assertRaises(CommandError):
+            call_command('compute_health_scores', date='2026-13-40', workers=1, stdout=StringIO())
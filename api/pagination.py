@@ -0,0 +1,95 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are ordered by ``keys`` descending (newest first), and the cursor is
+the last row's key values. The next page is fetched with ``WHERE (keys) <
+(cursor)`` on an index over the keys, so page 10,000 costs the same as page
+one; OFFSET would read and discard every earlier row. The last key must be
+unique (normally ``id``) so rows are never skipped or repeated.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values):
+    payload = json.dumps([str(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    """Parse a cursor back into values for ``fields``; raises ValidationError."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(fields):
+            raise ValueError
+        return [field.to_python(value) for field, value in zip(fields, raw)]
+    except (ValueError, TypeError, DjangoValidationError):
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+
+
+def rows_before(keys, values):
+    """
+    ``Q`` for rows ordered strictly after ``values`` when sorting ``keys``
+    descending, i.e. the row-value comparison ``(keys) < (values)``.
+
+    The leading ``keys[0] <= values[0]`` lets the database range-scan the
+    index instead of evaluating the OR over every row.
+    """
+    condition = Q(**{f'{keys[-1]}__lt': values[-1]})
+    for key, value in zip(reversed(keys[:-1]), reversed(values[:-1])):
+        condition = Q(**{f'{key}__lt': value}) | (Q(**{key: value}) & condition)
+    return Q(**{f'{keys[0]}__lte': values[0]}) & condition
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate a ``values()`` queryset by ``keys`` descending.
+
+    The queryset's rows must include every key. Responses look like
+    ``{"next": <url or null>, "results": [...]}``.
+    """
+    keys = ('id',)
+    page_size = 100
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            size = int(value)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: 'Must be an integer.'})
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*(f'-{key}' for key in self.keys))
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            fields = [queryset.model._meta.get_field(key) for key in self.keys]
+            queryset = queryset.filter(rows_before(self.keys, decode_cursor(cursor, fields)))
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.last_values = [rows[-1][key] for key in self.keys] if rows else None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(self.last_values))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
@@ -0,0 +1,130 @@
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from dashboard.models import MonthlyBudget
+from goals.models import Goal
+from transactions.models import Transaction
+from api.pagination import decode_cursor, encode_cursor
+
+User = get_user_model()
+
+
+class TransactionApiTests(TestCase):
+    def setUp(self):
+        """Create a user with 25 transactions, several per day."""
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_login(self.user)
+        start = date(2025, 1, 1)
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user,
+                transaction_date=start + timedelta(days=i // 3),
+                amount=Decimal('10.00') + i,
+                description=f'Row {i}',
+                transaction_type='expense' if i % 5 else 'income',
+            )
+            for i in range(25)
+        ])
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        Transaction.objects.create(
+            user=other, transaction_date=start, amount=1, description='Not mine', transaction_type='expense',
+        )
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            body = self.client.get(url).json()
+            ids.extend(row['id'] for row in body['results'])
+            url, pages = body['next'], pages + 1
+        return ids, pages
+
+    def test_pages_cover_every_row_once_in_order(self):
+        """Test keyset pages return each row once, newest first, across ties."""
+        ids, pages = self.walk('/api/transactions/?page_size=4')
+        expected = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by('-transaction_date', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 7)
+
+    def test_rows_are_projected(self):
+        """Test rows carry only the listed fields."""
+        row = self.client.get('/api/transactions/?page_size=1').json()['results'][0]
+        self.assertEqual(set(row), {
+            'id', 'transaction_date', 'amount', 'transaction_type', 'description', 'merchant', 'category_id',
+        })
+
+    def test_deep_page_is_one_query(self):
+        """Test a page after a cursor is a single indexed query."""
+        cursor = encode_cursor([date(2025, 1, 5), 10**9])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/transactions/?cursor={cursor}&page_size=5')
+        self.assertEqual(response.status_code, 200)
+        queries = [q['sql'] for q in ctx.captured_queries if 'transactions_transaction' in q['sql']]
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('OFFSET', queries[0])
+
+    def test_filters(self):
+        """Test type and date range filters."""
+        body = self.client.get('/api/transactions/?type=income&from=2025-01-02&to=2025-01-05').json()
+        dates = {row['transaction_date'] for row in body['results']}
+        self.assertTrue(body['results'])
+        self.assertTrue(all('2025-01-02' <= day <= '2025-01-05' for day in dates))
+        self.assertEqual({row['transaction_type'] for row in body['results']}, {'income'})
+        self.assertEqual(self.client.get('/api/transactions/?from=yesterday').status_code, 400)
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is a 400, not a server error."""
+        self.assertEqual(self.client.get('/api/transactions/?cursor=bm9wZQ').status_code, 400)
+
+    def test_requires_login(self):
+        """Test anonymous requests are refused rather than redirected."""
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/transactions/').status_code, 403)
+
+    def test_streaming_export(self):
+        """Test the export streams the whole history as one JSON array."""
+        response = self.client.get('/api/transactions/export/')
+        self.assertTrue(response.streaming)
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[0]['transaction_date'], '2025-01-09')
+
+
+class GoalAndSummaryApiTests(TestCase):
+    def setUp(self):
+        """Create goals and monthly rollups for one user."""
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_login(self.user)
+        Goal.objects.bulk_create([
+            Goal(user=self.user, name=f'Goal {i}', target_amount=1000 * (i + 1)) for i in range(3)
+        ])
+
+    def test_goals(self):
+        """Test goals are listed newest first."""
+        names = [row['name'] for row in self.client.get('/api/goals/').json()['results']]
+        self.assertEqual(names, ['Goal 2', 'Goal 1', 'Goal 0'])
+
+    def test_monthly_summaries(self):
+        """Test summaries add up the month's rollup rows."""
+        for day in (date(2025, 1, 3), date(2025, 1, 20), date(2025, 2, 1)):
+            Transaction.objects.create(
+                user=self.user, transaction_date=day, amount=100, description='x', transaction_type='expense',
+            )
+        self.assertTrue(MonthlyBudget.objects.filter(user=self.user).exists())
+        body = self.client.get('/api/monthly-summaries/').json()
+        self.assertEqual([row['month'] for row in body['results']], ['2025-02-01', '2025-01-01'])
+        self.assertEqual(Decimal(body['results'][1]['spent']), Decimal('200'))
+        self.assertEqual(body['results'][1]['transactions'], 2)
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        """Test cursors decode to typed values."""
+        fields = [Transaction._meta.get_field('transaction_date'), Transaction._meta.get_field('id')]
+        self.assertEqual(decode_cursor(encode_cursor([date(2025, 3, 1), 42]), fields), [date(2025, 3, 1), 42])
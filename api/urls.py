@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('transactions/', views.TransactionList.as_view(), name='transactions'),
+    path('transactions/export/', views.TransactionExport.as_view(), name='transactions_export'),
+    path('goals/', views.GoalList.as_view(), name='goals'),
+    path('goals/projection/', views.GoalProjection.as_view(), name='goal_projection'),
+    path('monthly-summaries/', views.MonthlySummaryList.as_view(), name='monthly_summaries'),
+]
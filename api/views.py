@@ -0,0 +1,136 @@
+"""
+Read-only JSON API for transactions, goals, goal projections and monthly
+summaries.
+
+List endpoints return ``values()`` rows (only the listed columns, no model
+instances) in keyset pages; the export endpoint streams a user's whole
+transaction history as one JSON array.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from dashboard.models import MonthlyBudget
+from goals.models import Goal
+from goals.projections import get_projection
+from transactions.models import Transaction
+from .pagination import KeysetPagination
+
+TRANSACTION_FIELDS = (
+	'id', 'transaction_date', 'amount', 'transaction_type', 'description', 'merchant', 'category_id',
+)
+GOAL_FIELDS = (
+	'id', 'name', 'category', 'target_amount', 'current_amount', 'start_date', 'target_date', 'priority', 'status',
+)
+
+
+class TransactionPagination(KeysetPagination):
+	keys = ('transaction_date', 'id')
+
+
+class MonthlySummaryPagination(KeysetPagination):
+	keys = ('month',)
+	page_size = 24
+
+
+class KeysetListView(APIView):
+	"""GET a keyset page of ``get_queryset()``."""
+	pagination_class = KeysetPagination
+
+	def get(self, request):
+		paginator = self.pagination_class()
+		page = paginator.paginate_queryset(self.get_queryset(), request, view=self)
+		return paginator.get_paginated_response(page)
+
+
+def transaction_filters(request):
+	"""Filters from ``?type=``, ``?from=`` and ``?to=`` (ISO dates, inclusive)."""
+	filters = {}
+	params = request.query_params
+	if params.get('type'):
+		filters['transaction_type'] = params['type']
+	for param, lookup in (('from', 'transaction_date__gte'), ('to', 'transaction_date__lte')):
+		if params.get(param):
+			try:
+				filters[lookup] = Transaction._meta.get_field('transaction_date').to_python(params[param])
+			except DjangoValidationError:
+				raise ValidationError({param: 'Use an ISO date (YYYY-MM-DD).'})
+	return filters
+
+
+class TransactionList(KeysetListView):
+	"""The user's transactions, newest first."""
+	pagination_class = TransactionPagination
+
+	def get_queryset(self):
+		return (
+			Transaction.objects
+			.filter(user=self.request.user, **transaction_filters(self.request))
+			.values(*TRANSACTION_FIELDS)
+		)
+
+
+class GoalList(KeysetListView):
+	"""The user's goals, newest first."""
+
+	def get_queryset(self):
+		return Goal.objects.filter(user=self.request.user).values(*GOAL_FIELDS)
+
+
+class GoalProjection(APIView):
+	"""Month-by-month funding projection and feasibility of the user's active goals."""
+
+	def get(self, request):
+		return Response(get_projection(request.user.pk))
+
+
+class MonthlySummaryList(KeysetListView):
+	"""Per-month totals from the rollup rows, newest month first."""
+	pagination_class = MonthlySummaryPagination
+
+	def get_queryset(self):
+		return (
+			MonthlyBudget.objects
+			.filter(user=self.request.user)
+			.values('month')
+			.annotate(
+				spent=Sum('spent_amount'),
+				income=Sum('income_amount'),
+				transactions=Sum('transaction_count'),
+				budget=Sum('budget_amount'),
+			)
+		)
+
+
+def stream_json_array(rows, fields, chunk_size=500):
+	"""Yield a JSON array of objects for ``rows`` (tuples of ``fields``) in chunks."""
+	encoder = DjangoJSONEncoder(separators=(',', ':'))
+	yield '['
+	buffer, first = [], True
+	for row in rows:
+		buffer.append(encoder.encode(dict(zip(fields, row))))
+		if len(buffer) >= chunk_size:
+			yield ('' if first else ',') + ','.join(buffer)
+			buffer, first = [], False
+	if buffer:
+		yield ('' if first else ',') + ','.join(buffer)
+	yield ']'
+
+
+class TransactionExport(APIView):
+	"""The user's whole (filtered) history as one streamed JSON array."""
+
+	def get(self, request):
+		rows = (
+			Transaction.objects
+			.filter(user=request.user, **transaction_filters(request))
+			.order_by('-transaction_date', '-id')
+			.values_list(*TRANSACTION_FIELDS)
+			.iterator(chunk_size=2000)
+		)
+		response = StreamingHttpResponse(stream_json_array(rows, TRANSACTION_FIELDS), content_type='application/json')
+		response['Content-Disposition'] = 'attachment; filename="transactions.json"'
+		return response
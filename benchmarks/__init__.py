@@ -0,0 +1,7 @@
+"""
+Offline micro/macro benchmarks for FinMate hot paths.
+
+Each module is runnable on its own from the project root, e.g.::
+
+    python -m benchmarks.bench_middleware
+"""
@@ -0,0 +1,122 @@
+"""
+Anomaly scoring throughput.
+
+Engine mode (default) generates synthetic expense columns per batch of
+users inside the worker processes and scores them with score_frame, so
+the number is the pure vectorised cost at the 10M-row / 100k-user scale:
+
+    python -m benchmarks.bench_anomalies --rows 10000000 --users 100000 --workers 8
+
+--db runs detect_anomalies end to end (load, score, bulk write) on a
+throwaway SQLite database; keep --rows modest there since loading the
+rows dominates.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import setup_django, throwaway_database, peak_rss_mb, report
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from agents.anomalies import AnomalyConfig, detect_anomalies, score_frame  # noqa: E402
+from transactions.models import Transaction  # noqa: E402
+
+MERCHANTS = np.array([f'merchant {i}' for i in range(200)], dtype=object)
+
+
+def synthetic_frame(first_user, users, per_user, seed):
+    rng = np.random.default_rng(seed)
+    n = users * per_user
+    user_ids = np.repeat(np.arange(first_user, first_user + users), per_user)
+    merchant_index = rng.integers(0, 25, n) + (user_ids % 8) * 25
+    base = 50 + merchant_index * 7.0
+    amount = base * rng.lognormal(0, 0.25, n)
+    spikes = rng.random(n) < 0.002
+    amount[spikes] *= 20
+    start = np.datetime64('2024-01-01')
+    days = np.sort(rng.integers(0, 730, (users, per_user)), axis=1).ravel()
+    return pd.DataFrame({
+        'id': np.arange(first_user * per_user, first_user * per_user + n),
+        'user_id': user_ids,
+        'transaction_date': start + days,
+        'amount': amount.round(2),
+        'merchant': MERCHANTS[merchant_index],
+        'category_id': (merchant_index % 10).astype(float),
+    })
+
+
+def score_synthetic(args):
+    first_user, users, per_user = args
+    frame = synthetic_frame(first_user, users, per_user, seed=first_user)
+    return len(frame), len(score_frame(frame, AnomalyConfig()))
+
+
+def engine(args):
+    per_user = args.rows // args.users
+    batches = [
+        (first, min(args.batch_size, args.users - first), per_user)
+        for first in range(0, args.users, args.batch_size)
+    ]
+    started = time.perf_counter()
+    scored = found = 0
+    with ProcessPoolExecutor(args.workers) as pool:
+        for rows, anomalies in pool.map(score_synthetic, batches):
+            scored += rows
+            found += anomalies
+    elapsed = time.perf_counter() - started
+    return scored, found, elapsed
+
+
+def end_to_end(args):
+    with throwaway_database():
+        User = get_user_model()
+        users = User.objects.bulk_create([User(email=f'bench{i}@example.com') for i in range(args.users)])
+        per_user = args.rows // args.users
+        for batch_start in range(0, args.users, 1000):
+            frame = synthetic_frame(batch_start, min(1000, args.users - batch_start), per_user, seed=batch_start)
+            Transaction.objects.bulk_create([
+                Transaction(
+                    user=users[user_id], transaction_date=date(2024, 1, 1) + timedelta(days=int(day)),
+                    amount=Decimal(f'{amount:.2f}'), description=merchant, merchant=merchant,
+                    transaction_type='expense',
+                )
+                for user_id, day, amount, merchant in zip(
+                    frame['user_id'], (frame['transaction_date'] - np.datetime64('2024-01-01')).dt.days,
+                    frame['amount'], frame['merchant'],
+                )
+            ], batch_size=5000)
+        stats = detect_anomalies([user.pk for user in users], workers=args.workers, batch_size=args.batch_size)
+        return stats.transactions, stats.anomalies, stats.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=1_000)
+    parser.add_argument('--db', action='store_true', help='Load from and write to a throwaway database.')
+    args = parser.parse_args()
+
+    scored, found, elapsed = (end_to_end if args.db else engine)(args)
+    report(f'Anomaly scoring ({"database" if args.db else "engine"}, {args.workers} workers)', [
+        ('transactions', f'{scored:,}'),
+        ('users', f'{args.users:,}'),
+        ('anomalies', f'{found:,}'),
+        ('seconds', f'{elapsed:.1f}'),
+        ('transactions/s', f'{scored / elapsed:,.0f}'),
+        ('peak RSS MB (parent)', f'{peak_rss_mb():.0f}'),
+    ], ('metric', 'value'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+API page latency by depth: keyset cursor vs OFFSET.
+
+Loads --rows transactions for one user, then times GET /api/transactions/
+(100 rows per page, through the test client) at increasing depths using
+the keyset cursor, and the same page fetched with OFFSET for comparison.
+Also times streaming the whole history through the export endpoint.
+
+    python -m benchmarks.bench_api_pagination --rows 1000000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks.common import setup_django, throwaway_database, report, time_per_call
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from api.pagination import encode_cursor  # noqa: E402
+from api.views import TRANSACTION_FIELDS  # noqa: E402
+from transactions.models import Transaction  # noqa: E402
+
+PAGE = 100
+
+
+def load(user, rows, batch_size=50_000):
+    start = date(2015, 1, 1)
+    for first in range(0, rows, batch_size):
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=user,
+                transaction_date=start + timedelta(days=i // 250),
+                amount=Decimal(i % 5000) / 4,
+                description=f'UPI/MERCHANT {i % 300}',
+                transaction_type='expense',
+            )
+            for i in range(first, min(first + batch_size, rows))
+        ], batch_size=5_000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+
+    with throwaway_database():
+        user = get_user_model().objects.create_user(email='bench@example.com')
+        started = time.perf_counter()
+        load(user, args.rows)
+        loaded_in = time.perf_counter() - started
+        client = Client()
+        client.force_login(user)
+        ordered = Transaction.objects.filter(user=user).order_by('-transaction_date', '-id')
+
+        rows = []
+        for depth in sorted({0, 1_000, args.rows // 10, args.rows // 2, args.rows - PAGE}):
+            if depth:
+                last = ordered.values_list('transaction_date', 'id')[depth - 1]
+                url = f'/api/transactions/?cursor={encode_cursor(last)}'
+            else:
+                url = '/api/transactions/'
+            assert len(client.get(url).json()['results']) == PAGE
+
+            def offset_page(depth=depth):
+                return list(ordered.values(*TRANSACTION_FIELDS)[depth:depth + PAGE])
+
+            keyset_ms = time_per_call(client.get, url, number=20, repeat=3) / 1000
+            offset_ms = time_per_call(offset_page, number=3, repeat=3) / 1000
+            rows.append((f'{depth:,}', f'{keyset_ms:.2f}', f'{offset_ms:.2f}'))
+
+        started = time.perf_counter()
+        response = client.get('/api/transactions/export/')
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        export_s = time.perf_counter() - started
+
+    report(
+        f'Transaction pages of {PAGE}, {args.rows:,} rows (loaded in {loaded_in:.0f}s)',
+        rows, ('rows skipped', 'keyset API ms', 'OFFSET query ms'),
+    )
+    print(f'Streaming export: {size / 1e6:,.0f} MB in {export_s:.1f}s, {args.rows / export_s:,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
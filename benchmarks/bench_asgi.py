@@ -0,0 +1,183 @@
+"""
+Dashboard throughput under ASGI vs WSGI, at server-like concurrency.
+
+Logs in --sessions seeded users with goals and a month of rollups, then
+sends --requests dashboard GETs through the full middleware stack, at
+--concurrency requests in flight:
+
+* WSGI: ``WSGIHandler`` called from a pool of --concurrency threads, as a
+  threaded WSGI server (gunicorn gthread, mod_wsgi) would;
+* ASGI: the ``finmate.asgi`` application driven by --concurrency client
+  tasks on one event loop, as uvicorn would, without the network;
+
+each with the sync dashboard view and with its async variant (served when
+DASHBOARD_ASYNC_VIEW is set, mounted at /async/ here), and with the fragment
+cache warm or disabled (every widget loaded on every request).
+
+    python -m benchmarks.bench_asgi --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+
+from benchmarks.common import setup_django, throwaway_database, report
+from benchmarks.fixtures import seed_users
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.urls import include, path  # noqa: E402
+
+from accounts.models import UserProfile  # noqa: E402
+from dashboard.models import ExpenseCategory, MonthlyBudget  # noqa: E402
+from dashboard.views import async_home  # noqa: E402
+from dashboard.widgets import current_month  # noqa: E402
+from goals.models import Goal  # noqa: E402
+
+
+# This module doubles as the URLconf: the async view next to the real URLs.
+urlpatterns = [path('async/', async_home), path('', include('finmate.urls'))]
+
+
+def seed_sessions(count):
+    """Log in ``count`` users with dashboard data; returns their session cookies."""
+    User = get_user_model()
+    categories = [ExpenseCategory.objects.create(name=name) for name in ('Food', 'Rent', 'Travel', 'Shopping')]
+    cookies = []
+    for i in range(count):
+        user = User.objects.create_user(email=f'member{i}@example.com', onboarding_completed=True)
+        UserProfile.objects.create(
+            user=user, monthly_income=Decimal('80000'), necessary_needs=Decimal('30000'),
+            monthly_unwanted_limit=Decimal('10000'),
+        )
+        Goal.objects.bulk_create([
+            Goal(user=user, name=f'Goal {n}', target_amount=Decimal('100000'), target_date=date(2030, n, 1))
+            for n in range(1, 7)
+        ])
+        MonthlyBudget.objects.bulk_create([
+            MonthlyBudget(user=user, month=current_month(), category=category, spent_amount=Decimal('1234.50'),
+                          transaction_count=12)
+            for category in categories
+        ])
+        client = Client()
+        client.force_login(user)
+        cookies.append(f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}')
+    return cookies
+
+
+def summary(latencies, elapsed):
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return len(latencies) / elapsed, cuts[49] * 1000, cuts[98] * 1000
+
+
+def run_wsgi(url, cookies, requests, concurrency):
+    application = WSGIHandler()
+
+    def one(i):
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': url, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'localhost', 'HTTP_COOKIE': cookies[i % len(cookies)],
+            'wsgi.input': BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': BytesIO(),
+        }
+        statuses = []
+        started = time.perf_counter()
+        response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        b''.join(response)
+        response.close()
+        latency = time.perf_counter() - started
+        if not statuses[0].startswith('200'):
+            raise RuntimeError(f'WSGI {url}: {statuses[0]}')
+        return latency
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return summary(latencies, time.perf_counter() - started)
+
+
+async def run_asgi(url, cookies, requests, concurrency):
+    application = get_asgi_application()
+    pending = iter(range(requests))
+    latencies = []
+
+    async def client():
+        for i in pending:
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': url, 'raw_path': url.encode(), 'query_string': b'', 'root_path': '',
+                'headers': [(b'host', b'localhost'), (b'cookie', cookies[i % len(cookies)].encode())],
+                'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+            }
+            body_sent = asyncio.Event()
+            messages = []
+
+            async def receive():
+                if not body_sent.is_set():
+                    body_sent.set()
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Only a disconnect could follow; the handler cancels this wait.
+                await asyncio.Future()
+
+            async def send(message):
+                messages.append(message)
+
+            started = time.perf_counter()
+            await application(scope, receive, send)
+            latencies.append(time.perf_counter() - started)
+            if messages[0]['status'] != 200:
+                raise RuntimeError(f"ASGI {url}: {messages[0]['status']}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summary(latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--users', type=int, default=1_000, help='Seeded users besides the logged-in ones.')
+    parser.add_argument('--sessions', type=int, default=50, help='Logged-in users the requests rotate over.')
+    parser.add_argument('--requests', type=int, default=2_000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'localhost']
+
+    results = []
+    with throwaway_database():
+        seed_users(args.users, '!')
+        cookies = seed_sessions(args.sessions)
+        no_cache = {**settings.CACHES, 'dashboard-off': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        modes = itertools.product(('warm', 'off'), (('sync view', '/'), ('async view', '/async/')), ('WSGI', 'ASGI'))
+        for cache_mode, (view, url), server in modes:
+            overrides = {'ROOT_URLCONF': 'benchmarks.bench_asgi'}
+            if cache_mode == 'off':
+                overrides.update(CACHES=no_cache, DASHBOARD_CACHE_ALIAS='dashboard-off')
+            with override_settings(**overrides):
+                # Untimed pass: warms fragments, user cache and imports.
+                warmup = min(len(cookies), args.requests)
+                if server == 'WSGI':
+                    run_wsgi(url, cookies, warmup, args.concurrency)
+                    rate, p50, p99 = run_wsgi(url, cookies, args.requests, args.concurrency)
+                else:
+                    asyncio.run(run_asgi(url, cookies, warmup, args.concurrency))
+                    rate, p50, p99 = asyncio.run(run_asgi(url, cookies, args.requests, args.concurrency))
+            results.append((server, view, cache_mode, f'{rate:,.0f}', f'{p50:.1f}', f'{p99:.1f}'))
+
+    report(
+        f'Dashboard, {args.requests:,} requests at concurrency {args.concurrency}',
+        results, ('server', 'view', 'fragment cache', 'requests/sec', 'p50 ms', 'p99 ms'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Categoriser throughput: one compiled trie regex vs a regex per rule.
+
+Builds --rules keyword rules (the fixture merchants plus random words) and
+classifies --rows statement narrations from ``benchmarks.fixtures``:
+
+* one ``re.search`` per rule in turn (on a sample), the naive approach;
+* the compiled categoriser on distinct normalised texts, uncached;
+* the memoised categoriser on the statement's texts, with its hit rate;
+* ``categorise_frame`` end to end, including normalisation, as the
+  importer calls it.
+
+    python -m benchmarks.bench_categoriser --rows 1000000 --rules 500
+"""
+import argparse
+import random
+import re
+import time
+
+import pandas as pd
+
+from benchmarks.common import setup_django, report
+from benchmarks.fixtures import MERCHANTS, statement_rows
+
+setup_django()
+
+from transactions.categoriser import Categoriser, category_texts, normalise_text  # noqa: E402
+
+
+def make_rules(count, seed=0):
+    rng = random.Random(seed)
+    keywords = {normalise_text(merchant) for merchant in MERCHANTS}
+    while len(keywords) < count:
+        word = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10)))
+        keywords.add(word if rng.random() < 0.7 else f'{word} {rng.choice(["pay", "bill", "store", "india"])}')
+    return [(keyword, i % 25, (i % 2, 0, -len(keyword))) for i, keyword in enumerate(sorted(keywords))]
+
+
+def rate(func, items):
+    started = time.perf_counter()
+    func(items)
+    elapsed = time.perf_counter() - started
+    return elapsed, len(items) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--rules', type=int, default=500)
+    parser.add_argument('--payees', type=int, default=2_000, help='Distinct payee names in narrations.')
+    parser.add_argument('--sample', type=int, default=20_000, help='Rows classified rule by rule.')
+    args = parser.parse_args()
+
+    rules = make_rules(args.rules)
+    # UPI narrations usually carry the payee's name: draw from --payees names.
+    rng = random.Random(1)
+    payees = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(7)) for _ in range(args.payees)]
+    frame = pd.DataFrame(
+        [(f'{narration} {rng.choice(payees)}', '') for _, narration, _, _, _ in statement_rows(args.rows)],
+        columns=['description', 'merchant'],
+    )
+    texts = category_texts(frame['merchant'], frame['description'])
+    distinct = list(dict.fromkeys(texts))
+
+    started = time.perf_counter()
+    categoriser = Categoriser(rules, cache_size=0)
+    compile_ms = (time.perf_counter() - started) * 1000
+    patterns = [(re.compile(r'\b' + re.escape(keyword) + r'\b'), category) for keyword, category, _ in rules]
+
+    def sequential(items):
+        return [next((category for pattern, category in patterns if pattern.search(text)), None) for text in items]
+
+    results = []
+    elapsed, per_second = rate(sequential, texts[:args.sample])
+    results.append(('regex per rule', f'{min(args.sample, len(texts)):,}', f'{elapsed:.2f}', f'{per_second:,.0f}'))
+    elapsed, per_second = rate(categoriser.classify_many, distinct)
+    results.append(('trie regex, uncached', f'{len(distinct):,}', f'{elapsed:.2f}', f'{per_second:,.0f}'))
+    memoised = Categoriser(rules)
+    elapsed, per_second = rate(memoised.classify_many, texts)
+    results.append(('trie regex, memoised', f'{len(texts):,}', f'{elapsed:.2f}', f'{per_second:,.0f}'))
+    stats = memoised.cache_stats()
+    frame_categoriser = Categoriser(rules)
+    elapsed, per_second = rate(frame_categoriser.categorise_frame, frame)
+    results.append(('categorise_frame (end to end)', f'{len(frame):,}', f'{elapsed:.2f}', f'{per_second:,.0f}'))
+
+    report(
+        f'Categorising {args.rows:,} narrations with {len(rules):,} rules (compiled in {compile_ms:.0f} ms)',
+        results, ('method', 'texts', 'seconds', 'texts/sec'),
+    )
+    print(
+        f"Memo: {stats['hits']:,} hits, {stats['misses']:,} misses ({stats['hit_rate']:.1%} hit rate), "
+        f"{stats['size']:,} entries; {len(distinct):,} distinct texts"
+    )
+
+
+if __name__ == '__main__':
+    main()
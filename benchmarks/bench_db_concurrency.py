@@ -0,0 +1,169 @@
+"""
+Write throughput with concurrent workers per database profile.
+
+Each writer process performs request-sized writes (one transaction that
+creates a Transaction row, which also updates its monthly rollup) and
+closes or keeps its connection the way a request would
+(close_old_connections). Reader processes run dashboard-style reads at the
+same time. Results are writes and reads per second across all workers,
+plus the operations that failed with "database is locked".
+
+On SQLite this compares Django's defaults (rollback journal,
+synchronous=FULL, 5s timeout, deferred transactions) with the WAL profile
+from settings. With DB_ENGINE=django.db.backends.postgresql it compares
+a connection per request, persistent connections and, when psycopg 3 with
+psycopg[pool] is installed, the native pool.
+
+    python -m benchmarks.bench_db_concurrency --writers 4 --readers 2 --writes 500
+"""
+import argparse
+import multiprocessing
+import time
+from datetime import date
+from decimal import Decimal
+
+from benchmarks.common import setup_django, throwaway_database, report
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import OperationalError, close_old_connections, connection, connections, transaction  # noqa: E402
+
+from dashboard.models import MonthlyBudget  # noqa: E402
+from transactions.models import Transaction  # noqa: E402
+
+
+def sqlite_profiles():
+    tuned = settings.DATABASES['default']['OPTIONS']
+    return {
+        'django defaults': {'OPTIONS': {'timeout': 5}},
+        'WAL profile': {'OPTIONS': dict(tuned)},
+    }
+
+
+def postgres_profiles():
+    profiles = {
+        'connection per request': {'CONN_MAX_AGE': 0, 'OPTIONS': {}},
+        'persistent (CONN_MAX_AGE=60)': {'CONN_MAX_AGE': 60, 'OPTIONS': {}},
+    }
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        profiles['native pool'] = {'CONN_MAX_AGE': 0, 'OPTIONS': {'pool': {'min_size': 2, 'max_size': 4}}}
+    return profiles
+
+
+def _use_profile(profile):
+    # Forked workers must open their own connection with the profile applied.
+    connections.close_all()
+    connection.settings_dict.update(profile)
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['OPTIONS'].setdefault('transaction_mode', None)
+
+
+def writer(profile, user_id, writes):
+    _use_profile(profile)
+    failed = 0
+    for i in range(writes):
+        try:
+            with transaction.atomic():
+                Transaction.objects.create(
+                    user_id=user_id,
+                    transaction_date=date(2025, 1 + i % 12, 1 + i % 28),
+                    amount=Decimal('12.50'),
+                    description=f'bench write {i}',
+                    transaction_type='expense',
+                )
+        except OperationalError:
+            failed += 1
+        close_old_connections()
+    connections.close_all()
+    return writes - failed, failed
+
+
+def reader(profile, user_id, reads):
+    _use_profile(profile)
+    failed = 0
+    for _ in range(reads):
+        try:
+            MonthlyBudget.objects.totals_for(user_id, date(2025, 1, 1))
+            Transaction.objects.filter(user_id=user_id).order_by('-transaction_date')[:10].count()
+        except OperationalError:
+            failed += 1
+        close_old_connections()
+    connections.close_all()
+    return reads - failed, failed
+
+
+def _prepare_sqlite(profile):
+    # The journal mode is stored in the database file: connect once with the
+    # profile (whose init_command may enable WAL) before the workers race for
+    # it, and go back to the rollback journal for the default profile.
+    _use_profile(profile)
+    with connection.cursor() as cursor:
+        if 'init_command' not in profile['OPTIONS']:
+            cursor.execute('PRAGMA journal_mode=DELETE')
+    connections.close_all()
+
+
+def run_profile(profile, user_ids, writers, readers, writes, reads):
+    if connection.vendor == 'sqlite':
+        _prepare_sqlite(profile)
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    with context.Pool(writers + readers) as pool:
+        started = time.perf_counter()
+        write_results = [
+            pool.apply_async(writer, (profile, user_ids[i % len(user_ids)], writes)) for i in range(writers)
+        ]
+        read_results = [
+            pool.apply_async(reader, (profile, user_ids[i % len(user_ids)], reads)) for i in range(readers)
+        ]
+        written = [result.get() for result in write_results]
+        read = [result.get() for result in read_results]
+        elapsed = time.perf_counter() - started
+    return (
+        sum(count for count, _ in written), sum(count for _, count in written),
+        sum(count for count, _ in read), sum(count for _, count in read), elapsed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--writes', type=int, default=500, help='Writes per writer')
+    parser.add_argument('--reads', type=int, default=1000, help='Reads per reader')
+    args = parser.parse_args()
+
+    with throwaway_database():
+        profiles = sqlite_profiles() if connection.vendor == 'sqlite' else postgres_profiles()
+        user_ids = [
+            get_user_model().objects.create_user(email=f'writer{i}@example.com').pk
+            for i in range(max(args.writers, 1))
+        ]
+        original = {key: connection.settings_dict.get(key) for key in ('CONN_MAX_AGE', 'OPTIONS')}
+        rows = []
+        for name, profile in profiles.items():
+            writes, failed_writes, reads, failed_reads, elapsed = run_profile(
+                profile, user_ids, args.writers, args.readers, args.writes, args.reads,
+            )
+            rows.append((
+                name, f'{writes / elapsed:,.0f}', f'{failed_writes:,}',
+                f'{reads / elapsed:,.0f}', f'{failed_reads:,}', f'{elapsed:.1f}',
+            ))
+        connections.close_all()
+        connection.settings_dict.update(original)
+
+    report(
+        f'{connection.vendor}: {args.writers} writers x {args.writes} writes, {args.readers} readers x {args.reads} reads',
+        rows,
+        ['profile', 'writes/s', 'locked writes', 'reads/s', 'locked reads', 'seconds'],
+    )
+
+
+if __name__ == '__main__':
+    main()
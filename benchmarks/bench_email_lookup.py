@@ -0,0 +1,69 @@
+"""
+Signup email validation against a large user table.
+
+Fills a throwaway database with --users accounts, then times the
+duplicate-email check done by SignUpForm.clean_email through the
+lower(email) index (CustomUserQuerySet.for_email) against the previous
+``email__iexact`` filter, printing each query plan.
+
+    python -m benchmarks.bench_email_lookup --users 1000000
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_django, throwaway_database, report, time_per_call
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+
+from accounts.forms import SignUpForm  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    User = get_user_model()
+    with throwaway_database():
+        password = make_password(None)
+        started = time.perf_counter()
+        for start in range(0, args.users, 50_000):
+            User.objects.bulk_create(
+                [User(email=f'User{i}@Example.com', password=password)
+                 for i in range(start, min(start + 50_000, args.users))],
+                batch_size=5_000,
+            )
+        load = time.perf_counter() - started
+
+        # A new signup's email is normally not taken: the iexact scan has to
+        # read the whole table to prove that.
+        probe = 'new.user@example.com'
+        indexed = User.objects.for_email(probe)
+        scanned = User.objects.filter(email__iexact=probe)
+        taken = f'user{args.users // 2}@example.com'
+        assert User.objects.for_email(taken).exists() and not indexed.exists()
+
+        def validate():
+            form = SignUpForm(data={'email': probe.upper(), 'password1': 'x', 'password2': 'x'})
+            form.is_valid()
+
+        indexed_us = time_per_call(indexed.exists, number=200)
+        scanned_us = time_per_call(scanned.exists, number=3, repeat=3)
+        form_us = time_per_call(validate, number=20)
+        plans = [('for_email', indexed.explain()), ('email__iexact', scanned.explain())]
+
+    report(f'Email lookup, {args.users:,} users (loaded in {load:.0f}s)', [
+        ('for_email().exists()', f'{indexed_us:,.0f}'),
+        ('email__iexact.exists()', f'{scanned_us:,.0f}'),
+        ('SignUpForm.is_valid() *', f'{form_us:,.0f}'),
+    ], ('query', 'us/call'))
+    print('* includes the password validators')
+    for name, plan in plans:
+        print(f'\n{name}:\n{plan}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Memory and throughput of the transaction exports.
+
+Loads --rows transactions for one user, then downloads the full history
+through /transactions/export/ as streamed CSV and as XLSX, and finally
+builds the CSV in memory with pandas for comparison. Peak RSS only ever
+grows, so the steps run from the expected smallest to largest footprint
+and each row shows the peak after that step. SQLite's memory map is off
+unless DB_SQLITE_MMAP_SIZE is set, since mapped database pages would count
+towards RSS.
+
+    python -m benchmarks.bench_export --rows 1000000
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+os.environ.setdefault('DB_SQLITE_MMAP_SIZE', '0')
+
+from benchmarks.bench_api_pagination import load  # noqa: E402
+from benchmarks.common import setup_django, throwaway_database, peak_rss_mb, report  # noqa: E402
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from transactions.exports import EXPORT_FIELDS, EXPORT_HEADER, export_queryset  # noqa: E402
+
+
+def download(client, url):
+    response = client.get(url)
+    return sum(len(chunk) for chunk in response.streaming_content)
+
+
+def in_memory_csv(user):
+    frame = pd.DataFrame.from_records(list(export_queryset(user)), columns=EXPORT_FIELDS)
+    return len(frame.to_csv(index=False, header=EXPORT_HEADER).encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+
+    with throwaway_database():
+        user = get_user_model().objects.create_user(email='bench@example.com', onboarding_completed=True)
+        load(user, args.rows)
+        client = Client()
+        client.force_login(user)
+        rows = [('after loading', '', '', '', f'{peak_rss_mb():,.0f}')]
+        for label, run in (
+            ('CSV, streamed', lambda: download(client, '/transactions/export/')),
+            ('XLSX, write-only', lambda: download(client, '/transactions/export/?format=xlsx')),
+            ('CSV, pandas in memory', lambda: in_memory_csv(user)),
+        ):
+            started = time.perf_counter()
+            size = run()
+            elapsed = time.perf_counter() - started
+            rows.append((
+                label, f'{elapsed:.1f}', f'{args.rows / elapsed:,.0f}', f'{size / 1e6:,.0f}', f'{peak_rss_mb():,.0f}',
+            ))
+
+    report(f'Export of {args.rows:,} transactions', rows, ('step', 'seconds', 'rows/s', 'MB', 'peak RSS MB'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Throughput of goals.parsers.parse_goals on synthetic survey answers.
+
+    python -m benchmarks.bench_goal_parser [--count 1000000]
+"""
+import argparse
+import random
+import time
+
+from goals.parsers import parse_goals
+
+NAMES = ['Car', 'Vacation', 'New laptop', 'Emergency fund', 'House down payment',
+         'MBA fees', 'Goa trip', 'iPhone 15', 'Wedding', 'Bike', 'Retirement corpus']
+AMOUNTS = ['500000', '5,00,000', '500,000', '₹75k', 'Rs. 2.5 lakh', '$12,000',
+           '1.2L', '3 lacs', '1 cr', '€4,500.50', '80000/-', '2M']
+DATES = ['by Dec 2026', 'by December 2027', 'before 2026-11', 'by 31/03/2027',
+         'by 09/2027', 'until 15th Aug 2026', 'by March 15, 2030', 'in Jan 27',
+         'by 2028', '']
+
+
+def synthetic_goals(count, seed=0):
+    """Generate ``count`` goals_and_wants strings with 1-4 goals each."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            date = rng.choice(DATES)
+            parts.append(f'{rng.choice(NAMES)}: {rng.choice(AMOUNTS)} {date}'.rstrip())
+        texts.append(rng.choice([', ', '; ', '\n']).join(parts))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    texts = synthetic_goals(args.count)
+    start = time.perf_counter()
+    goals = 0
+    for text in texts:
+        goals += len(parse_goals(text))
+    elapsed = time.perf_counter() - start
+
+    print(f'strings parsed : {args.count:,}')
+    print(f'goals extracted: {goals:,}')
+    print(f'elapsed        : {elapsed:.2f}s')
+    print(f'throughput     : {args.count / elapsed:,.0f} strings/s, {goals / elapsed:,.0f} goals/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Goal projection throughput: vectorised batches vs a per-user loop.
+
+Seeds --users users (80% with a survey profile) and one to four active
+goals each, then times:
+
+* ``compute_projections`` over every user in batches of --batch-size;
+* a plain Python month-by-month simulation per user, the way a view
+  would compute one projection at a time (on a sample, and checked
+  against the vectorised result);
+* ``get_projection`` served from the cache.
+
+    python -m benchmarks.bench_goal_projections --users 100k
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import setup_django, throwaway_database, report, time_per_call, peak_rss_mb
+from benchmarks.fixtures import SEED_SIZES, seed_users
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from accounts.models import UserProfile  # noqa: E402
+from goals.models import Goal  # noqa: E402
+from goals.projections import PRIORITY_RANK, compute_projections, get_projection, months_between  # noqa: E402
+
+TODAY = date(2026, 1, 15)
+HORIZON = 60
+
+
+def seed_goals(user_ids, seed=0, batch_size=50_000):
+    rng = random.Random(seed)
+    goals = []
+    for user_id in user_ids:
+        for _ in range(rng.randint(1, 4)):
+            target = rng.randrange(10_000, 2_000_000, 1_000)
+            goals.append(Goal(
+                user_id=user_id,
+                name='Goal',
+                target_amount=target,
+                current_amount=rng.randrange(0, target // 2 + 1, 500),
+                priority=rng.choice(list(PRIORITY_RANK)),
+                target_date=TODAY + timedelta(days=rng.randrange(30, 2_000)) if rng.random() < 0.7 else None,
+            ))
+        if len(goals) >= batch_size:
+            Goal.objects.bulk_create(goals, batch_size=5_000)
+            goals = []
+    Goal.objects.bulk_create(goals, batch_size=5_000)
+
+
+def naive_projection(user_id):
+    """One user at a time: two queries and a month-by-month loop."""
+    profile = UserProfile.objects.filter(user_id=user_id).first()
+    surplus = 0.0
+    if profile:
+        surplus = max(float(
+            (profile.monthly_income or 0) - (profile.necessary_needs or 0) - (profile.monthly_unwanted_limit or 0)
+        ), 0.0)
+    goals = sorted(
+        Goal.objects.filter(user_id=user_id, status='active'),
+        key=lambda goal: (
+            PRIORITY_RANK[goal.priority],
+            months_between(TODAY, goal.target_date) if goal.target_date else float('inf'),
+            goal.pk,
+        ),
+    )
+    balances = {goal.pk: float(goal.current_amount) for goal in goals}
+    completion = {goal.pk: 0 if goal.current_amount >= goal.target_amount else None for goal in goals}
+    for month in range(1, HORIZON + 1):
+        money = surplus
+        for goal in goals:
+            gap = float(goal.target_amount) - balances[goal.pk]
+            paid = min(money, gap)
+            balances[goal.pk] += paid
+            money -= paid
+            if completion[goal.pk] is None and balances[goal.pk] >= float(goal.target_amount):
+                completion[goal.pk] = month
+    return [(goal.pk, completion[goal.pk], round(balances[goal.pk], 2)) for goal in goals]
+
+
+def completion_index(month):
+    """Months from TODAY to a ``YYYY-MM`` completion month, None past the horizon."""
+    if month is None:
+        return None
+    months = months_between(TODAY, date.fromisoformat(f'{month}-01'))
+    return months if months <= HORIZON else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--users', choices=SEED_SIZES, default='100k')
+    parser.add_argument('--batch-size', type=int, default=5_000)
+    parser.add_argument('--sample', type=int, default=1_000, help='Users timed with the per-user loop.')
+    args = parser.parse_args()
+    count = SEED_SIZES[args.users]
+
+    with throwaway_database():
+        started = time.perf_counter()
+        seed_users(count, '!', onboarded_share=0.8)
+        user_ids = list(get_user_model().objects.order_by('pk').values_list('pk', flat=True))
+        seed_goals(user_ids)
+        goals = Goal.objects.count()
+        print(f'Seeded {count:,} users and {goals:,} goals in {time.perf_counter() - started:.0f}s')
+
+        started = time.perf_counter()
+        for start in range(0, count, args.batch_size):
+            compute_projections(user_ids[start:start + args.batch_size], horizon=HORIZON, today=TODAY)
+        vectorised_s = time.perf_counter() - started
+
+        sample = user_ids[:args.sample]
+        started = time.perf_counter()
+        naive = {user_id: naive_projection(user_id) for user_id in sample}
+        naive_s = (time.perf_counter() - started) * count / len(sample)
+
+        batch = compute_projections(sample, horizon=HORIZON, today=TODAY)
+        for user_id, expected in naive.items():
+            got = [
+                (goal['goal_id'], completion_index(goal['completion_month']), goal['balances'][-1])
+                for goal in batch[user_id]['goals']
+            ]
+            assert got == expected, (user_id, got, expected)
+
+        get_projection(user_ids[0])
+        hit_us = time_per_call(get_projection, user_ids[0], number=10_000, repeat=3)
+
+    report(
+        f'Goal projections, {count:,} users, {HORIZON} months',
+        [
+            (f'vectorised, batches of {args.batch_size:,}', f'{vectorised_s:.1f}', f'{count / vectorised_s:,.0f}'),
+            (f'per-user loop (from {len(sample):,})', f'{naive_s:.1f}', f'{count / naive_s:,.0f}'),
+        ],
+        ('method', 'seconds', 'users/sec'),
+    )
+    print(f'Cached get_projection: {hit_us:.1f} µs; peak RSS {peak_rss_mb():.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Financial health scoring throughput: partitioned bulk runs vs a per-user loop.
+
+Seeds --users users (80% with a survey profile), one to four active goals
+each and three months of category rollups, then times:
+
+* ``compute_health_scores`` in one process and over --workers processes;
+* a run resumed half way (an unfinished run recorded up to the median id);
+* a per-user loop, three queries and a ``save`` per user, the way a view
+  would score one user at a time (on a sample).
+
+    python -m benchmarks.bench_health_scores --users 100k --workers 4
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from benchmarks.common import setup_django, throwaway_database, report, peak_rss_mb
+from benchmarks.fixtures import SEED_SIZES, seed_users
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from accounts.models import UserProfile  # noqa: E402
+from agents.health import compute_health_scores  # noqa: E402
+from agents.models import FinancialHealthScore, HealthScoreRun  # noqa: E402
+from dashboard.models import ExpenseCategory, MonthlyBudget  # noqa: E402
+from goals.models import Goal  # noqa: E402
+
+TODAY = date(2026, 1, 15)
+MONTHS = (date(2025, 10, 1), date(2025, 11, 1), date(2025, 12, 1))
+GOAL_CATEGORIES = ('savings', 'investment', 'debt_payoff', 'travel', 'retirement')
+
+
+def seed_history(user_ids, seed=0, batch_size=50_000):
+    rng = random.Random(seed)
+    categories = [ExpenseCategory.objects.create(name=name) for name in ('Food', 'Rent', 'Travel', 'Shopping')]
+    goals, rollups = [], []
+    for user_id in user_ids:
+        for _ in range(rng.randint(1, 4)):
+            target = rng.randrange(10_000, 2_000_000, 1_000)
+            goals.append(Goal(
+                user_id=user_id, name='Goal', category=rng.choice(GOAL_CATEGORIES),
+                target_amount=target, current_amount=rng.randrange(0, target + 1, 500),
+            ))
+        for month in MONTHS:
+            for category in rng.sample(categories, 3):
+                rollups.append(MonthlyBudget(
+                    user_id=user_id, month=month, category=category,
+                    spent_amount=Decimal(rng.randrange(1_000, 40_000)),
+                    budget_amount=Decimal(20_000) if rng.random() < 0.5 else None,
+                    transaction_count=rng.randint(1, 30),
+                ))
+        if len(rollups) >= batch_size:
+            Goal.objects.bulk_create(goals, batch_size=5_000)
+            MonthlyBudget.objects.bulk_create(rollups, batch_size=5_000)
+            goals, rollups = [], []
+    Goal.objects.bulk_create(goals, batch_size=5_000)
+    MonthlyBudget.objects.bulk_create(rollups, batch_size=5_000)
+
+
+def naive_score(user_id):
+    """One user at a time: profile, rollup and goal queries, then one save."""
+    profile = UserProfile.objects.filter(user_id=user_id).first()
+    if profile is None:
+        return
+    income = float(profile.monthly_income or 0)
+    spent = sum(float(row.spent_amount) for row in MonthlyBudget.objects.filter(user_id=user_id, month__in=MONTHS))
+    goals = list(Goal.objects.filter(user_id=user_id, status='active'))
+    basis = income * len(MONTHS)
+    savings = min(max((basis - spent) / basis / 0.2, 0), 1) if basis else 0
+    owed = sum(float(goal.target_amount - goal.current_amount) for goal in goals if goal.category == 'debt_payoff')
+    debt = 1 - min(max(owed / (12 * income) / 0.5, 0), 1) if income else float(owed == 0)
+    invested = sum(float(goal.current_amount) for goal in goals if goal.category in ('investment', 'retirement'))
+    investment = min(invested / income / 6, 1) if income else 0
+    targeted = sum(float(goal.target_amount) for goal in goals)
+    progress = min(sum(float(goal.current_amount) for goal in goals) / targeted, 1) if targeted else 0
+    FinancialHealthScore.objects.update_or_create(user_id=user_id, scored_on=TODAY, defaults={
+        'score': round(100 * (0.35 * savings + 0.25 * debt + 0.2 * investment + 0.2 * progress)),
+        'savings_health': round(100 * savings), 'debt_health': round(100 * debt),
+        'investment_health': round(100 * investment), 'goal_progress': round(100 * progress),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--users', choices=SEED_SIZES, default='100k')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--partition-size', type=int, default=5_000)
+    parser.add_argument('--sample', type=int, default=1_000, help='Users timed with the per-user loop.')
+    args = parser.parse_args()
+    count = SEED_SIZES[args.users]
+
+    with throwaway_database():
+        started = time.perf_counter()
+        seed_users(count, '!', onboarded_share=0.8)
+        user_ids = list(get_user_model().objects.order_by('pk').values_list('pk', flat=True))
+        seed_history(user_ids)
+        print(f'Seeded {count:,} users, {Goal.objects.count():,} goals and '
+              f'{MonthlyBudget.objects.count():,} rollups in {time.perf_counter() - started:.0f}s')
+
+        results = []
+        for workers in sorted({1, args.workers}):
+            stats = compute_health_scores(workers=workers, partition_size=args.partition_size, scored_on=TODAY)
+            results.append((f'partitioned, {workers} worker(s)', f'{stats.users:,}', f'{stats.elapsed:.1f}',
+                            f'{stats.users_per_second:,.0f}'))
+
+        HealthScoreRun.objects.create(
+            scored_on=TODAY, partition_size=args.partition_size, last_user_id=user_ids[len(user_ids) // 2],
+        )
+        stats = compute_health_scores(workers=args.workers, partition_size=args.partition_size, scored_on=TODAY)
+        results.append(('resumed half way', f'{stats.users:,}', f'{stats.elapsed:.1f}',
+                        f'{stats.users_per_second:,.0f}'))
+
+        sample = user_ids[:args.sample]
+        started = time.perf_counter()
+        for user_id in sample:
+            naive_score(user_id)
+        elapsed = time.perf_counter() - started
+        results.append(('per-user loop (sample)', f'{len(sample):,}', f'{elapsed:.1f}',
+                        f'{len(sample) / elapsed:,.0f}'))
+
+    report(
+        f'Financial health scores, {count:,} users, partitions of {args.partition_size:,} ids',
+        results, ('method', 'users', 'seconds', 'users/sec'),
+    )
+    print(f'Peak RSS {peak_rss_mb():.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Scoring a new batch: incremental baselines vs re-scanning history.
+
+For a user with growing history, times scoring one new batch of --batch
+expenses with agents.incremental (O(batch)) against loading and scoring
+the user's full history with the batch engine.
+
+    python -m benchmarks.bench_incremental_anomalies --batch 1000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from benchmarks.common import setup_django, throwaway_database, report
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from agents.anomalies import frame_from_queryset, load_frame, score_frame  # noqa: E402
+from agents.incremental import rebuild_baselines, score_transactions  # noqa: E402
+from transactions.models import Transaction  # noqa: E402
+
+
+def add_expenses(user, count, start, rng):
+    merchants = [f'merchant {i}' for i in range(50)]
+    objs = Transaction.objects.bulk_create([
+        Transaction(
+            user=user, transaction_date=start + timedelta(days=i // 20),
+            amount=Decimal(f'{rng.lognormal(5, 0.4):.2f}'), description='x',
+            merchant=merchants[rng.integers(50)], transaction_type='expense',
+        )
+        for i in range(count)
+    ], batch_size=5000)
+    return objs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batch', type=int, default=1_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    rows = []
+    with throwaway_database():
+        user = get_user_model().objects.create_user(email='bench@example.com', password='x')
+        history = 0
+        day = date(2020, 1, 1)
+        for target in (1_000, 10_000, 100_000):
+            add_expenses(user, target - history, day, rng)
+            history = target
+            rebuild_baselines([user.pk], load_frame([user.pk]))
+
+            new = add_expenses(user, args.batch, date(2030, 1, 1), rng)
+            started = time.perf_counter()
+            frame = frame_from_queryset(
+                Transaction.objects.filter(pk__in=[t.pk for t in new]).order_by('transaction_date', 'pk')
+            )
+            score_transactions(user.pk, frame)
+            incremental = time.perf_counter() - started
+
+            started = time.perf_counter()
+            score_frame(load_frame([user.pk]))
+            rescan = time.perf_counter() - started
+
+            Transaction.objects.filter(pk__in=[t.pk for t in new]).delete()
+            rows.append((f'{history:,}', f'{incremental * 1000:,.0f}', f'{rescan * 1000:,.0f}'))
+
+    report(f'Scoring a batch of {args.batch:,} new expenses', rows, ('history', 'incremental ms', 'full rescan ms'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Per-request overhead of LoginRequiredMiddleware with 10, 100 and 1000
+exempt patterns.
+
+Compares the original loop-over-regexes check with the compiled trie
+matcher, both uncached and with the per-path LRU cache warm.
+
+Also times PerformanceMiddleware for an unsampled request (sampling on at
+a low rate) and a sampled one; with PERF_SAMPLE_RATE=0 it is not loaded.
+
+    python -m benchmarks.bench_middleware
+"""
+import re
+
+from benchmarks.common import setup_django, time_per_call, report
+
+setup_django()
+
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+
+from finmate.middleware import LoginRequiredMiddleware, PerformanceMiddleware  # noqa: E402
+
+
+class _User:
+    is_authenticated = True
+
+
+def _patterns(count):
+    patterns = []
+    for i in range(count):
+        if i % 10 == 9:
+            # A sprinkling of real regexes that cannot go into the trie.
+            patterns.append(r'^/public/%d/\d+/$' % i)
+        else:
+            patterns.append(r'^/public/section-%d/' % i)
+    return patterns
+
+
+def _legacy_middleware(patterns):
+    """The pre-trie implementation, kept here for comparison."""
+    exempt_urls = [re.compile(url) for url in patterns]
+
+    def check(request):
+        path = request.path
+        for exempt_url in exempt_urls:
+            if exempt_url.match(path):
+                return None
+        if path.startswith('/admin/') or path.startswith('/static/') or path.startswith('/media/'):
+            return None
+        return request.user.is_authenticated
+
+    return check
+
+
+def main():
+    factory = RequestFactory()
+    requests = {
+        'exempt (last pattern)': None,
+        'static file': factory.get('/static/css/style.css'),
+        'protected page': factory.get('/dashboard/'),
+    }
+    rows = []
+    for count in (10, 100, 1000):
+        patterns = _patterns(count)
+        requests['exempt (last pattern)'] = factory.get('/public/section-%d/page/' % (count - 2))
+        for request in requests.values():
+            request.user = _User()
+
+        legacy = _legacy_middleware(patterns)
+        with override_settings(EXEMPT_URLS=patterns, EXEMPT_URLS_CACHE_SIZE=0):
+            uncached = LoginRequiredMiddleware(lambda request: None)
+        with override_settings(EXEMPT_URLS=patterns):
+            cached = LoginRequiredMiddleware(lambda request: None)
+
+        for label, request in requests.items():
+            number = 20_000 if count == 1000 else 100_000
+            rows.append((
+                count,
+                label,
+                '%.2f' % time_per_call(legacy, request, number=number),
+                '%.2f' % time_per_call(uncached, request, number=number),
+                '%.2f' % time_per_call(cached, request, number=number),
+            ))
+
+    report(
+        'LoginRequiredMiddleware overhead per request (us)',
+        rows,
+        ('patterns', 'path', 'legacy loop', 'trie', 'trie+lru'),
+    )
+
+    response = HttpResponse()
+    request = factory.get('/dashboard/')
+    rows = []
+    for label, rate in (('unsampled (rate 1e-9)', 1e-9), ('sampled (rate 1)', 1.0)):
+        with override_settings(PERF_SAMPLE_RATE=rate):
+            middleware = PerformanceMiddleware(lambda request: response)
+        rows.append((label, '%.2f' % time_per_call(middleware, request, number=100_000)))
+    report('PerformanceMiddleware overhead per request (us)', rows, ('request', 'us'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Logins per second by password hasher and hashing service.
+
+For each available hasher, times authenticate() (email lookup plus
+password check) in one thread, which is the per-core rate, then with
+--threads concurrent logins through ProcessPoolHashingService.
+
+    python -m benchmarks.bench_password_hashing --logins 20 --threads 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import setup_django, throwaway_database, report
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import authenticate, get_user_model  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from accounts.hashing import get_hashing_service  # noqa: E402
+
+
+def available_hashers():
+    names = ['pbkdf2', 'scrypt']
+    try:
+        import argon2  # noqa: F401
+        names.append('argon2')
+    except ImportError:
+        pass
+    return names
+
+
+def logins_per_second(count, threads):
+    def login(_):
+        assert authenticate(username='bench@example.com', password='correct horse battery') is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(login, range(count)))
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logins', type=int, default=20, help='Logins per measurement.')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    rows = []
+    with throwaway_database():
+        for name in available_hashers():
+            hashers = [settings.PASSWORD_HASHER_CHOICES[name]]
+            with override_settings(PASSWORD_HASHERS=hashers):
+                get_user_model().objects.all().delete()
+                get_user_model().objects.create_user(email='bench@example.com', password='correct horse battery')
+                inline = logins_per_second(args.logins, 1)
+                with override_settings(
+                    PASSWORD_HASHING_SERVICE='accounts.hashing.ProcessPoolHashingService',
+                    PASSWORD_HASHING_WORKERS=args.workers,
+                ):
+                    get_hashing_service().make_password('warm up the pool')
+                    pooled = logins_per_second(args.logins * 2, args.threads)
+            rows.append((name, f'{inline:,.1f}', f'{pooled:,.1f}'))
+
+    report(
+        f'Logins/sec ({args.workers} hashing workers, {args.threads} request threads)',
+        rows, ('hasher', 'inline, 1 core', 'process pool'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Bulk user provisioning throughput.
+
+Writes a synthetic roster of --users rows (a --password-share of them with
+passwords, every other row with survey fields) and provisions it into a
+throwaway database. Without passwords the cost is the bulk INSERTs; with
+them it is the configured hasher divided over --workers processes.
+
+    python -m benchmarks.bench_provision_users --users 100000 --password-share 0
+    python -m benchmarks.bench_provision_users --users 5000 --workers 8
+"""
+import argparse
+import csv
+import os
+import tempfile
+
+from benchmarks.common import setup_django, throwaway_database, peak_rss_mb, report
+
+setup_django()
+
+from django.contrib.auth.hashers import get_hasher  # noqa: E402
+
+from accounts.provisioning import UserProvisioner  # noqa: E402
+
+
+def write_roster(path, users, password_share):
+    with_password = int(users * password_share)
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['email', 'password', 'first_name', 'monthly_income', 'necessary_needs', 'goals_and_wants'])
+        for i in range(users):
+            survey = ('60000', '25000', 'Laptop: 90000 by Dec 2027') if i % 2 else ('', '', '')
+            writer.writerow([f'student{i}@student.edu', f'Pass-{i}-word!' if i < with_password else '',
+                             f'Student {i}', *survey])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--password-share', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=1_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir, throwaway_database():
+        path = os.path.join(tmpdir, 'roster.csv')
+        write_roster(path, args.users, args.password_share)
+        stats = UserProvisioner(batch_size=args.batch_size, workers=args.workers).provision_file(path)
+
+    report(f'Provisioning {args.users:,} users ({args.password_share:.0%} with passwords, '
+           f'{get_hasher("default").algorithm}, {args.workers} workers)', [
+        ('users', f'{stats.users_created:,}'),
+        ('profiles', f'{stats.profiles_created:,}'),
+        ('goals', f'{stats.goals_created:,}'),
+        ('seconds', f'{stats.elapsed:.1f}'),
+        ('users/s', f'{stats.users_per_second:,.0f}'),
+        ('peak RSS MB', f'{peak_rss_mb():.0f}'),
+    ], ('metric', 'value'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Recurring-payment detection throughput.
+
+Generates --users users with three years of expenses each: a few
+subscriptions (weekly, monthly and yearly, with jitter and price drift)
+among irregular spending, --rows transactions in total. Times:
+
+* ``detect_frame`` on the rows already in memory (the grouping and
+  periodicity maths alone; try --frame-only --rows 10000000);
+* a full ``detect_recurring`` scan, loading from the database and upserting;
+* an incremental scan after one new month of expenses for 1% of users.
+
+    python -m benchmarks.bench_recurring --rows 1000000
+    python -m benchmarks.bench_recurring --frame-only --rows 10000000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import setup_django, throwaway_database, report, peak_rss_mb
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from transactions.models import Transaction, TransactionRecurring  # noqa: E402
+from transactions.recurring import detect_frame, detect_recurring  # noqa: E402
+
+START = date(2022, 12, 1)
+AS_OF = date(2025, 12, 31)
+MERCHANTS = np.array([f'shop {i}' for i in range(400)], dtype=object)
+SUBSCRIPTIONS = (('netflix', 30.44, 649.0), ('gym', 7.0, 300.0), ('insurance', 365.25, 12000.0),
+                 ('spotify', 30.44, 119.0), ('broadband', 30.44, 999.0))
+
+
+def generate(users, rows, seed=0):
+    """Columns for ``rows`` expenses spread over ``users`` user ids (1-based)."""
+    rng = np.random.default_rng(seed)
+    span = (AS_OF - START).days
+    parts = []
+    subscribed = 0
+    for name, period, price in SUBSCRIPTIONS:
+        owners = np.flatnonzero(rng.random(users) < 0.4) + 1
+        payments = int(span // period)
+        user_id = np.repeat(owners, payments)
+        offset = np.tile(np.arange(payments) * period, len(owners)) + rng.integers(0, 3, len(user_id))
+        drift = 1 + 0.02 * np.tile(np.arange(payments) // 12, len(owners))
+        parts.append(pd.DataFrame({
+            'user_id': user_id, 'day': offset.astype(int), 'amount': np.round(price * drift, 2), 'merchant': name,
+        }))
+        subscribed += len(user_id)
+    noise = max(rows - subscribed, 0)
+    parts.append(pd.DataFrame({
+        'user_id': rng.integers(1, users + 1, noise),
+        'day': rng.integers(0, span, noise),
+        'amount': np.round(rng.lognormal(6, 1, noise), 2),
+        'merchant': MERCHANTS[rng.integers(0, len(MERCHANTS), noise)],
+    }))
+    frame = pd.concat(parts, ignore_index=True)
+    frame['transaction_date'] = (np.datetime64(START, 'D') + frame.pop('day').to_numpy()).astype(object)
+    frame['category_id'] = None
+    return frame[['user_id', 'transaction_date', 'amount', 'merchant', 'category_id']]
+
+
+def insert(frame, batch_size=50_000):
+    for start in range(0, len(frame), batch_size):
+        chunk = frame.iloc[start:start + batch_size]
+        Transaction.objects.bulk_create([
+            Transaction(
+                user_id=user_id, transaction_date=day, amount=amount, merchant=merchant,
+                description=merchant, transaction_type='expense',
+            )
+            for user_id, day, amount, merchant, _ in chunk.itertuples(index=False, name=None)
+        ], batch_size=5_000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, help='Default: one per 500 rows.')
+    parser.add_argument('--batch-size', type=int, default=1_000)
+    parser.add_argument('--frame-only', action='store_true', help='Skip the database scans.')
+    args = parser.parse_args()
+    users = args.users or max(args.rows // 500, 1)
+
+    frame = generate(users, args.rows)
+    started = time.perf_counter()
+    found = detect_frame(frame, AS_OF)
+    frame_s = time.perf_counter() - started
+    results = [('detect_frame (in memory)', f'{len(frame):,}', f'{frame_s:.1f}', f'{len(frame) / frame_s:,.0f}')]
+    print(f'{len(found):,} recurring payments in {len(frame):,} rows; peak RSS {peak_rss_mb():.0f} MB')
+
+    if not args.frame_only:
+        with throwaway_database():
+            get_user_model().objects.bulk_create(
+                [get_user_model()(email=f'user{i}@example.com', password='!') for i in range(users)], batch_size=5_000,
+            )
+            started = time.perf_counter()
+            insert(frame)
+            print(f'Loaded {len(frame):,} rows in {time.perf_counter() - started:.0f}s')
+
+            stats = detect_recurring(batch_size=args.batch_size)
+            results.append(('full scan', f'{stats.transactions:,}', f'{stats.elapsed:.1f}',
+                            f'{stats.transactions_per_second:,.0f}'))
+
+            last_month = AS_OF - timedelta(days=31)
+            touched = frame[(frame['user_id'] % 100 == 0) & (frame['transaction_date'] > last_month)].copy()
+            touched['transaction_date'] = [day + timedelta(days=31) for day in touched['transaction_date']]
+            insert(touched)
+            stats = detect_recurring(incremental=True, batch_size=args.batch_size)
+            results.append(('incremental scan', f'{stats.transactions:,}', f'{stats.elapsed:.1f}',
+                            f'{stats.transactions_per_second:,.0f}'))
+            print(f'{TransactionRecurring.objects.count():,} recurring rows stored')
+
+    report(f'Recurring detection, {users:,} users', results, ('method', 'rows', 'seconds', 'rows/sec'))
+
+
+if __name__ == '__main__':
+    main()
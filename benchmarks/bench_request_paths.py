@@ -0,0 +1,214 @@
+"""
+Latency of the auth and onboarding request paths.
+
+Seeds a throwaway database with --users accounts (1k, 100k or 1m, see
+benchmarks.fixtures.seed_users), then drives each path through the Django
+test client and the full middleware stack:
+
+* signup: POST /accounts/signup/ with a new email;
+* login: POST /accounts/login/ for a seeded user;
+* login redirect: anonymous GET / bounced by LoginRequiredMiddleware;
+* survey GET / survey POST: onboarding form for a new user;
+* dashboard: GET / for an onboarded user with a month of transactions
+  (fragment cache warm after the first request).
+
+Reports p50/p95/p99 latency, queries per request and the peak Python
+memory allocated while handling one request (a separate tracemalloc pass,
+so tracing does not skew the latencies). --json writes the results for
+later runs to --compare against.
+
+    python -m benchmarks.bench_request_paths --users 100k --requests 200 --json before.json
+    python -m benchmarks.bench_request_paths --users 100k --requests 200 --compare before.json
+"""
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from benchmarks.common import setup_django, throwaway_database, report
+from benchmarks.fixtures import SEED_SIZES, seed_users
+
+setup_django()
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from finmate.perf import RequestTimings  # noqa: E402
+from transactions.models import Transaction  # noqa: E402
+
+PASSWORD = 'correct horse battery staple'
+SURVEY = {
+    'monthly_income': '50000',
+    'necessary_needs': '30000',
+    'goals_and_wants': 'Car: 500000 by Dec 2030, Vacation: 100000 by Jul 2030',
+    'monthly_unwanted_limit': '5000',
+}
+
+
+class Scenario:
+    """One request path: ``prepare()`` runs untimed before each ``request()``."""
+
+    def __init__(self, name, request, prepare=None, expect=(200, 302)):
+        self.name = name
+        self.request = request
+        self.prepare = prepare or (lambda: None)
+        self.expect = expect
+
+
+def build_scenarios(seeded):
+    User = get_user_model()
+    counter = itertools.count()
+    anonymous, member, newcomer = Client(), Client(), Client()
+
+    member_user = User.objects.create_user(email='member@example.com', password=PASSWORD, onboarding_completed=True)
+    today = date.today()
+    Transaction.objects.bulk_create([
+        Transaction(
+            user=member_user, transaction_date=today.replace(day=1 + i % 28), amount=Decimal('100') + i,
+            description=f'UPI/SHOP {i % 15}', transaction_type='expense',
+        )
+        for i in range(100)
+    ])
+    member.force_login(member_user)
+
+    def new_user():
+        user = User.objects.create_user(email=f'new{next(counter)}@example.com')
+        newcomer.force_login(user)
+
+    def signup():
+        email = f'signup{next(counter)}@example.com'
+        return Client().post('/accounts/signup/', {'email': email, 'password1': PASSWORD, 'password2': PASSWORD})
+
+    login_email = f'seed{seeded // 2}@example.com' if seeded else 'member@example.com'
+
+    return [
+        Scenario('signup', signup),
+        Scenario('login', lambda: Client().post('/accounts/login/', {'username': login_email, 'password': PASSWORD})),
+        Scenario('login redirect', lambda: anonymous.get('/'), expect=(302,)),
+        Scenario('survey GET', lambda: newcomer.get('/accounts/survey/'), prepare=new_user, expect=(200,)),
+        Scenario('survey POST', lambda: newcomer.post('/accounts/survey/', SURVEY), prepare=new_user, expect=(302,)),
+        Scenario('dashboard', lambda: member.get('/'), expect=(200,)),
+    ]
+
+
+def measure(scenario, requests, warmup):
+    latencies, queries = [], []
+    for i in range(warmup + requests):
+        scenario.prepare()
+        timings = RequestTimings()
+        with connection.execute_wrapper(timings):
+            started = time.perf_counter()
+            response = scenario.request()
+            elapsed = time.perf_counter() - started
+        if response.status_code not in scenario.expect:
+            raise RuntimeError(f'{scenario.name}: unexpected status {response.status_code}')
+        if i >= warmup:
+            latencies.append(elapsed * 1000)
+            queries.append(timings.queries)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(requests, 20)):
+            scenario.prepare()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            scenario.request()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'requests': requests,
+        'p50_ms': round(cuts[49], 3),
+        'p95_ms': round(cuts[94], 3),
+        'p99_ms': round(cuts[98], 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'queries': round(statistics.fmean(queries), 2),
+        'peak_alloc_kb': round(statistics.median(peaks) / 1024, 1),
+    }
+
+
+def environment(users):
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'password_hasher': settings.PASSWORD_HASHERS[0].rsplit('.', 1)[-1],
+        'users': users,
+    }
+
+
+def parse_users(value):
+    return SEED_SIZES.get(value.lower()) or int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--users', type=parse_users, default='1k', help='Seeded users: 1k, 100k, 1m or a number.')
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per path.')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--only', nargs='+', help='Run only these paths (by name).')
+    parser.add_argument('--json', help='Write the results to this file.')
+    parser.add_argument('--compare', help='Show p50/p95 changes against an earlier --json file.')
+    args = parser.parse_args()
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+
+    with throwaway_database():
+        started = time.perf_counter()
+        seed_users(args.users, make_password(PASSWORD))
+        seeded_in = time.perf_counter() - started
+        results = {}
+        for scenario in build_scenarios(args.users):
+            if args.only and scenario.name not in args.only:
+                continue
+            results[scenario.name] = measure(scenario, args.requests, args.warmup)
+        env = environment(args.users)
+
+    rows = [
+        (name, f"{r['p50_ms']:.2f}", f"{r['p95_ms']:.2f}", f"{r['p99_ms']:.2f}", f"{r['queries']:g}",
+         f"{r['peak_alloc_kb']:,.0f}")
+        for name, r in results.items()
+    ]
+    report(
+        f"Request paths, {args.users:,} users (seeded in {seeded_in:.0f}s), {env['password_hasher']}",
+        rows, ('path', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'alloc KB'),
+    )
+
+    if args.compare:
+        with open(args.compare) as handle:
+            before = json.load(handle)['results']
+        rows = [
+            (name, f"{before[name]['p50_ms'] / r['p50_ms']:.2f}x", f"{before[name]['p95_ms'] / r['p95_ms']:.2f}x",
+             f"{before[name]['queries']:g} -> {r['queries']:g}")
+            for name, r in results.items() if name in before
+        ]
+        report(f'Speed-up against {args.compare}', rows, ('path', 'p50', 'p95', 'queries'))
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'environment': env, 'results': results}, handle, indent=2)
+        print(f'Wrote {args.json}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Dashboard monthly totals: raw aggregate over transactions vs the rollup.
+
+Loads --rows transactions spread over --users users and 24 months, builds
+the rollup with rebuild_for_users, then times one user's monthly totals
+both ways. The raw aggregate grows with the user's history; the rollup
+read stays at a handful of rows per month.
+
+    python -m benchmarks.bench_rollups --rows 100000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks.common import setup_django, throwaway_database, report, time_per_call
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db.models import Count, Q, Sum  # noqa: E402
+
+from dashboard.models import ExpenseCategory, MonthlyBudget  # noqa: E402
+from dashboard.rollups import rebuild_for_users  # noqa: E402
+from transactions.models import Transaction  # noqa: E402
+
+MONTH = date(2025, 6, 1)
+
+
+def load(users, rows, categories):
+    rng = random.Random(7)
+    start = date(2024, 7, 1)
+    batch = []
+    for i in range(rows):
+        batch.append(Transaction(
+            user=users[i % len(users)],
+            transaction_date=start + timedelta(days=rng.randrange(730)),
+            amount=Decimal(rng.randrange(100, 500_000)) / 100,
+            description='bench',
+            transaction_type='income' if rng.random() < 0.1 else 'expense',
+            category=rng.choice(categories),
+        ))
+        if len(batch) == 10_000:
+            Transaction.objects.bulk_create(batch)
+            batch = []
+    Transaction.objects.bulk_create(batch)
+
+
+def raw_totals(user):
+    end = date(MONTH.year + MONTH.month // 12, MONTH.month % 12 + 1, 1)
+    return Transaction.objects.filter(user=user, transaction_date__gte=MONTH, transaction_date__lt=end).aggregate(
+        spent=Sum('amount', filter=Q(transaction_type='expense')),
+        income=Sum('amount', filter=Q(transaction_type='income')),
+        count=Count('pk'),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--users', type=int, default=1)
+    args = parser.parse_args()
+
+    with throwaway_database():
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            [User(email=f'bench{i}@example.com') for i in range(args.users)]
+        )
+        categories = [None] + [ExpenseCategory.objects.create(name=f'Category {i}') for i in range(8)]
+        load(users, args.rows, categories)
+
+        started = time.perf_counter()
+        rebuild_for_users([user.pk for user in users])
+        rebuild = time.perf_counter() - started
+
+        user = users[0]
+        raw = raw_totals(user)
+        rolled = MonthlyBudget.objects.totals_for(user, MONTH)
+        assert (raw['spent'], raw['income'], raw['count']) == (rolled['spent'], rolled['income'], rolled['count'])
+
+        raw_us = time_per_call(raw_totals, user, number=200)
+        rollup_us = time_per_call(MonthlyBudget.objects.totals_for, user, MONTH, number=200)
+
+    report(f'Monthly totals, {args.rows:,} transactions / {args.users} users', [
+        ('raw aggregate', f'{raw_us:,.0f}'),
+        ('rollup', f'{rollup_us:,.0f}'),
+        ('speed-up', f'{raw_us / rollup_us:.1f}x'),
+        ('rebuild (s)', f'{rebuild:.2f}'),
+        ('rebuild rows/s', f'{args.rows / rebuild:,.0f}'),
+    ], ('query', 'us/call'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Session cost per request under each SESSION_PROFILE, and expired-session purges.
+
+For every engine in ``settings.SESSION_ENGINE_CHOICES``, a logged-in
+session is:
+
+* read as an authenticated request does (a fresh store, one key looked up);
+* written as a request that modifies its session does (load, set, save);
+
+with the time and database queries of each and the cookie size. The cache
+engines use the ``default`` cache: locmem here, Redis when REDIS_URL is set.
+
+Then --expired expired sessions are deleted, once with one statement
+(what ``clearsessions`` does for the db engine) and once with
+``purge_expired_sessions`` in --batch-size batches; the longest statement
+is roughly how long other writers wait.
+
+    python -m benchmarks.bench_sessions --expired 500000
+"""
+import argparse
+import itertools
+import time
+from datetime import timedelta
+from importlib import import_module
+
+from benchmarks.common import setup_django, throwaway_database, report, time_per_call
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY  # noqa: E402
+from django.contrib.sessions.models import Session  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from finmate.sessions import purge_expired_sessions  # noqa: E402
+
+LOGIN = {SESSION_KEY: '42', BACKEND_SESSION_KEY: settings.AUTHENTICATION_BACKENDS[0], HASH_SESSION_KEY: 'a' * 64}
+
+
+def measure_engine(engine, number):
+    store_class = import_module(engine).SessionStore
+    store = store_class()
+    store.update(LOGIN)
+    store.save()
+    key = store.session_key
+    counter = itertools.count()
+
+    def read():
+        return store_class(key).get(SESSION_KEY)
+
+    def write():
+        session = store_class(key)
+        session['last_seen'] = next(counter)
+        session.save()
+
+    costs = []
+    for operation in (read, write):
+        operation()  # warm
+        with CaptureQueriesContext(connection) as queries:
+            operation()
+        costs.append((time_per_call(operation, number=number, repeat=3), len(queries)))
+    return costs, len(key)
+
+
+def seed_expired(count, live, batch_size=20_000):
+    now = timezone.now()
+    for start in range(0, count + live, batch_size):
+        Session.objects.bulk_create([
+            Session(
+                session_key=f'bench{i:032d}', session_data='x' * 200,
+                expire_date=now - timedelta(minutes=i + 1) if i < count else now + timedelta(days=1),
+            )
+            for i in range(start, min(start + batch_size, count + live))
+        ], batch_size=5_000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--number', type=int, default=2_000, help='Reads and writes timed per engine.')
+    parser.add_argument('--expired', type=int, default=200_000)
+    parser.add_argument('--live', type=int, default=20_000)
+    parser.add_argument('--batch-size', type=int, default=5_000)
+    args = parser.parse_args()
+
+    with throwaway_database():
+        rows = []
+        for profile, engine in settings.SESSION_ENGINE_CHOICES.items():
+            ((read_us, read_queries), (write_us, write_queries)), cookie = measure_engine(engine, args.number)
+            rows.append((profile, f'{read_us:.1f}', read_queries, f'{write_us:.1f}', write_queries, cookie))
+        report(
+            f"Session cost per request ({settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]} cache)",
+            rows, ('profile', 'read µs', 'read queries', 'write µs', 'write queries', 'cookie bytes'),
+        )
+
+        seed_expired(args.expired, args.live)
+        started = time.perf_counter()
+        Session.objects.filter(expire_date__lt=timezone.now()).delete()
+        single = time.perf_counter() - started
+        seed_expired(args.expired, 0)
+        stats = purge_expired_sessions(batch_size=args.batch_size)
+        assert not Session.objects.filter(expire_date__lt=timezone.now()).exists()
+
+    report(
+        f'Deleting {args.expired:,} expired of {args.expired + args.live:,} sessions',
+        [
+            ('one statement', 1, f'{single:.2f}', f'{single * 1000:.0f}', f'{args.expired / single:,.0f}'),
+            (f'batches of {args.batch_size:,}', stats.batches, f'{stats.elapsed:.2f}',
+             f'{stats.longest_batch * 1000:.0f}', f'{stats.deleted_per_second:,.0f}'),
+        ],
+        ('method', 'statements', 'seconds', 'longest ms', 'sessions/sec'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Re-import cost of overlapping statements over an already-loaded account.
+
+Loads a synthetic statement of --rows lines, then re-imports prefixes of
+it (N/4, N/2, N rows, all duplicates). With indexed fingerprint lookups per
+batch the re-import time should grow linearly with the statement size,
+independent of how much history is already stored.
+
+    python -m benchmarks.bench_statement_dedup --rows 500000
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import setup_django, throwaway_database, report
+from benchmarks.fixtures import write_statement_csv
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from transactions.importers import StatementImporter  # noqa: E402
+from transactions.models import BankAccount  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500_000)
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir, throwaway_database():
+        user = get_user_model().objects.create_user(email='bench@example.com', password='x')
+        account = BankAccount.objects.create(user=user, account_name='Bench')
+        importer = StatementImporter(user, account)
+
+        full = os.path.join(tmpdir, 'full.csv')
+        write_statement_csv(full, args.rows)
+        stats = importer.import_file(full)
+        rows.append(('initial load', f'{stats.rows_read:,}', stats.rows_imported, f'{stats.elapsed:.1f}',
+                     f'{stats.rows_per_second:,.0f}'))
+
+        for size in (args.rows // 4, args.rows // 2, args.rows):
+            path = os.path.join(tmpdir, f'prefix-{size}.csv')
+            write_statement_csv(path, size)
+            stats = importer.import_file(path)
+            rows.append(('re-import', f'{stats.rows_read:,}', stats.rows_imported, f'{stats.elapsed:.1f}',
+                         f'{stats.rows_per_second:,.0f}'))
+
+    report('Overlapping statement re-import', rows, ('run', 'rows', 'inserted', 'seconds', 'rows/s'))
+
+
+if __name__ == '__main__':
+    main()
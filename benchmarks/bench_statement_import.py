@@ -0,0 +1,57 @@
+"""
+Streaming statement import: throughput and peak RSS.
+
+Generates a synthetic statement (unless --path is given) and imports it
+into a throwaway database.
+
+    python -m benchmarks.bench_statement_import --rows 1000000
+    python -m benchmarks.bench_statement_import --rows 100000 --format xlsx
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import setup_django, throwaway_database, peak_rss_mb
+from benchmarks.fixtures import write_statement_csv, write_statement_xlsx
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from transactions.importers import StatementImporter  # noqa: E402
+from transactions.models import BankAccount  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=('csv', 'xlsx'), default='csv')
+    parser.add_argument('--path', help='Import an existing statement instead of generating one.')
+    parser.add_argument('--chunk-size', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = args.path
+        if path is None:
+            path = os.path.join(tmpdir, f'statement.{args.format}')
+            writer = write_statement_csv if args.format == 'csv' else write_statement_xlsx
+            writer(path, args.rows)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        rss_before = peak_rss_mb()
+
+        with throwaway_database():
+            user = get_user_model().objects.create_user(email='bench@example.com', password='x')
+            account = BankAccount.objects.create(user=user, account_name='Bench')
+            importer = StatementImporter(user, account, chunk_size=args.chunk_size, batch_size=args.batch_size)
+            stats = importer.import_file(path)
+
+    print(f'file            : {path} ({size_mb:.1f} MB)')
+    print(f'rows read       : {stats.rows_read:,} ({stats.rows_skipped:,} skipped)')
+    print(f'elapsed         : {stats.elapsed:.1f}s')
+    print(f'throughput      : {stats.rows_per_second:,.0f} rows/s')
+    print(f'peak RSS        : {peak_rss_mb():.0f} MB (before import: {rss_before:.0f} MB)')
+
+
+if __name__ == '__main__':
+    main()
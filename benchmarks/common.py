@@ -0,0 +1,64 @@
+"""Shared helpers for the benchmark scripts."""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def setup_django():
+    """Configure Django so benchmarks can import models and settings."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finmate.settings')
+    import django
+    from django.conf import settings
+    django.setup()
+    # Measure production behaviour: no SQL logging or debug pages.
+    settings.DEBUG = False
+
+
+@contextmanager
+def throwaway_database(path=None):
+    """
+    Create a migrated scratch database for the duration of the block.
+
+    SQLite databases are created on disk (in a temp dir unless ``path`` is
+    given) so that large benchmarks do not inflate the process RSS.
+    """
+    from django.db import connection
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if connection.vendor == 'sqlite':
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = str(path or Path(tmpdir) / 'bench.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield connection
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def time_per_call(func, *args, number=100_000, repeat=5):
+    """Return the best-of-``repeat`` wall time per call, in microseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+def report(title, rows, headers):
+    """Print a small fixed-width results table."""
+    print(title)
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(c).rjust(w) for c, w in zip(row, widths)))
+    print()
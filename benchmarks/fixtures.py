@@ -0,0 +1,119 @@
+"""
+Synthetic data for the benchmarks: bank statements for the import
+benchmarks, and a user table (with survey profiles) for the request-path
+benchmarks.
+
+    python -m benchmarks.fixtures statement.csv --rows 1000000
+    python -m benchmarks.fixtures statement.xlsx --rows 100000
+"""
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+
+MERCHANTS = [
+    'SWIGGY', 'ZOMATO', 'AMAZON PAY', 'FLIPKART', 'UBER INDIA', 'OLA CABS', 'BIGBASKET',
+    'NETFLIX', 'SPOTIFY', 'AIRTEL PREPAID', 'BESCOM', 'HP PETROL PUMP', 'DMART',
+    'APOLLO PHARMACY', 'IRCTC', 'MAKEMYTRIP', 'BOOKMYSHOW', 'STARBUCKS',
+]
+HEADER = ['Txn Date', 'Narration', 'Withdrawal Amt.', 'Deposit Amt.', 'Closing Balance']
+SEED_SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def statement_rows(rows, seed=0, start=date(2020, 1, 1)):
+    """Yield ``rows`` statement lines (date, narration, debit, credit, balance)."""
+    rng = random.Random(seed)
+    balance = 100_000.0
+    day = start
+    for i in range(rows):
+        if rng.random() < 0.3:
+            day += timedelta(days=1)
+        if rng.random() < 0.05:
+            amount = round(rng.uniform(20_000, 90_000), 2)
+            balance += amount
+            yield day, f'NEFT CR SALARY ACME CORP {i}', '', f'{amount:.2f}', f'{balance:.2f}'
+        else:
+            merchant = rng.choice(MERCHANTS)
+            amount = round(rng.lognormvariate(6, 1.1), 2)
+            balance -= amount
+            yield day, f'UPI/{rng.randrange(10**11, 10**12)}/{merchant}/PAYMENT', f'{amount:,.2f}', '', f'{balance:.2f}'
+
+
+def write_statement_csv(path, rows, seed=0):
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(HEADER)
+        for day, narration, debit, credit, balance in statement_rows(rows, seed):
+            writer.writerow((day.strftime('%d/%m/%Y'), narration, debit, credit, balance))
+
+
+def write_statement_xlsx(path, rows, seed=0):
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Statement')
+    sheet.append(['Account statement'])
+    sheet.append(HEADER)
+    for day, narration, debit, credit, balance in statement_rows(rows, seed):
+        sheet.append([day, narration, debit or None, credit or None, float(balance)])
+    workbook.save(path)
+
+
+def seed_users(count, password_hash, onboarded_share=0.8, batch_size=20_000, seed=0):
+    """
+    Insert ``count`` users named ``seed{i}@example.com`` sharing one password hash.
+
+    An ``onboarded_share`` of them have completed the survey and get a
+    profile. Needs Django set up and a (throwaway) database. Returns the
+    number of users inserted.
+    """
+    from decimal import Decimal
+
+    from django.contrib.auth import get_user_model
+
+    from accounts.models import UserProfile
+
+    User = get_user_model()
+    rng = random.Random(seed)
+    for start in range(0, count, batch_size):
+        stop = min(start + batch_size, count)
+        onboarded = [rng.random() < onboarded_share for _ in range(start, stop)]
+        users = User.objects.bulk_create(
+            [
+                User(email=f'seed{i}@example.com', password=password_hash, onboarding_completed=done)
+                for i, done in zip(range(start, stop), onboarded)
+            ],
+            batch_size=5_000,
+        )
+        income = [Decimal(rng.randrange(20_000, 200_000)) for _ in users]
+        UserProfile.objects.bulk_create(
+            [
+                UserProfile(
+                    user_id=user.pk,
+                    monthly_income=amount,
+                    necessary_needs=amount * Decimal('0.5'),
+                    monthly_unwanted_limit=amount * Decimal('0.1'),
+                )
+                for user, done, amount in zip(users, onboarded, income)
+                if done
+            ],
+            batch_size=5_000,
+        )
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if str(args.path).endswith('.xlsx'):
+        write_statement_xlsx(args.path, args.rows, args.seed)
+    else:
+        write_statement_csv(args.path, args.rows, args.seed)
+    print(f'Wrote {args.rows:,} rows to {args.path}')
+
+
+if __name__ == '__main__':
+    main()
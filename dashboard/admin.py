@@ -1,3 +1,27 @@
 from django.contrib import admin
+from .models import CategoryRule, ExpenseCategory, MonthlyBudget
 
-# Register your models here.
+
+@admin.register(ExpenseCategory)
+class ExpenseCategoryAdmin(admin.ModelAdmin):
+	model = ExpenseCategory
+	list_display = ('name', 'icon', 'color', 'is_default', 'user')
+	list_filter = ('is_default',)
+	search_fields = ('name',)
+
+
+@admin.register(CategoryRule)
+class CategoryRuleAdmin(admin.ModelAdmin):
+	model = CategoryRule
+	list_display = ('keyword', 'category', 'priority', 'user', 'updated_at')
+	search_fields = ('keyword', 'category__name', 'user__email')
+	raw_id_fields = ('user',)
+
+
+@admin.register(MonthlyBudget)
+class MonthlyBudgetAdmin(admin.ModelAdmin):
+	model = MonthlyBudget
+	list_display = ('user', 'month', 'category', 'budget_amount', 'spent_amount', 'income_amount', 'transaction_count')
+	list_filter = ('month',)
+	search_fields = ('user__email',)
+	readonly_fields = ('spent_amount', 'income_amount', 'transaction_count', 'updated_at')
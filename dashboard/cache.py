@@ -0,0 +1,146 @@
+"""
+Per-user fragment cache for the dashboard widgets.
+
+Each widget is rendered once per user and data version. The version is a
+counter in the shared cache that is bumped whenever something shown on the
+dashboard changes (profile, transactions, goals; see ``dashboard.signals``
+and ``dashboard.rollups``), so stale fragments are simply never looked up
+again and expire on their own.
+
+The backend is the Django cache named by ``DASHBOARD_CACHE_ALIAS`` (locmem
+by default, Redis when ``REDIS_URL`` is configured).
+
+``arender_fragments`` is the async counterpart for async views: the
+loaders of all missing widgets are awaited together.
+"""
+import asyncio
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from finmate.perf import record_cache
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def _version_key(user_id):
+    return f'dashboard:data-version:{user_id}'
+
+
+def get_data_version(user_id):
+    """Return the user's dashboard data version, creating one if missing."""
+    cache = _cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # Timestamp seed: an evicted counter never restarts at an old value.
+        cache.add(_version_key(user_id), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+async def aget_data_version(user_id):
+    cache = _cache()
+    version = await cache.aget(_version_key(user_id))
+    if version is None:
+        await cache.aadd(_version_key(user_id), time.time_ns(), timeout=None)
+        version = await cache.aget(_version_key(user_id))
+    return version
+
+
+def _bump(user_id):
+    cache = _cache()
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), time.time_ns(), timeout=None)
+
+
+def bump_data_version(user_id, using=None):
+    """
+    Invalidate a user's cached fragments, now and again on commit so a
+    concurrent reader cannot cache pre-commit data under the new version.
+    """
+    _bump(user_id)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: _bump(user_id), using=using)
+
+
+def render_fragments(user, widgets, **extra_key):
+    """
+    Render ``widgets`` for ``user`` through the fragment cache.
+
+    ``widgets`` is a sequence of ``(name, template, context_loader)`` where
+    ``context_loader(user)`` builds the template context on a miss. Extra
+    keyword arguments become part of the cache key (e.g. the current month).
+    Returns ``(fragments, hits, misses)`` with ``fragments`` keyed by name.
+    """
+    cache = _cache()
+    keys = _fragment_keys(user.pk, get_data_version(user.pk), widgets, extra_key)
+    cached = cache.get_many(keys.values())
+
+    fragments, missing = {}, {}
+    for name, template, loader in widgets:
+        html = cached.get(keys[name])
+        if html is None:
+            html = render_to_string(template, loader(user))
+            missing[keys[name]] = str(html)
+        fragments[name] = mark_safe(html)
+    if missing:
+        cache.set_many(missing, timeout=getattr(settings, 'DASHBOARD_CACHE_TTL', 3600))
+    return fragments, *_record(len(widgets), len(missing))
+
+
+async def arender_fragments(user, widgets, **extra_key):
+    """
+    :func:`render_fragments` for async views, with coroutine loaders; the
+    loaders of every missing widget run concurrently.
+    """
+    cache = _cache()
+    keys = _fragment_keys(user.pk, await aget_data_version(user.pk), widgets, extra_key)
+    cached = await cache.aget_many(keys.values())
+
+    stale = [(name, template, loader) for name, template, loader in widgets if keys[name] not in cached]
+    contexts = await asyncio.gather(*(loader(user) for _, _, loader in stale))
+    missing = {}
+    for (name, template, _), context in zip(stale, contexts):
+        missing[keys[name]] = str(render_to_string(template, context))
+    if missing:
+        await cache.aset_many(missing, timeout=getattr(settings, 'DASHBOARD_CACHE_TTL', 3600))
+    html = {**cached, **missing}
+    fragments = {name: mark_safe(html[keys[name]]) for name, _, _ in widgets}
+    return fragments, *_record(len(widgets), len(missing))
+
+
+def _fragment_keys(user_id, version, widgets, extra_key):
+    suffix = ':'.join(f'{key}={value}' for key, value in sorted(extra_key.items()))
+    return {name: f'dashboard:fragment:{name}:{user_id}:{version}:{suffix}' for name, _, _ in widgets}
+
+
+def _record(total, misses):
+    hits = total - misses
+    record_cache(hits, misses)
+    with _stats_lock:
+        _stats['hits'] += hits
+        _stats['misses'] += misses
+    return hits, misses
+
+
+def fragment_cache_stats():
+    """Return this process's ``{'hits': n, 'misses': n}`` counters."""
+    with _stats_lock:
+        return {'hits': _stats['hits'], 'misses': _stats['misses']}
+
+
+def reset_fragment_cache_stats():
+    with _stats_lock:
+        _stats.clear()
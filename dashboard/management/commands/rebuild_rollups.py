@@ -0,0 +1,45 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.rollups import rebuild_for_users
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly spending rollups from transactions, in batches of users."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild this user (email).')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Users recomputed per transaction (default: 500).',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.for_email(options['user'])
+            if not users.exists():
+                raise CommandError(f"No user with email '{options['user']}'")
+
+        started = time.perf_counter()
+        total_users = total_transactions = 0
+        batch = []
+        for user_id in users.values_list('pk', flat=True).iterator(chunk_size=batch_size):
+            batch.append(user_id)
+            if len(batch) >= batch_size:
+                total_transactions += rebuild_for_users(batch)
+                total_users += len(batch)
+                batch = []
+        if batch:
+            total_transactions += rebuild_for_users(batch)
+            total_users += len(batch)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt rollups for {total_users} users from {total_transactions} transactions in {elapsed:.1f}s.'
+        ))
@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-17 21:10
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('icon', models.CharField(blank=True, max_length=100)),
+                ('color', models.CharField(blank=True, help_text='Hex colour, e.g. #10b981', max_length=7)),
+                ('is_default', models.BooleanField(default=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='expense_categories', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Expense Category',
+                'verbose_name_plural': 'Expense Categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyBudget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('budget_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('spent_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('income_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_budgets', to='dashboard.expensecategory')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_budgets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Monthly Budget',
+                'verbose_name_plural': 'Monthly Budgets',
+                'indexes': [models.Index(fields=['user', 'month'], name='dashboard_m_user_id_d1c6ba_idx')],
+                'constraints': [models.UniqueConstraint(models.F('user'), models.F('month'), django.db.models.functions.comparison.Coalesce('category', 0), name='unique_monthly_budget_user_month_category')],
+            },
+        ),
+    ]
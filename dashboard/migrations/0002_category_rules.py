@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-17 22:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('keyword', models.CharField(help_text="Words to look for, e.g. 'swiggy' or 'electricity bill'", max_length=100)),
+                ('priority', models.SmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rules', to='dashboard.expensecategory')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='category_rules', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Category Rule',
+                'verbose_name_plural': 'Category Rules',
+                'indexes': [models.Index(fields=['user', 'updated_at'], name='dashboard_c_user_id_f2d966_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,127 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 
-# Create your models here.
+
+class ExpenseCategory(models.Model):
+    """Spending category; defaults are shared, custom ones belong to a user."""
+    name = models.CharField(max_length=50)
+    icon = models.CharField(max_length=100, blank=True)
+    color = models.CharField(max_length=7, blank=True, help_text="Hex colour, e.g. #10b981")
+    is_default = models.BooleanField(default=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='expense_categories'
+    )
+
+    class Meta:
+        verbose_name = "Expense Category"
+        verbose_name_plural = "Expense Categories"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class CategoryRule(models.Model):
+    """
+    Keyword rule for categorising transactions.
+
+    A transaction whose normalised merchant and description contain
+    ``keyword`` as whole words gets ``category`` (see
+    ``transactions.categoriser``). Rules without a user apply to everyone;
+    a user's own rules win over the defaults, then higher ``priority``,
+    then longer keywords.
+    """
+    keyword = models.CharField(max_length=100, help_text="Words to look for, e.g. 'swiggy' or 'electricity bill'")
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.CASCADE, related_name='rules')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='category_rules'
+    )
+    priority = models.SmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Category Rule"
+        verbose_name_plural = "Category Rules"
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.keyword} -> {self.category}"
+
+
+class MonthlyBudgetManager(models.Manager):
+
+    def _totals(self):
+        return {
+            'spent': Coalesce(Sum('spent_amount'), 0, output_field=models.DecimalField()),
+            'income': Coalesce(Sum('income_amount'), 0, output_field=models.DecimalField()),
+            'count': Coalesce(Sum('transaction_count'), 0),
+        }
+
+    def totals_for(self, user, month):
+        """
+        Return ``{'spent', 'income', 'count'}`` for one user-month.
+
+        One indexed query over the (user, month) rollup rows, however many
+        transactions the month has.
+        """
+        return self.filter(user=user, month=month).aggregate(**self._totals())
+
+    async def atotals_for(self, user, month):
+        return await self.filter(user=user, month=month).aaggregate(**self._totals())
+
+
+class MonthlyBudget(models.Model):
+    """
+    Per-user, per-month, per-category rollup of transactions.
+
+    ``spent_amount``, ``income_amount`` and ``transaction_count`` are
+    maintained incrementally from transaction changes (see
+    ``dashboard.rollups``) and can be rebuilt with ``rebuild_rollups``.
+    ``budget_amount`` is user-set and never touched by rollup maintenance.
+    A NULL category holds uncategorised transactions.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_budgets')
+    month = models.DateField(help_text="First day of the month")
+    category = models.ForeignKey(
+        ExpenseCategory,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='monthly_budgets'
+    )
+    budget_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    spent_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    income_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = MonthlyBudgetManager()
+
+    class Meta:
+        verbose_name = "Monthly Budget"
+        verbose_name_plural = "Monthly Budgets"
+        constraints = [
+            # Coalesce so that one uncategorised row per user-month is enforced too.
+            models.UniqueConstraint(
+                'user', 'month', Coalesce('category', 0),
+                name='unique_monthly_budget_user_month_category',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.month:%b %Y} {self.category or 'Uncategorized'}"
@@ -0,0 +1,183 @@
+"""
+Maintenance of the MonthlyBudget (user, month, category) rollup.
+
+Every transaction contributes to exactly one rollup row: expenses add to
+``spent_amount``, income to ``income_amount`` and every line to
+``transaction_count``. Changes are applied as deltas:
+
+* single saves and deletes go through the signal handlers in
+  ``dashboard.signals``;
+* statement imports pass each inserted chunk to :func:`apply_frame`;
+* ``QuerySet.update()``/``delete()`` bypass both, so run the
+  ``rebuild_rollups`` command after such bulk edits.
+
+Amounts are summed as integer cents so vectorised totals stay exact.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+import pandas as pd
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .cache import bump_data_version
+from .models import MonthlyBudget
+
+ROLLUP_FIELDS = ('user_id', 'transaction_date', 'category_id', 'transaction_type', 'amount')
+
+_CENT = Decimal('0.01')
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def _contribution(values):
+    """Return ``(key, (spent, income, count))`` for one transaction's values."""
+    user_id, transaction_date, category_id, transaction_type, amount = values
+    amount = Decimal(amount)
+    spent = amount if transaction_type == 'expense' else Decimal(0)
+    income = amount if transaction_type == 'income' else Decimal(0)
+    return (user_id, month_start(transaction_date), category_id), (spent, income, 1)
+
+
+def transaction_deltas(old=None, new=None):
+    """
+    Deltas for one transaction changing from ``old`` to ``new`` values.
+
+    Each argument is a tuple ordered as ROLLUP_FIELDS, or None when the
+    transaction did not exist before/after the change.
+    """
+    deltas = defaultdict(lambda: [Decimal(0), Decimal(0), 0])
+    for values, sign in ((old, -1), (new, 1)):
+        if values is None:
+            continue
+        key, (spent, income, count) = _contribution(values)
+        delta = deltas[key]
+        delta[0] += sign * spent
+        delta[1] += sign * income
+        delta[2] += sign * count
+    return deltas
+
+
+def aggregate_frame(frame):
+    """
+    Vectorised rollup of a frame of transactions.
+
+    ``frame`` needs user_id, transaction_date, category_id, transaction_type
+    and amount_cents columns. Returns one row per (user_id, month,
+    category_id) with spent_cents, income_cents and count.
+    """
+    months = pd.to_datetime(frame['transaction_date']).dt.to_period('M').dt.start_time.dt.date
+    cents = frame['amount_cents'].astype('int64')
+    grouped = pd.DataFrame({
+        'user_id': frame['user_id'],
+        'month': months,
+        'category_id': frame['category_id'],
+        'spent_cents': cents.where(frame['transaction_type'] == 'expense', 0),
+        'income_cents': cents.where(frame['transaction_type'] == 'income', 0),
+        'count': 1,
+    }).groupby(['user_id', 'month', 'category_id'], dropna=False, sort=False).sum().reset_index()
+    grouped['category_id'] = grouped['category_id'].astype(object).where(grouped['category_id'].notna(), None)
+    return grouped
+
+
+def frame_deltas(aggregated):
+    """Convert an aggregate_frame result into a deltas mapping."""
+    return {
+        (int(user_id), month, None if category_id is None else int(category_id)): (
+            Decimal(int(spent)) * _CENT, Decimal(int(income)) * _CENT, int(count),
+        )
+        for user_id, month, category_id, spent, income, count
+        in aggregated.itertuples(index=False, name=None)
+    }
+
+
+def apply_deltas(deltas):
+    """
+    Add ``{(user_id, month, category_id): (spent, income, count)}`` to the
+    rollup, creating rows as needed.
+    """
+    for (user_id, month, category_id), (spent, income, count) in deltas.items():
+        if not (spent or income or count):
+            continue
+        rows = MonthlyBudget.objects.filter(user_id=user_id, month=month, category_id=category_id)
+        changes = {
+            'spent_amount': F('spent_amount') + spent,
+            'income_amount': F('income_amount') + income,
+            'transaction_count': F('transaction_count') + count,
+        }
+        if rows.update(**changes) or count < 0:
+            # Nothing to subtract from when the row is already gone (e.g.
+            # removed by the same cascade that is deleting transactions).
+            continue
+        try:
+            with transaction.atomic():
+                MonthlyBudget.objects.create(
+                    user_id=user_id,
+                    month=month,
+                    category_id=category_id,
+                    spent_amount=spent,
+                    income_amount=income,
+                    transaction_count=count,
+                )
+        except IntegrityError:
+            # Created concurrently; add to the row that won.
+            rows.update(**changes)
+
+
+def apply_frame(user_id, frame):
+    """Add a chunk of freshly inserted statement rows to the rollup."""
+    if frame.empty:
+        return
+    apply_deltas(frame_deltas(aggregate_frame(pd.DataFrame({
+        'user_id': user_id,
+        'transaction_date': frame['transaction_date'],
+        'category_id': frame['category_id'] if 'category_id' in frame else None,
+        'transaction_type': frame['transaction_type'],
+        'amount_cents': (frame['amount'] * 100).round(),
+    }))))
+    bump_data_version(user_id)
+
+
+def rebuild_for_users(user_ids):
+    """
+    Recompute the rollup rows of ``user_ids`` from their transactions.
+
+    One read of the users' transactions, a vectorised group-by, then bulk
+    writes: existing rows are overwritten (keeping ``budget_amount``), new
+    keys are created and rows left without transactions or a budget are
+    deleted. Returns the number of transactions read.
+    """
+    from transactions.models import Transaction
+
+    rows = Transaction.objects.filter(user_id__in=user_ids).values_list(*ROLLUP_FIELDS)
+    frame = pd.DataFrame.from_records(rows.iterator(chunk_size=20_000), columns=ROLLUP_FIELDS)
+    totals = {}
+    if not frame.empty:
+        frame['amount_cents'] = (frame.pop('amount').astype(float) * 100).round()
+        totals = frame_deltas(aggregate_frame(frame))
+
+    with transaction.atomic():
+        existing = MonthlyBudget.objects.filter(user_id__in=user_ids).select_for_update()
+        updated = []
+        for budget in existing:
+            key = (budget.user_id, budget.month, budget.category_id)
+            spent, income, count = totals.pop(key, (Decimal(0), Decimal(0), 0))
+            budget.spent_amount, budget.income_amount, budget.transaction_count = spent, income, count
+            updated.append(budget)
+        MonthlyBudget.objects.bulk_update(
+            updated, ['spent_amount', 'income_amount', 'transaction_count'], batch_size=1000,
+        )
+        MonthlyBudget.objects.bulk_create([
+            MonthlyBudget(
+                user_id=user_id, month=month, category_id=category_id,
+                spent_amount=spent, income_amount=income, transaction_count=count,
+            )
+            for (user_id, month, category_id), (spent, income, count) in totals.items()
+        ], batch_size=1000)
+        MonthlyBudget.objects.filter(
+            user_id__in=user_ids, transaction_count=0, budget_amount__isnull=True,
+        ).delete()
+    for user_id in user_ids:
+        bump_data_version(user_id)
+    return len(frame)
@@ -0,0 +1,101 @@
+"""
+Keep MonthlyBudget rollups and the dashboard data version in step with
+single-row changes.
+
+Bulk paths (statement imports, rollup rebuilds) call ``dashboard.rollups``
+directly, which bumps the version itself. The survey upserts the profile
+without signals, so completing onboarding bumps it through the user save.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from accounts.models import CustomUser, UserProfile
+from goals.models import Goal
+from transactions.models import Transaction
+from .cache import bump_data_version
+from .models import ExpenseCategory, MonthlyBudget
+from .rollups import ROLLUP_FIELDS, apply_deltas, transaction_deltas
+
+
+def _as_saved(field, value):
+    # Strings and floats are valid input for a new instance; normalise them
+    # the way the database will store them before computing deltas.
+    value = field.to_python(value)
+    if isinstance(field, DecimalField) and value is not None:
+        value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+    return value
+
+
+def _current_values(instance):
+    return tuple(_as_saved(Transaction._meta.get_field(name), getattr(instance, name)) for name in ROLLUP_FIELDS)
+
+
+def _loaded_values(instance):
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None or any(field not in loaded for field in ROLLUP_FIELDS):
+        return None
+    return tuple(loaded[field] for field in ROLLUP_FIELDS)
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_rollup_values(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._rollup_old = None
+        return
+    old = _loaded_values(instance)
+    if old is None:
+        # Instance was built by hand or loaded with only()/defer().
+        old = Transaction.objects.filter(pk=instance.pk).values_list(*ROLLUP_FIELDS).first()
+    instance._rollup_old = old
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    new = _current_values(instance)
+    old = getattr(instance, '_rollup_old', None)
+    if old != new:
+        apply_deltas(transaction_deltas(old, new))
+    bump_data_version(instance.user_id, using=kwargs.get('using'))
+    instance._loaded_values = dict(zip(ROLLUP_FIELDS, new))
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    apply_deltas(transaction_deltas(_loaded_values(instance) or _current_values(instance), None))
+    bump_data_version(instance.user_id, using=kwargs.get('using'))
+
+
+@receiver(pre_delete, sender=ExpenseCategory)
+def fold_category_rollups(sender, instance, **kwargs):
+    """
+    Move a deleted category's totals to the uncategorised rows.
+
+    Its transactions are set to NULL with a plain UPDATE (no signals), and
+    its own rollup rows cascade away with it.
+    """
+    deltas = {}
+    for user_id, month, spent, income, count in MonthlyBudget.objects.filter(category=instance).values_list(
+            'user_id', 'month', 'spent_amount', 'income_amount', 'transaction_count'):
+        deltas[(user_id, month, None)] = (spent, income, count)
+    apply_deltas(deltas)
+    for user_id, _, _ in deltas:
+        bump_data_version(user_id)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def invalidate_dashboard(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_data_version(instance.user_id, using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_dashboard_on_onboarding(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'onboarding_completed' in update_fields):
+        bump_data_version(instance.pk, using=kwargs.get('using'))
@@ -1,3 +1,183 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.urls import include, path
+from django.utils import timezone
+from accounts.models import UserProfile
+from dashboard import views
+from dashboard.cache import fragment_cache_stats, reset_fragment_cache_stats
+from dashboard.models import ExpenseCategory, MonthlyBudget
+from goals.models import Goal
+from transactions.importers import StatementImporter
+from transactions.models import Transaction
 
-# Create your tests here.
+User = get_user_model()
+
+# Mounts the async dashboard view (DASHBOARD_ASYNC_VIEW) next to the real URLs.
+urlpatterns = [path('async/', views.async_home), path('', include('finmate.urls'))]
+
+JANUARY = date(2026, 1, 1)
+
+
+class MonthlyRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.food = ExpenseCategory.objects.create(name='Food')
+
+    def add(self, amount, transaction_type='expense', day=date(2026, 1, 15), category=None):
+        return Transaction.objects.create(
+            user=self.user, transaction_date=day, amount=Decimal(amount),
+            description='x', transaction_type=transaction_type, category=category,
+        )
+
+    def rollup(self):
+        return sorted(
+            MonthlyBudget.objects.values_list('month', 'category_id', 'spent_amount', 'income_amount',
+                                              'transaction_count'),
+            key=lambda row: (row[0], row[1] or 0),
+        )
+
+    def test_totals_follow_saves_and_deletes(self):
+        """Test creating, editing and deleting transactions updates the rollup."""
+        lunch = self.add('120.50', category=self.food)
+        self.add('50000', 'income')
+        rent = self.add('15000')
+        self.assertEqual(self.rollup(), [
+            (JANUARY, None, Decimal('15000.00'), Decimal('50000.00'), 2),
+            (JANUARY, self.food.pk, Decimal('120.50'), Decimal('0.00'), 1),
+        ])
+
+        rent.transaction_date = date(2026, 2, 1)
+        rent.category = self.food
+        rent.save()
+        lunch = Transaction.objects.get(pk=lunch.pk)
+        lunch.amount = Decimal('100')
+        lunch.save()
+        self.add('9.99').delete()
+        self.assertEqual(self.rollup(), [
+            (JANUARY, None, Decimal('0.00'), Decimal('50000.00'), 1),
+            (JANUARY, self.food.pk, Decimal('100.00'), Decimal('0.00'), 1),
+            (date(2026, 2, 1), self.food.pk, Decimal('15000.00'), Decimal('0.00'), 1),
+        ])
+
+    def test_string_and_float_values_are_normalised(self):
+        """Test string dates and amounts and float amounts roll up exactly."""
+        Transaction.objects.create(
+            user=self.user, transaction_date='2026-01-05', amount='10.50', description='x', transaction_type='expense',
+        )
+        for _ in range(3):
+            Transaction.objects.create(
+                user=self.user, transaction_date=JANUARY, amount=0.1, description='y', transaction_type='expense',
+            )
+        self.assertEqual(self.rollup(), [(JANUARY, None, Decimal('10.80'), Decimal('0.00'), 4)])
+
+    def test_totals_for_is_one_query(self):
+        """Test monthly totals are read from the rollup in one query."""
+        self.add('100', category=self.food)
+        self.add('25.25')
+        self.add('1000', 'income')
+        with self.assertNumQueries(1):
+            totals = MonthlyBudget.objects.totals_for(self.user, JANUARY)
+        self.assertEqual(totals, {'spent': Decimal('125.25'), 'income': Decimal('1000.00'), 'count': 3})
+
+    def test_import_updates_rollup(self):
+        """Test statement imports add their chunks to the rollup."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'statement.csv')
+            with open(path, 'w') as handle:
+                handle.write('Date,Description,Amount\n2026-01-10,COFFEE,-120\n'
+                             '2026-01-11,SALARY,50000\n2026-02-01,RENT,-15000.10\n')
+            StatementImporter(self.user, chunk_size=2).import_file(path)
+            # Re-importing the same lines adds nothing.
+            StatementImporter(self.user).import_file(path)
+        self.assertEqual(self.rollup(), [
+            (JANUARY, None, Decimal('120.00'), Decimal('50000.00'), 2),
+            (date(2026, 2, 1), None, Decimal('15000.10'), Decimal('0.00'), 1),
+        ])
+
+    def test_deleting_category_moves_totals(self):
+        """Test a deleted category's totals fold into uncategorised."""
+        self.add('10', category=self.food)
+        self.add('5')
+        self.food.delete()
+        self.assertEqual(self.rollup(), [(JANUARY, None, Decimal('15.00'), Decimal('0.00'), 2)])
+
+    def test_rebuild_rollups_command(self):
+        """Test the rebuild matches incremental totals and keeps budgets."""
+        self.add('10', category=self.food)
+        self.add('20', 'income')
+        expected = self.rollup()
+        MonthlyBudget.objects.filter(category=self.food).update(spent_amount=0, budget_amount=500)
+        Transaction.objects.filter(category=None).delete()  # bulk delete bypasses signals
+        MonthlyBudget.objects.create(user=self.user, month=date(2025, 12, 1), transaction_count=3)
+
+        out = StringIO()
+        call_command('rebuild_rollups', batch_size=1, stdout=out)
+        self.assertIn('Rebuilt rollups for 1 users from 1 transactions', out.getvalue())
+        self.assertEqual(self.rollup(), expected[1:])
+        self.assertEqual(MonthlyBudget.objects.get().budget_amount, Decimal('500.00'))
+
+
+class DashboardFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_fragment_cache_stats()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.profile = UserProfile.objects.create(
+            user=self.user, monthly_income=Decimal('80000'), necessary_needs=Decimal('30000'),
+            monthly_unwanted_limit=Decimal('10000'),
+        )
+        self.client.login(username='test@example.com', password='testpass123')
+
+    def get(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_fragments_are_cached_per_user(self):
+        """Test a repeat visit is served from cached fragments."""
+        first = self.get()
+        self.assertEqual(first['X-Fragment-Cache'], 'hits=0, misses=3')
+        self.assertContains(first, '40000.00')  # left to save
+        self.assertEqual(self.get()['X-Fragment-Cache'], 'hits=3, misses=0')
+        self.assertEqual(fragment_cache_stats(), {'hits': 3, 'misses': 3})
+
+        User.objects.create_user(email='other@example.com', password='testpass123')
+        self.client.login(username='other@example.com', password='testpass123')
+        self.assertEqual(self.get()['X-Fragment-Cache'], 'hits=0, misses=3')
+
+    def test_data_changes_invalidate(self):
+        """Test profile, transaction and goal changes bump the data version."""
+        self.get()
+        self.profile.monthly_income = Decimal('90000')
+        self.profile.save()
+        self.assertContains(self.get(), '50000.00')
+
+        Transaction.objects.create(
+            user=self.user, transaction_date=timezone.localdate(), amount=Decimal('1234.56'),
+            description='x', transaction_type='expense',
+        )
+        response = self.get()
+        self.assertEqual(response['X-Fragment-Cache'], 'hits=0, misses=3')
+        self.assertContains(response, '1234.56')
+
+        Goal.objects.create(user=self.user, name='Emergency fund', target_amount=Decimal('100000'))
+        self.assertContains(self.get(), 'Emergency fund')
+        self.assertEqual(self.get()['X-Fragment-Cache'], 'hits=3, misses=0')
+
+    @override_settings(ROOT_URLCONF='dashboard.tests')
+    async def test_async_view_under_async_client(self):
+        """Test the async view loads missing widgets and serves repeats from cache."""
+        await self.async_client.alogin(username='test@example.com', password='testpass123')
+        response = await self.async_client.get('/async/')
+        self.assertEqual(response['X-Fragment-Cache'], 'hits=0, misses=3')
+        self.assertContains(response, '40000.00')
+        self.assertContains(response, 'Logout')  # templates saw the authenticated user
+        response = await self.async_client.get('/async/')
+        self.assertEqual(response['X-Fragment-Cache'], 'hits=3, misses=0')
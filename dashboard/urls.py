@@ -1,8 +1,9 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'dashboard'
 
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', views.async_home if settings.DASHBOARD_ASYNC_VIEW else views.home, name='home'),
 ]
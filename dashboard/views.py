@@ -1,5 +1,27 @@
+from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
+from .cache import arender_fragments, render_fragments
+from .widgets import ASYNC_WIDGETS, WIDGETS, current_month
 
 
+@login_required(login_url='accounts:login')
 def home(request):
-	return render(request, 'dashboard/home.html')
+	"""Dashboard assembled from per-user cached widget fragments."""
+	fragments, hits, misses = render_fragments(request.user, WIDGETS, month=current_month())
+	response = render(request, 'dashboard/home.html', {'fragments': fragments})
+	response['X-Fragment-Cache'] = f'hits={hits}, misses={misses}'
+	return response
+
+
+@login_required(login_url='accounts:login')
+async def async_home(request):
+	"""
+	The dashboard for ASGI deployments (DASHBOARD_ASYNC_VIEW), loading the
+	widgets missing from the cache concurrently.
+	"""
+	# Templates read request.user; set it so they don't query synchronously.
+	request.user = await request.auser()
+	fragments, hits, misses = await arender_fragments(request.user, ASYNC_WIDGETS, month=current_month())
+	response = render(request, 'dashboard/home.html', {'fragments': fragments})
+	response['X-Fragment-Cache'] = f'hits={hits}, misses={misses}'
+	return response
@@ -0,0 +1,101 @@
+"""
+Dashboard widgets: ``(name, template, context_loader)`` triples rendered
+through ``dashboard.cache.render_fragments``.
+
+Loaders only see the user, so everything a widget shows must be covered by
+the user's dashboard data version. ``ASYNC_WIDGETS`` are the same widgets
+with coroutine loaders (async ORM) for ``arender_fragments``.
+"""
+import asyncio
+from decimal import Decimal
+
+from django.utils import timezone
+from accounts.models import UserProfile
+from goals.models import Goal
+from .models import MonthlyBudget
+
+
+def current_month():
+    return timezone.localdate().replace(day=1)
+
+
+def _budget(profile, totals):
+    income = needs = limit = None
+    if profile is not None:
+        income, needs, limit = profile.monthly_income, profile.necessary_needs, profile.monthly_unwanted_limit
+    remaining = None
+    if income is not None:
+        remaining = income - (needs or Decimal(0)) - (limit or Decimal(0))
+    return {
+        'income': income,
+        'necessary_needs': needs,
+        'unwanted_limit': limit,
+        'remaining': remaining,
+        'spent': totals['spent'],
+        'earned': totals['income'],
+    }
+
+
+def budget_context(user):
+    """Income against necessary needs, the discretionary limit and this month's spending."""
+    profile = UserProfile.objects.filter(user=user).first()
+    return _budget(profile, MonthlyBudget.objects.totals_for(user, current_month()))
+
+
+async def abudget_context(user):
+    profile, totals = await asyncio.gather(
+        UserProfile.objects.filter(user=user).afirst(),
+        MonthlyBudget.objects.atotals_for(user, current_month()),
+    )
+    return _budget(profile, totals)
+
+
+def _spending_rows(user):
+    return (
+        MonthlyBudget.objects
+        .filter(user=user, month=current_month(), transaction_count__gt=0)
+        .select_related('category')
+        .order_by('-spent_amount')
+    )
+
+
+def spending_context(user):
+    """This month's rollup rows by category."""
+    return {'month': current_month(), 'rows': list(_spending_rows(user))}
+
+
+async def aspending_context(user):
+    return {'month': current_month(), 'rows': [row async for row in _spending_rows(user)]}
+
+
+def _active_goals(user):
+    return Goal.objects.filter(user=user, status='active').order_by('target_date', 'pk')
+
+
+def goals_context(user, limit=5):
+    """The user's next active goals by target date."""
+    goals = _active_goals(user)
+    return {'goals': list(goals[:limit]), 'total': goals.count()}
+
+
+async def agoals_context(user, limit=5):
+    goals = _active_goals(user)
+
+    async def first():
+        return [goal async for goal in goals[:limit]]
+
+    upcoming, total = await asyncio.gather(first(), goals.acount())
+    return {'goals': upcoming, 'total': total}
+
+
+WIDGETS = (
+    ('budget', 'dashboard/widgets/budget.html', budget_context),
+    ('spending', 'dashboard/widgets/spending.html', spending_context),
+    ('goals', 'dashboard/widgets/goals.html', goals_context),
+)
+
+ASYNC_WIDGETS = (
+    ('budget', 'dashboard/widgets/budget.html', abudget_context),
+    ('spending', 'dashboard/widgets/spending.html', aspending_context),
+    ('goals', 'dashboard/widgets/goals.html', agoals_context),
+)
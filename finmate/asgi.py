@@ -2,6 +2,10 @@
 ASGI config for finmate project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The deployed entry point is ``WSGI_APPLICATION``. To serve this one instead
+(e.g. ``uvicorn finmate.asgi:application``), also set DASHBOARD_ASYNC_VIEW=True
+so the dashboard runs its async view on the event loop; see
+``benchmarks/bench_asgi.py`` for how the two compare.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -0,0 +1,16 @@
+"""
+Celery application for finmate.
+
+Tasks are discovered from each installed app's ``tasks.py``. Settings are
+read from Django settings with the ``CELERY_`` prefix.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finmate.settings')
+
+app = Celery('finmate')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+from finmate import perf
+
+COLUMNS = (
+    ('view', 'view'), ('count', 'count'), ('p50_ms', 'p50'), ('p95_ms', 'p95'), ('p99_ms', 'p99'),
+    ('mean_ms', 'mean ms'), ('mean_queries', 'queries'), ('mean_db_ms', 'db ms'),
+    ('mean_template_ms', 'tpl ms'), ('cache_hits', 'cache hits'), ('cache_misses', 'misses'),
+)
+
+
+class Command(BaseCommand):
+    help = "Show sampled request timings per view, merged from every process that published them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON.')
+        parser.add_argument('--reset', action='store_true', help='Clear the published timings after printing.')
+
+    def handle(self, *args, **options):
+        rows = perf.summarise(perf.collect())
+        if options['json']:
+            self.stdout.write(json.dumps(rows, indent=2))
+        elif not rows:
+            self.stdout.write('No sampled requests yet (is PERF_SAMPLE_RATE above 0?).')
+        else:
+            last = perf.BUCKETS_MS[-2]
+            table = [[f'>{last:g}' if row[key] is None else str(row[key]) for key, _ in COLUMNS] for row in rows]
+            headers = [label for _, label in COLUMNS]
+            widths = [max(len(header), *(len(line[i]) for line in table)) for i, header in enumerate(headers)]
+            self.stdout.write('  '.join(header.ljust(width) for header, width in zip(headers, widths)))
+            for line in table:
+                self.stdout.write('  '.join(cell.ljust(width) for cell, width in zip(line, widths)))
+            self.stdout.write('Percentiles are latency bucket upper bounds in ms.')
+        if options['reset']:
+            perf.reset_all()
+            self.stdout.write(self.style.SUCCESS('Cleared published timings.'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from finmate.sessions import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete expired database sessions in small batches (a lock-friendly clearsessions)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5_000, help='Sessions per delete (default: 5000).')
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches (default: 0).',
+        )
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches (default: no limit).')
+
+    def handle(self, *args, **options):
+        stats = purge_expired_sessions(
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            max_batches=options['max_batches'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {stats.deleted} expired sessions in {stats.batches} batches in {stats.elapsed:.1f}s '
+            f'(longest batch {stats.longest_batch * 1000:.0f} ms), {stats.deleted_per_second:,.0f} sessions/sec.'
+        ))
@@ -1,36 +1,197 @@
+import random
 import re
+import time
+from functools import lru_cache
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.conf import settings
+from . import perf
+
+
+# Prefixes that are always public, regardless of EXEMPT_URLS.
+ALWAYS_EXEMPT_PREFIXES = ('/admin/', '/static/', '/media/')
+
+_REGEX_METACHARS = frozenset('.^$*+?{}[]\\|()')
+
+
+def _literal_prefix(pattern):
+    """
+    Return the literal path prefix of an anchored pattern such as
+    r'^/accounts/login/', or None if the pattern uses any regex syntax.
+    """
+    if not pattern.startswith('^'):
+        return None
+    body = pattern[1:]
+    if not body or any(char in _REGEX_METACHARS for char in body):
+        return None
+    return body
+
+
+def _trie_to_regex(node):
+    """Emit a regex for a character trie; shared prefixes are matched once."""
+    if None in node:
+        # A shorter prefix already matches, so longer branches are redundant.
+        return ''
+    branches = [re.escape(char) + _trie_to_regex(child) for char, child in sorted(node.items())]
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
+
+
+def compile_exempt_matcher(patterns, prefixes=ALWAYS_EXEMPT_PREFIXES):
+    """
+    Compile exempt URL patterns into a single regex.
+
+    Literal ``^/prefix/`` patterns (and ``prefixes``) are folded into a prefix
+    trie so the regex engine walks the path once instead of trying each
+    pattern in turn. Any remaining patterns are appended as one alternation.
+    Returns a compiled pattern whose ``match`` tells whether a path is exempt,
+    or None when there is nothing to match.
+    """
+    trie = {}
+    alternatives = []
+    literals = list(prefixes)
+    for pattern in patterns:
+        literal = _literal_prefix(pattern)
+        if literal is None:
+            alternatives.append('(?:%s)' % pattern)
+        else:
+            literals.append(literal)
+
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[None] = {}
+
+    if trie:
+        alternatives.insert(0, _trie_to_regex(trie))
+    if not alternatives:
+        return None
+    return re.compile('|'.join(alternatives))
 
 
 class LoginRequiredMiddleware:
     """
     Middleware that requires login for all views except those in EXEMPT_URLs.
-    
+
     Provides automatic redirect to login page for unauthenticated users.
     Respects EXEMPT_URLS setting for public pages.
+
+    All exempt patterns are compiled once into a single matcher, and the
+    per-path decision is memoised in a bounded LRU cache, so exempt requests
+    (including static files) are passed through without touching the
+    session or loading the user.
+
+    It works both ways: under ASGI the user is loaded with
+    ``request.auser()``, so an async view stack has no thread hop here.
     """
-    
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-        self.exempt_urls = [re.compile(url) for url in getattr(settings, 'EXEMPT_URLS', [])]
-    
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.exempt_matcher = compile_exempt_matcher(getattr(settings, 'EXEMPT_URLS', []))
+        cache_size = getattr(settings, 'EXEMPT_URLS_CACHE_SIZE', 1024)
+        self.is_exempt = lru_cache(maxsize=cache_size)(self._match_exempt)
+
+    def _match_exempt(self, path):
+        return self.exempt_matcher is not None and self.exempt_matcher.match(path) is not None
+
     def __call__(self, request):
-        # Check if URL is exempt
-        path = request.path
-        
-        # Allow exempt URLs to be accessed without authentication
-        for exempt_url in self.exempt_urls:
-            if exempt_url.match(path):
-                return self.get_response(request)
-        
-        # Allow admin and static/media files
-        if path.startswith('/admin/') or path.startswith('/static/') or path.startswith('/media/'):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        # Allow exempt URLs (including admin and static/media files) to be
+        # accessed without authentication
+        if self.is_exempt(request.path):
             return self.get_response(request)
-        
+
         # Check if user is authenticated
         if not request.user.is_authenticated:
             return redirect('accounts:login')
-        
+
         return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.is_exempt(request.path):
+            return await self.get_response(request)
+
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect('accounts:login')
+
+        return await self.get_response(request)
+
+
+class PerformanceMiddleware:
+    """
+    Record wall, database, template and cache timings for sampled requests.
+
+    A ``PERF_SAMPLE_RATE`` share of requests (0 to 1) get a ``Server-Timing``
+    header and are added to the per-view histogram in ``finmate.perf``.
+    Unsampled requests cost one random number; with a rate of 0 the
+    middleware removes itself from the stack. Put it first in MIDDLEWARE so
+    the wall time covers the other middleware too. Template renders are
+    timed by the ``finmate.perf.TimedDjangoTemplates`` backend.
+
+    Like LoginRequiredMiddleware it runs sync or async, matching the stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PERF_SAMPLE_RATE', 0.0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    @staticmethod
+    def _record(request, response, timings, started):
+        wall_ms = (time.perf_counter() - started) * 1000
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        perf.histogram.record(view_name, wall_ms, timings)
+        perf.publish()
+        response['Server-Timing'] = timings.server_timing(wall_ms)
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        perf.instrument_connections()
+        timings, token = perf.start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.finish_request(token)
+        return self._record(request, response, timings, started)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        # On the thread the request's sync_to_async calls (and the ORM) use.
+        await sync_to_async(perf.instrument_connections)()
+        timings, token = perf.start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.finish_request(token)
+        return self._record(request, response, timings, started)
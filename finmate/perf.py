@@ -0,0 +1,271 @@
+"""
+Per-request performance timings.
+
+:class:`finmate.middleware.PerformanceMiddleware` samples requests
+(``PERF_SAMPLE_RATE``) and, for each sampled one, records wall time, the
+number and total time of database queries (an execute wrapper installed by
+:func:`instrument_connections`),
+time spent rendering templates (through the :class:`TimedDjangoTemplates`
+backend) and cache hits/misses reported through :func:`record_cache`. Results are folded into an in-process
+:class:`TimingHistogram` per view name.
+
+Each process publishes its histogram to the cache named by
+``PERF_CACHE_ALIAS`` at most every ``PERF_PUBLISH_INTERVAL`` seconds, so
+``manage.py perf_report`` and the staff endpoint can merge every process's
+numbers (with a per-process cache like locmem, only the current process is
+visible).
+"""
+import bisect
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+# Upper bounds of the latency buckets, in milliseconds; the last is open.
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+SUM_FIELDS = ('wall_ms', 'queries', 'db_ms', 'template_ms', 'cache_hits', 'cache_misses')
+
+_current = ContextVar('finmate_perf_current', default=None)
+
+
+class RequestTimings:
+    """Counters for one sampled request."""
+
+    __slots__ = ('queries', 'db_ms', 'template_ms', 'cache_hits', 'cache_misses', '_template_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+
+    def server_timing(self, wall_ms):
+        """Return the ``Server-Timing`` header value."""
+        return (
+            f'total;dur={wall_ms:.1f}, '
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries", '
+            f'tpl;dur={self.template_ms:.1f}, '
+            f'cache;desc="hits={self.cache_hits} misses={self.cache_misses}"'
+        )
+
+
+def start_request():
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def record_cache(hits=0, misses=0):
+    """Count cache hits/misses against the current sampled request, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.cache_hits += hits
+        timings.cache_misses += misses
+
+
+def _time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+def instrument_connections():
+    """
+    Time queries on this thread's connections for sampled requests.
+
+    Connections are per thread, and the async ORM runs queries on another
+    thread than the view, so this is called on the thread that will query.
+    The wrapper stays installed; unsampled requests pay one context variable
+    lookup per query. It goes first in the list, so it is never the one
+    popped by an ``execute_wrapper`` block.
+    """
+    for alias in connections:
+        wrappers = connections[alias].execute_wrappers
+        if _time_query not in wrappers:
+            wrappers.insert(0, _time_query)
+
+
+class TimedTemplate(Template):
+    """
+    A Django template whose renders count towards the current sampled
+    request. Only the outermost render of a request is counted, so templates
+    rendered from within templates are not counted twice. Unsampled requests
+    pay one context variable lookup per render.
+    """
+
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(context, request)
+        timings._template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings._template_depth -= 1
+            if not timings._template_depth:
+                timings.template_ms += (time.perf_counter() - started) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, handing out :class:`TimedTemplate` instances."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class TimingHistogram:
+    """Thread-safe latency histogram and counter sums per view name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, wall_ms, timings):
+        with self._lock:
+            entry = self._views.get(view_name)
+            if entry is None:
+                entry = self._views[view_name] = {'count': 0, 'buckets': [0] * len(BUCKETS_MS)}
+                entry.update(dict.fromkeys(SUM_FIELDS, 0))
+            entry['count'] += 1
+            entry['buckets'][bisect.bisect_left(BUCKETS_MS, wall_ms)] += 1
+            entry['wall_ms'] += wall_ms
+            entry['queries'] += timings.queries
+            entry['db_ms'] += timings.db_ms
+            entry['template_ms'] += timings.template_ms
+            entry['cache_hits'] += timings.cache_hits
+            entry['cache_misses'] += timings.cache_misses
+
+    def snapshot(self):
+        with self._lock:
+            return {name: {**entry, 'buckets': list(entry['buckets'])} for name, entry in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+histogram = TimingHistogram()
+_published_at = 0.0
+
+
+def merge_snapshots(snapshots):
+    """Add up histogram snapshots from several processes."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, entry in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                merged[name] = {**entry, 'buckets': list(entry['buckets'])}
+                continue
+            target['count'] += entry['count']
+            target['buckets'] = [a + b for a, b in zip(target['buckets'], entry['buckets'])]
+            for field in SUM_FIELDS:
+                target[field] += entry[field]
+    return merged
+
+
+def percentile(buckets, fraction):
+    """Upper bound (ms) of the bucket holding the given fraction of requests."""
+    total = sum(buckets)
+    if not total:
+        return None
+    running = 0
+    for bound, count in zip(BUCKETS_MS, buckets):
+        running += count
+        if running >= fraction * total:
+            return bound
+    return BUCKETS_MS[-1]
+
+
+def summarise(snapshot):
+    """
+    One row per view: count, p50/p95/p99 bucket bounds and mean counters.
+
+    A percentile in the open-ended last bucket is reported as None.
+    """
+    def bound(value):
+        return None if value == float('inf') else value
+
+    rows = []
+    for name, entry in sorted(snapshot.items(), key=lambda item: -item[1]['wall_ms']):
+        count = entry['count']
+        rows.append({
+            'view': name,
+            'count': count,
+            'p50_ms': bound(percentile(entry['buckets'], 0.50)),
+            'p95_ms': bound(percentile(entry['buckets'], 0.95)),
+            'p99_ms': bound(percentile(entry['buckets'], 0.99)),
+            'mean_ms': round(entry['wall_ms'] / count, 2),
+            'mean_queries': round(entry['queries'] / count, 2),
+            'mean_db_ms': round(entry['db_ms'] / count, 2),
+            'mean_template_ms': round(entry['template_ms'] / count, 2),
+            'cache_hits': entry['cache_hits'],
+            'cache_misses': entry['cache_misses'],
+        })
+    return rows
+
+
+def _cache():
+    return caches[getattr(settings, 'PERF_CACHE_ALIAS', 'default')]
+
+
+_INDEX_KEY = 'perf:processes'
+
+
+def _process_key(pid):
+    return f'perf:histogram:{pid}'
+
+
+def publish(force=False):
+    """Store this process's snapshot in the shared cache (rate limited)."""
+    global _published_at
+    now = time.monotonic()
+    if not force and now - _published_at < getattr(settings, 'PERF_PUBLISH_INTERVAL', 10):
+        return
+    _published_at = now
+    cache = _cache()
+    timeout = getattr(settings, 'PERF_RETENTION', 24 * 3600)
+    cache.set(_process_key(os.getpid()), histogram.snapshot(), timeout=timeout)
+    pids = set(cache.get(_INDEX_KEY) or ())
+    if os.getpid() not in pids:
+        cache.set(_INDEX_KEY, sorted(pids | {os.getpid()}), timeout=timeout)
+
+
+def collect():
+    """Merge the published snapshots of every process with this one's live numbers."""
+    cache = _cache()
+    pids = [pid for pid in cache.get(_INDEX_KEY) or () if pid != os.getpid()]
+    published = cache.get_many([_process_key(pid) for pid in pids]).values()
+    return merge_snapshots([*published, histogram.snapshot()])
+
+
+def reset_all():
+    """Forget this process's numbers and every published snapshot."""
+    cache = _cache()
+    pids = cache.get(_INDEX_KEY) or ()
+    cache.delete_many([_INDEX_KEY, *(_process_key(pid) for pid in pids)])
+    histogram.reset()
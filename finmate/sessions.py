@@ -0,0 +1,51 @@
+"""
+Batched cleanup of expired database sessions.
+
+Django's ``clearsessions`` deletes every expired row in one statement,
+which on a large django_session table holds its locks (the whole database
+on SQLite) for as long as that takes. :func:`purge_expired_sessions`
+deletes them ``batch_size`` at a time, oldest first along the expire_date
+index, each batch its own short statement, optionally pausing between
+batches so other writers get in.
+"""
+import time
+from dataclasses import dataclass
+
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+
+@dataclass
+class PurgeStats:
+    deleted: int = 0
+    batches: int = 0
+    longest_batch: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def deleted_per_second(self):
+        return self.deleted / self.elapsed if self.elapsed else 0.0
+
+
+def purge_expired_sessions(batch_size=5_000, pause=0.0, max_batches=None, now=None):
+    """Delete sessions that expired before ``now``, in batches; returns stats."""
+    stats = PurgeStats()
+    started = time.perf_counter()
+    expired = Session.objects.filter(expire_date__lt=now or timezone.now())
+    while max_batches is None or stats.batches < max_batches:
+        batch_started = time.perf_counter()
+        # The batch_size-th oldest expiry bounds the batch, so each delete
+        # is one range scan of the index rather than a long IN list.
+        boundary = expired.order_by('expire_date').values_list('expire_date', flat=True)[batch_size - 1:batch_size]
+        batch = expired.filter(expire_date__lte=boundary[0]) if boundary else expired
+        deleted, _ = batch.delete()
+        stats.deleted += deleted
+        if deleted:
+            stats.batches += 1
+            stats.longest_batch = max(stats.longest_batch, time.perf_counter() - batch_started)
+        if not boundary:
+            break
+        if pause:
+            time.sleep(pause)
+    stats.elapsed = time.perf_counter() - started
+    return stats
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import importlib.util
 from pathlib import Path
 
+from decouple import config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -37,15 +40,20 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'rest_framework',
     # Local apps
+    'finmate',
     'accounts',
     'dashboard',
     'transactions',
     'goals',
     'agents',
+    'api',
 ]
 
 MIDDLEWARE = [
+    # First, so its timings include the other middleware
+    'finmate.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,7 +69,8 @@ ROOT_URLCONF = 'finmate.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates whose renders are timed for PerformanceMiddleware.
+        'BACKEND': 'finmate.perf.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -80,14 +89,91 @@ WSGI_APPLICATION = 'finmate.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE picks the profile (SQLite by default, see .env.example).
+#
+# SQLite runs in WAL mode so readers never block the writer, with
+# synchronous=NORMAL (durable at checkpoints, safe against corruption), a
+# busy timeout so concurrent writers queue instead of failing with
+# "database is locked", and memory-mapped reads. Transactions start with
+# BEGIN IMMEDIATE: a write transaction takes the lock up front rather than
+# failing when it upgrades from a read.
+#
+# PostgreSQL keeps connections open for DB_CONN_MAX_AGE seconds (health
+# checked before reuse), or with DB_POOL=True uses Django's native
+# connection pool (psycopg 3 with psycopg[pool]). QuerySet.iterator()
+# streams big reads through server-side cursors; set
+# DB_DISABLE_SERVER_SIDE_CURSORS=True behind a transaction-pooling
+# PgBouncer, which cannot keep them open.
+DB_ENGINE = config('DB_ENGINE', default='django.db.backends.sqlite3')
+
+if DB_ENGINE == 'django.db.backends.postgresql':
+    DB_POOL = config('DB_POOL', default=False, cast=bool)
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': config('DB_NAME', default='finmate_db'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            # The pool manages connection lifetimes itself.
+            'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
+            'OPTIONS': {
+                'pool': {
+                    'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                    'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': config('DB_SQLITE_BUSY_TIMEOUT_MS', default=20_000, cast=int),
+        'mmap_size': config('DB_SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),
+    }
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+                # sqlite3's own wait, in seconds; busy_timeout above is the same in ms.
+                'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
     }
-}
 
 
+# Password hashing
+# The first hasher hashes new passwords; older hashes (e.g. PBKDF2) are
+# still accepted and re-hashed with it on the next login. Argon2id (needs
+# argon2-cffi) is several times cheaper per login than PBKDF2 or scrypt at
+# their recommended work factors; scrypt is the fallback without it.
+
+PASSWORD_HASHER_CHOICES = {
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'accounts.hashers.Argon2idPasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHER = config(
+    'PASSWORD_HASHER',
+    default='argon2' if importlib.util.find_spec('argon2') else 'scrypt',
+)
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# 'accounts.hashing.ProcessPoolHashingService' moves hashing off the
+# request thread into PASSWORD_HASHING_WORKERS processes (0 = CPU count).
+PASSWORD_HASHING_SERVICE = config('PASSWORD_HASHING_SERVICE', default='accounts.hashing.InlineHashingService')
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=0, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -138,6 +224,103 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+# Resolve the session user through the user cache (see accounts/cache.py)
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+
+# Caches
+# Local memory by default; set REDIS_URL to share caches between workers.
+REDIS_URL = config('REDIS_URL', default='')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if REDIS_URL:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+
+# Sessions
+# 'db' keeps sessions in django_session only (Django's default);
+# 'cached_db' writes through to the cache as well, so authenticated
+# requests read their session without a query; 'cache' keeps them in the
+# cache only (an evicted session logs its user out); 'signed_cookies' keeps
+# no server-side state, for sessions that only carry the login and short
+# anonymous flows, at the cost of not being able to revoke a cookie before
+# it expires. Without REDIS_URL the cache is per process, so the default
+# stays 'db'. Expired database sessions are deleted in batches by the
+# purge_sessions command.
+SESSION_ENGINE_CHOICES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_PROFILE = config('SESSION_PROFILE', default='cached_db' if REDIS_URL else 'db')
+SESSION_ENGINE = SESSION_ENGINE_CHOICES[SESSION_PROFILE]
+SESSION_CACHE_ALIAS = config('SESSION_CACHE_ALIAS', default='default')
+
+# Celery
+# Background jobs go to Celery when a broker is configured. Without one,
+# tasks run eagerly and statement imports use a local thread pool.
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=REDIS_URL)
+CELERY_TASK_ALWAYS_EAGER = not CELERY_BROKER_URL
+CELERY_TASK_IGNORE_RESULT = True
+
+# Statement imports and queued exports: 'celery', 'thread' (local pool)
+# or 'sync' (inline)
+STATEMENT_IMPORT_BACKEND = config(
+    'STATEMENT_IMPORT_BACKEND',
+    default='celery' if CELERY_BROKER_URL else 'thread',
+)
+STATEMENT_IMPORT_WORKERS = config('STATEMENT_IMPORT_WORKERS', default=2, cast=int)
+# XLSX exports with more rows than this are generated in the background.
+EXPORT_XLSX_INLINE_ROWS = config('EXPORT_XLSX_INLINE_ROWS', default=20_000, cast=int)
+
+# User cache: version stamps and shared copies live in USER_CACHE_ALIAS,
+# with a small per-process LRU in front of it. Like SESSION_PROFILE it is
+# off without REDIS_URL: locmem stamps are per process, so other workers
+# would keep serving a user for up to USER_CACHE_TTL after a change.
+USER_CACHE_ENABLED = config('USER_CACHE_ENABLED', default=bool(REDIS_URL), cast=bool)
+USER_CACHE_ALIAS = 'default'
+USER_CACHE_TTL = 300
+USER_CACHE_LOCAL_SIZE = 1024
+USER_CACHE_LOCAL_TTL = 30
+
+# Dashboard widget fragments, keyed by a per-user data version.
+DASHBOARD_CACHE_ALIAS = config('DASHBOARD_CACHE_ALIAS', default='default')
+DASHBOARD_CACHE_TTL = config('DASHBOARD_CACHE_TTL', default=3600, cast=int)
+# Serve the async dashboard view. Only worth it under finmate.asgi; behind
+# WSGI_APPLICATION the sync view is faster.
+DASHBOARD_ASYNC_VIEW = config('DASHBOARD_ASYNC_VIEW', default=False, cast=bool)
+
+# Goal feasibility projections (goals.projections): months projected and
+# how long a cached projection is kept; changes invalidate it earlier.
+GOAL_PROJECTION_CACHE_ALIAS = config('GOAL_PROJECTION_CACHE_ALIAS', default='default')
+GOAL_PROJECTION_MONTHS = config('GOAL_PROJECTION_MONTHS', default=60, cast=int)
+GOAL_PROJECTION_TTL = config('GOAL_PROJECTION_TTL', default=24 * 3600, cast=int)
+
+# Transaction categoriser (transactions.categoriser): compiled rule sets
+# kept per process, and memoised descriptions per rule set.
+CATEGORISER_RULE_SETS = config('CATEGORISER_RULE_SETS', default=256, cast=int)
+CATEGORISER_RULE_SET_TTL = config('CATEGORISER_RULE_SET_TTL', default=3600, cast=int)
+CATEGORISER_CACHE_SIZE = config('CATEGORISER_CACHE_SIZE', default=100_000, cast=int)
+
+# Request timings (finmate.perf): share of requests sampled, 0 disables
+# the middleware; per-process histograms are published to PERF_CACHE_ALIAS.
+PERF_SAMPLE_RATE = config('PERF_SAMPLE_RATE', default=0.0, cast=float)
+PERF_CACHE_ALIAS = config('PERF_CACHE_ALIAS', default='default')
+PERF_PUBLISH_INTERVAL = config('PERF_PUBLISH_INTERVAL', default=10, cast=int)
+
+# Read API (api app): session auth, JSON only, keyset pages.
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework.authentication.SessionAuthentication'],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
 # Login Settings
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'dashboard:home'
@@ -152,20 +335,9 @@ EXEMPT_URLS = [
     r'^/accounts/register/',
     r'^/accounts/forgot-password/',
     r'^/admin/',
+    # The API answers 403 itself instead of redirecting to the login page
+    r'^/api/',
     r'^/static/',
     r'^/media/',
 ]
 
-# Database Configuration for PostgreSQL compatibility
-# Development: SQLite3 (default)
-# Production: Uncomment and configure PostgreSQL
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': 'finmate_db',
-#         'USER': 'postgres',
-#         'PASSWORD': 'your_password',
-#         'HOST': 'localhost',
-#         'PORT': '5432',
-#     }
-# }
@@ -0,0 +1,223 @@
+import json
+import unittest
+from datetime import timedelta
+from io import StringIO
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, RequestFactory, TestCase, override_settings
+from django.http import HttpResponse
+from django.utils import timezone
+from finmate import perf
+from finmate.middleware import LoginRequiredMiddleware, compile_exempt_matcher
+from finmate.sessions import purge_expired_sessions
+
+
+class _AnonymousUser:
+    is_authenticated = False
+
+
+class ExemptMatcherTests(SimpleTestCase):
+    def test_literal_prefixes_match(self):
+        """Test literal ^/prefix/ patterns match any path under the prefix."""
+        matcher = compile_exempt_matcher([r'^/accounts/login/', r'^/accounts/signup/'])
+        self.assertTrue(matcher.match('/accounts/login/'))
+        self.assertTrue(matcher.match('/accounts/signup/?next=/'))
+        self.assertFalse(matcher.match('/accounts/survey/'))
+        self.assertFalse(matcher.match('/x/accounts/login/'))
+
+    def test_always_exempt_prefixes(self):
+        """Test admin, static and media are exempt without being configured."""
+        matcher = compile_exempt_matcher([])
+        for path in ('/admin/', '/static/css/style.css', '/media/a.png'):
+            self.assertTrue(matcher.match(path), path)
+        self.assertFalse(matcher.match('/dashboard/'))
+
+    def test_shorter_prefix_wins(self):
+        """Test that a prefix covering a longer one still matches both."""
+        matcher = compile_exempt_matcher([r'^/public/', r'^/public/docs/'], prefixes=())
+        self.assertTrue(matcher.match('/public/docs/intro/'))
+        self.assertTrue(matcher.match('/public/other/'))
+
+    def test_regex_patterns_are_kept(self):
+        """Test patterns with regex syntax are matched as regexes."""
+        matcher = compile_exempt_matcher([r'^/share/\d+/$'], prefixes=())
+        self.assertTrue(matcher.match('/share/42/'))
+        self.assertFalse(matcher.match('/share/abc/'))
+
+    def test_no_patterns(self):
+        """Test an empty configuration compiles to no matcher."""
+        self.assertIsNone(compile_exempt_matcher([], prefixes=()))
+
+
+@override_settings(EXEMPT_URLS=[r'^/accounts/login/'])
+class LoginRequiredMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = LoginRequiredMiddleware(lambda request: HttpResponse('ok'))
+
+    def test_exempt_path_does_not_touch_user(self):
+        """Test exempt paths pass through before request.user is accessed."""
+        # RequestFactory requests have no ``user`` attribute, so any access
+        # would raise AttributeError.
+        for path in ('/accounts/login/', '/static/css/style.css'):
+            response = self.middleware(self.factory.get(path))
+            self.assertEqual(response.status_code, 200)
+
+    def test_protected_path_redirects_anonymous(self):
+        """Test unauthenticated users are redirected to login."""
+        request = self.factory.get('/dashboard/')
+        request.user = _AnonymousUser()
+        response = self.middleware(request)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, '/accounts/login/')
+
+    def test_decision_is_cached(self):
+        """Test repeated paths are served from the LRU cache."""
+        self.middleware(self.factory.get('/static/a.css'))
+        self.middleware(self.factory.get('/static/a.css'))
+        self.assertEqual(self.middleware.is_exempt.cache_info().hits, 1)
+
+    async def test_async_stack_awaits_auser(self):
+        """Test under an async stack the middleware is a coroutine using request.auser()."""
+        async def view(request):
+            return HttpResponse('ok')
+
+        async def auser():
+            return _AnonymousUser()
+
+        middleware = LoginRequiredMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = self.factory.get('/dashboard/')
+        request.auser = auser
+        response = await middleware(request)
+        self.assertEqual(response.url, '/accounts/login/')
+        response = await middleware(self.factory.get('/static/a.css'))
+        self.assertEqual(response.content, b'ok')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite profile')
+class SQLiteProfileTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        """Test the SQLite profile's PRAGMAs are set on every connection."""
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_write_transactions_start_immediate(self):
+        """Test transactions take the write lock up front."""
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+@override_settings(PERF_SAMPLE_RATE=1.0)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        """Create an onboarded user and clear collected timings."""
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123', onboarding_completed=True,
+        )
+        self.client.force_login(self.user)
+        perf.reset_all()
+        self.addCleanup(perf.reset_all)
+
+    def test_sampled_request_gets_server_timing(self):
+        """Test sampled responses carry wall, db, template and cache timings."""
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        header = response['Server-Timing']
+        for metric in ('total;dur=', 'db;dur=', 'tpl;dur=', 'cache;desc='):
+            self.assertIn(metric, header)
+
+    def test_histogram_per_view_name(self):
+        """Test timings are aggregated under the resolved view name."""
+        self.client.get('/')
+        self.client.get('/')
+        entry = perf.histogram.snapshot()['dashboard:home']
+        self.assertEqual(entry['count'], 2)
+        self.assertEqual(sum(entry['buckets']), 2)
+        self.assertGreater(entry['queries'], 0)
+        self.assertGreater(entry['template_ms'], 0)
+        # The second request serves every widget from the fragment cache.
+        self.assertGreaterEqual(entry['cache_hits'], 3)
+
+    @override_settings(ROOT_URLCONF='dashboard.tests')
+    async def test_async_stack_is_timed(self):
+        """Test under an async stack queries and templates are still timed."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get('/async/')
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        entry = perf.histogram.snapshot()['dashboard.views.async_home']
+        self.assertEqual(entry['count'], 1)
+        self.assertGreater(entry['queries'], 0)
+        self.assertGreater(entry['template_ms'], 0)
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_disabled_when_rate_is_zero(self):
+        """Test a zero sample rate removes the middleware entirely."""
+        response = self.client.get('/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(perf.histogram.snapshot(), {})
+
+    def test_report_command_and_staff_endpoint(self):
+        """Test the command and the staff-only endpoint show the same views."""
+        self.client.get('/')
+        out = StringIO()
+        call_command('perf_report', '--json', stdout=out)
+        self.assertEqual([row['view'] for row in json.loads(out.getvalue())], ['dashboard:home'])
+
+        self.assertEqual(self.client.get('/perf/').status_code, 302)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/perf/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('dashboard:home', [row['view'] for row in response.json()['views']])
+
+
+class TimingHistogramTests(SimpleTestCase):
+    def test_percentiles_and_merge(self):
+        """Test bucket percentiles over snapshots merged from two processes."""
+        first, second = perf.TimingHistogram(), perf.TimingHistogram()
+        timings = perf.RequestTimings()
+        for wall_ms in (0.5, 3, 3, 40):
+            first.record('view', wall_ms, timings)
+        second.record('view', 20_000, timings)
+        merged = perf.merge_snapshots([first.snapshot(), second.snapshot()])
+        row = perf.summarise(merged)[0]
+        self.assertEqual(row['count'], 5)
+        self.assertEqual(row['p50_ms'], 5)
+        self.assertIsNone(row['p99_ms'])  # beyond the last bounded bucket
+
+
+class SessionPurgeTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=i + 1))
+             for i in range(5)]
+            + [Session(session_key=f'live{i}', session_data='', expire_date=now + timedelta(days=1)) for i in range(2)]
+        )
+
+    def test_purges_expired_in_batches(self):
+        """Test expired sessions are deleted batch by batch and live ones kept."""
+        stats = purge_expired_sessions(batch_size=2)
+        self.assertEqual((stats.deleted, stats.batches), (5, 3))
+        self.assertEqual(sorted(Session.objects.values_list('pk', flat=True)), ['live0', 'live1'])
+
+    def test_max_batches_deletes_oldest_first(self):
+        """Test a bounded run removes the longest-expired sessions."""
+        stats = purge_expired_sessions(batch_size=2, max_batches=1)
+        self.assertEqual(stats.deleted, 2)
+        self.assertFalse(Session.objects.filter(pk__in=['expired3', 'expired4']).exists())
+
+    def test_purge_sessions_command(self):
+        """Test the command reports what it deleted."""
+        out = StringIO()
+        call_command('purge_sessions', batch_size=10, stdout=out)
+        self.assertIn('Deleted 5 expired sessions in 1 batches', out.getvalue())
@@ -18,10 +18,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from . import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('perf/', views.perf_report, name='perf_report'),
     path('accounts/', include('accounts.urls')),
+    path('transactions/', include('transactions.urls')),
+    path('api/', include('api.urls')),
     path('', include('dashboard.urls')),
 ]
 
@@ -0,0 +1,17 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from . import perf
+
+
+@staff_member_required
+@require_http_methods(['GET', 'POST'])
+def perf_report(request):
+	"""
+	Request timings per view, merged across processes, as JSON.
+	POST clears them.
+	"""
+	if request.method == 'POST':
+		perf.reset_all()
+	snapshot = perf.collect()
+	return JsonResponse({'buckets_ms': [str(bound) for bound in perf.BUCKETS_MS], 'views': perf.summarise(snapshot)})
@@ -0,0 +1,24 @@
+"""
+Process pool initialisation for Django code run in spawned workers.
+
+This module is imported by each spawned worker before Django is set up, so
+it must not import models (or anything that does) at module level.
+"""
+import django
+from django.conf import settings
+
+
+def database_names():
+    """The parent's current database names, for :func:`setup_worker`."""
+    from django.db import connections
+
+    return {alias: connections[alias].settings_dict['NAME'] for alias in connections}
+
+
+def setup_worker(databases):
+    # Spawned workers start from the settings module, which names the
+    # configured databases; point them at the parent's (e.g. a test or
+    # scratch database) before setting Django up.
+    for alias, name in databases.items():
+        settings.DATABASES[alias]['NAME'] = name
+    django.setup()
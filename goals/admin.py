@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import Goal
 
-# Register your models here.
+
+@admin.register(Goal)
+class GoalAdmin(admin.ModelAdmin):
+	model = Goal
+	list_display = ('name', 'user', 'category', 'target_amount', 'target_date', 'status', 'from_survey')
+	list_filter = ('category', 'status', 'from_survey')
+	search_fields = ('name', 'user__email')
+	readonly_fields = ('created_at', 'updated_at')
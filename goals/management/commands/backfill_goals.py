@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from accounts.models import UserProfile
+from dashboard.cache import bump_data_version
+from goals.models import Goal
+from goals.projections import invalidate_projections
+
+
+class Command(BaseCommand):
+    help = "Parse every UserProfile.goals_and_wants into Goal rows, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Profiles parsed and written per transaction (default: 2000).',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        profiles = (
+            UserProfile.objects
+            .exclude(goals_and_wants='')
+            .order_by('pk')
+            .values_list('user_id', 'goals_and_wants')
+        )
+        started = time.perf_counter()
+        total_profiles = total_goals = 0
+        batch = []
+        for row in profiles.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                total_goals += self._write_batch(batch)
+                total_profiles += len(batch)
+                batch = []
+        if batch:
+            total_goals += self._write_batch(batch)
+            total_profiles += len(batch)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Parsed {total_profiles} profiles into {total_goals} goals in {elapsed:.1f}s.'
+        ))
+
+    def _write_batch(self, batch):
+        goals = []
+        for user_id, text in batch:
+            goals.extend(Goal.objects.build_from_text(user_id, text))
+        user_ids = [user_id for user_id, _ in batch]
+        with transaction.atomic():
+            Goal.objects.filter(user_id__in=user_ids, from_survey=True).delete()
+            Goal.objects.bulk_create(goals, batch_size=1000)
+            # bulk_create sends no signals: drop projections and dashboard fragments.
+            invalidate_projections(user_ids)
+            for user_id in user_ids:
+                bump_data_version(user_id)
+        return len(goals)
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from goals.projections import refresh_projections
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recompute and cache goal feasibility projections, in batches of users."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only project this user (email).')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Users projected per vectorised batch (default: 5000).',
+        )
+        parser.add_argument('--months', type=int, help='Months to project (default: GOAL_PROJECTION_MONTHS).')
+
+    def handle(self, *args, batch_size, months, **options):
+        users = User.objects.filter(onboarding_completed=True).order_by('pk')
+        if options['user']:
+            users = User.objects.for_email(options['user'])
+            if not users.exists():
+                raise CommandError(f"No user with email '{options['user']}'")
+
+        stats = refresh_projections(users.values_list('pk', flat=True), batch_size=batch_size, horizon=months)
+        self.stdout.write(self.style.SUCCESS(
+            f'Projected {stats.goals} goals for {stats.users} users in {stats.elapsed:.1f}s, '
+            f'{stats.users_per_second:,.0f} users/sec.'
+        ))
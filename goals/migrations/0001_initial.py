@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-17 19:10
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Goal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('category', models.CharField(choices=[('savings', 'Savings'), ('investment', 'Investment'), ('debt_payoff', 'Debt Payoff'), ('education', 'Education'), ('travel', 'Travel'), ('home', 'Home'), ('retirement', 'Retirement'), ('other', 'Other')], default='other', max_length=20)),
+                ('target_amount', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('current_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('start_date', models.DateField(default=django.utils.timezone.localdate)),
+                ('target_date', models.DateField(blank=True, help_text="Deadline; month-only survey dates resolve to the month's last day", null=True)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], default='medium', max_length=20)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('completed', 'Completed'), ('abandoned', 'Abandoned')], default='active', max_length=20)),
+                ('from_survey', models.BooleanField(default=False, help_text="Parsed from the onboarding survey's goals_and_wants text")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Goal',
+                'verbose_name_plural': 'Goals',
+                'indexes': [models.Index(fields=['user', 'status', 'target_date'], name='goals_goal_user_id_fd1297_idx')],
+            },
+        ),
+    ]
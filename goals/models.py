@@ -1,3 +1,112 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.core.validators import MinValueValidator
+from django.utils import timezone
+from .parsers import parse_goals
 
-# Create your models here.
+
+class GoalManager(models.Manager):
+    """Manager with helpers for goals derived from the onboarding survey."""
+
+    def build_from_text(self, user_id, text):
+        """Return unsaved Goal instances parsed from a goals_and_wants string."""
+        today = timezone.localdate()
+        return [
+            self.model(
+                user_id=user_id,
+                name=parsed.name,
+                category=parsed.category,
+                target_amount=parsed.amount,
+                start_date=today,
+                target_date=parsed.target_date,
+                from_survey=True,
+            )
+            for parsed in parse_goals(text, today)
+        ]
+
+    def replace_from_text(self, user, text):
+        """
+        Replace a user's survey-derived goals with those parsed from ``text``.
+
+        Goals the user created by other means are left untouched.
+        """
+        goals = self.build_from_text(user.pk, text)
+        # No savepoint when the caller (the survey view) is already atomic.
+        with transaction.atomic(using=self.db, savepoint=False):
+            self.filter(user=user, from_survey=True).delete()
+            return self.bulk_create(goals)
+
+
+class Goal(models.Model):
+    """
+    A financial goal with a target amount and (optionally) a target date.
+    Survey answers in UserProfile.goals_and_wants are parsed into Goal rows.
+    """
+    CATEGORY_CHOICES = (
+        ('savings', 'Savings'),
+        ('investment', 'Investment'),
+        ('debt_payoff', 'Debt Payoff'),
+        ('education', 'Education'),
+        ('travel', 'Travel'),
+        ('home', 'Home'),
+        ('retirement', 'Retirement'),
+        ('other', 'Other'),
+    )
+    PRIORITY_CHOICES = (
+        ('low', 'Low'),
+        ('medium', 'Medium'),
+        ('high', 'High'),
+    )
+    STATUS_CHOICES = (
+        ('active', 'Active'),
+        ('completed', 'Completed'),
+        ('abandoned', 'Abandoned'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='goals')
+    name = models.CharField(max_length=100)
+    description = models.TextField(blank=True)
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='other')
+    target_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        validators=[MinValueValidator(0)]
+    )
+    current_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        validators=[MinValueValidator(0)]
+    )
+    start_date = models.DateField(default=timezone.localdate)
+    target_date = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Deadline; month-only survey dates resolve to the month's last day"
+    )
+    priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='medium')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    from_survey = models.BooleanField(
+        default=False,
+        help_text="Parsed from the onboarding survey's goals_and_wants text"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = GoalManager()
+
+    class Meta:
+        verbose_name = "Goal"
+        verbose_name_plural = "Goals"
+        indexes = [
+            models.Index(fields=['user', 'status', 'target_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.target_amount})"
+
+    @property
+    def progress_percentage(self):
+        if not self.target_amount:
+            return 0
+        return (self.current_amount / self.target_amount) * 100
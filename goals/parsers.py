@@ -0,0 +1,160 @@
+"""
+Parser for the free-text ``UserProfile.goals_and_wants`` survey answer.
+
+Turns text such as ``"Car: 500000 by Dec 2026, Vacation: ₹1.5L in 8 months"``
+into structured goals. The whole grammar is one compiled regex scanned with
+``finditer``, so each string is parsed in a single pass.
+"""
+import calendar
+import re
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+
+class ParsedGoal(NamedTuple):
+    name: str
+    amount: Decimal
+    target_date: Optional[date]
+    category: str
+
+
+_MONTHS = r'jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?'
+
+_DATE = rf'''
+    (?P<iso_y>\d{{4}})-(?P<iso_m>\d{{1,2}})(?:-(?P<iso_d>\d{{1,2}}))?
+  | (?P<dmy_d>\d{{1,2}})[/.-](?P<dmy_m>\d{{1,2}})[/.-](?P<dmy_y>\d{{4}}|\d{{2}})
+  | (?P<my_m>\d{{1,2}})[/.-](?P<my_y>\d{{4}})
+  | (?P<dm_d>\d{{1,2}})(?:st|nd|rd|th)?\s+(?P<dm_mon>{_MONTHS})\.?,?\s+'?(?P<dm_y>\d{{4}}|\d{{2}})
+  | (?P<md_mon>{_MONTHS})\.?(?:\s+(?P<md_d>\d{{1,2}})(?:st|nd|rd|th)?,?)?[\s'-]+(?P<md_y>\d{{4}}|\d{{2}})
+  | (?P<rel_n>\d{{1,3}})\s*(?P<rel_unit>weeks?|wks?|months?|mos?|years?|yrs?)\b
+  | (?P<y>\d{{4}})
+'''
+
+GOAL_RE = re.compile(rf'''
+    (?P<name>[^:=,;\n]+?(?=\s*[:=])|[^:=,;\n\d₹$€£]+?)
+    \s*[:=\-–]?\s*
+    (?P<currency>₹|rs\.?|inr|\$|usd|€|eur|£|gbp)?\s*
+    (?P<amount>\d{{1,3}}(?:,\d{{2,3}})+(?:\.\d+)?|\d+(?:\.\d+)?)
+    (?:\s*(?P<suffix>lakhs?|lacs?|l|crores?|cr|k|thousand|m|mn|million)\b)?
+    (?:\s*(?:inr|rupees|rs\.?|usd|dollars|/-))?
+    (?:\s*(?:by|before|until|till|in|on|due|deadline:?|-|@)\s*(?:{_DATE}))?
+''', re.IGNORECASE | re.VERBOSE)
+
+_MULTIPLIERS = {
+    'k': 1_000, 'thousand': 1_000,
+    'l': 100_000, 'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000, 'lacs': 100_000,
+    'm': 1_000_000, 'mn': 1_000_000, 'million': 1_000_000,
+    'cr': 10_000_000, 'crore': 10_000_000, 'crores': 10_000_000,
+}
+
+_MONTH_NUMBERS = {name: i for i, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), start=1)}
+
+_CATEGORY_RE = re.compile(r'''
+    (?P<travel>vacation|holiday|trip|travel|tour)
+  | (?P<home>house|home|flat|apartment|property|renovation)
+  | (?P<education>education|college|course|degree|tuition|school|mba|masters|fees)
+  | (?P<debt_payoff>loan|debt|emi|credit\s*card)
+  | (?P<retirement>retire)
+  | (?P<investment>invest|stocks?|sip|mutual|shares|gold)
+  | (?P<savings>emergency|saving|fund|rainy)
+''', re.IGNORECASE | re.VERBOSE)
+
+# Largest value a DecimalField(max_digits=12, decimal_places=2) can hold.
+MAX_AMOUNT = Decimal('9999999999.99')
+
+
+def _year(text):
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+
+def _make_date(year, month, day=None):
+    """Build a date; a missing day means the end of that month."""
+    try:
+        if day is None:
+            day = calendar.monthrange(year, month)[1]
+        return date(year, month, day)
+    except (ValueError, calendar.IllegalMonthError):
+        return None
+
+
+_DATE_GROUPS = (
+    'iso_y', 'iso_m', 'iso_d', 'dmy_d', 'dmy_m', 'dmy_y', 'my_m', 'my_y',
+    'dm_d', 'dm_mon', 'dm_y', 'md_mon', 'md_d', 'md_y', 'y',
+)
+_GROUPS = ('name', 'amount', 'suffix', 'rel_n', 'rel_unit') + _DATE_GROUPS
+_CENT = Decimal('0.01')
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(iso_y, iso_m, iso_d, dmy_d, dmy_m, dmy_y, my_m, my_y,
+                dm_d, dm_mon, dm_y, md_mon, md_d, md_y, y):
+    """Resolve the matched date groups; memoised as the same dates recur."""
+    if iso_y:
+        return _make_date(int(iso_y), int(iso_m), iso_d and int(iso_d))
+    if dmy_d:
+        return _make_date(_year(dmy_y), int(dmy_m), int(dmy_d))
+    if my_m:
+        return _make_date(int(my_y), int(my_m))
+    if dm_d:
+        return _make_date(_year(dm_y), _MONTH_NUMBERS[dm_mon[:3].lower()], int(dm_d))
+    if md_mon:
+        return _make_date(_year(md_y), _MONTH_NUMBERS[md_mon[:3].lower()], md_d and int(md_d))
+    if y:
+        return date(int(y), 12, 31)
+    return None
+
+
+def _relative_date(today, count, unit):
+    """``count`` weeks, months or years after ``today`` (clamped to month end)."""
+    unit = unit[0].lower()
+    if unit == 'w':
+        return today + timedelta(weeks=count)
+    months = today.month - 1 + count * (12 if unit == 'y' else 1)
+    year, month = today.year + months // 12, months % 12 + 1
+    return date(year, month, min(today.day, calendar.monthrange(year, month)[1]))
+
+
+@lru_cache(maxsize=4096)
+def categorize(name):
+    """Guess a Goal category from the goal's name."""
+    match = _CATEGORY_RE.search(name)
+    return match.lastgroup if match else 'other'
+
+
+def parse_goals(text, today=None):
+    """
+    Parse a goals_and_wants string into a list of ParsedGoal.
+
+    Entries without a recognisable amount are skipped. Currency symbols,
+    Indian and Western digit grouping, k/lakh/crore/million suffixes and
+    common date formats are accepted; month-only dates resolve to the last
+    day of the month, and relative ones ("in 6 months") count from
+    ``today`` (default: the current date).
+    """
+    if not text:
+        return []
+    goals = []
+    for match in GOAL_RE.finditer(text):
+        name, amount, suffix, rel_n, rel_unit, *date_groups = match.group(*_GROUPS)
+        name = name.strip(' \t-–:=.')
+        if not name:
+            continue
+        try:
+            amount = Decimal(amount.replace(',', ''))
+        except InvalidOperation:
+            continue
+        if suffix:
+            amount *= _MULTIPLIERS[suffix.lower()]
+        if amount > MAX_AMOUNT:
+            continue
+        if rel_n:
+            today = today or date.today()
+            target_date = _relative_date(today, int(rel_n), rel_unit)
+        else:
+            target_date = _parse_date(*date_groups)
+        goals.append(ParsedGoal(name[:100], amount.quantize(_CENT), target_date, categorize(name)))
+    return goals
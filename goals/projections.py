@@ -0,0 +1,244 @@
+"""
+Goal feasibility projections.
+
+Each user's monthly surplus is ``monthly_income - necessary_needs -
+monthly_unwanted_limit`` from their survey profile. It is paid into their
+active goals as a waterfall: goals are ordered by priority (high first),
+then deadline (soonest first, open-ended last), and each goal takes the
+whole surplus until it is funded, then the next goal starts.
+
+With a constant surplus ``S`` the waterfall has a closed form. If ``C`` is
+the cumulative amount still needed by a goal and every goal before it,
+then:
+
+* the goal is funded after ``ceil(C / S)`` months;
+* its balance after month ``m`` is ``current + clip(S*m - C_prev, 0,
+  remaining)``;
+* it meets a deadline ``D`` months away when ``S >= C / D``.
+
+So a batch of users is computed as ``users x goals x months`` arrays with no
+per-user Python. :func:`compute_projections` does that for a batch.
+:func:`get_projection` serves a single user through the cache, and the
+``project_goals`` command refreshes every user in batches (e.g. nightly).
+Cached projections are dropped whenever a profile or goal changes (see
+``goals.signals``).
+"""
+import time
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import FloatField, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+from accounts.models import UserProfile
+from .models import Goal
+
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+
+@dataclass
+class ProjectionStats:
+    users: int = 0
+    goals: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def users_per_second(self):
+        return self.users / self.elapsed if self.elapsed else 0.0
+
+
+def _cache():
+    return caches[getattr(settings, 'GOAL_PROJECTION_CACHE_ALIAS', 'default')]
+
+
+def _key(user_id):
+    return f'goals:projection:{user_id}'
+
+
+def months_between(start, end):
+    """Whole calendar months from ``start``'s month to ``end``'s month."""
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _as_float(field):
+    # Amounts are only used for arithmetic here; floats skip the per-value
+    # Decimal conversion, which dominates loading otherwise.
+    return Coalesce(Cast(field, FloatField()), Value(0.0))
+
+
+def load_batch(user_ids, today):
+    """
+    Load surplus per user and padded goal arrays for ``user_ids``.
+
+    Returns ``(user_ids, surplus, goals)`` where ``goals`` holds ``(U, G)``
+    arrays (``ids`` is 0 and ``remaining`` 0 for padding), already in
+    waterfall order within each user.
+
+    Rows are selected by id range rather than a long ``IN`` list, which is
+    cheaper to build and to run; rows of users in the range but not in
+    ``user_ids`` are dropped afterwards.
+    """
+    user_ids = np.asarray(sorted(set(user_ids)), dtype=np.int64)
+    surplus = np.zeros(len(user_ids))
+    if not len(user_ids):
+        return user_ids, surplus, {name: np.zeros((0, 0)) for name in ('ids', 'current', 'remaining', 'deadline')}
+    in_range = {'user_id__gte': int(user_ids[0]), 'user_id__lte': int(user_ids[-1])}
+
+    def wanted(owners):
+        rows = np.minimum(np.searchsorted(user_ids, owners), len(user_ids) - 1)
+        return rows, user_ids[rows] == owners
+
+    profiles = np.array(
+        list(
+            UserProfile.objects.filter(**in_range)
+            .annotate(surplus=_as_float('monthly_income') - _as_float('necessary_needs')
+                      - _as_float('monthly_unwanted_limit'))
+            .values_list('user_id', 'surplus')
+        ),
+        dtype=float,
+    ).reshape(-1, 2)
+    if len(profiles):
+        rows, keep = wanted(profiles[:, 0].astype(np.int64))
+        surplus[rows[keep]] = np.maximum(profiles[keep, 1], 0.0)
+
+    rows = list(
+        Goal.objects.filter(status='active', **in_range)
+        .annotate(target=_as_float('target_amount'), current=_as_float('current_amount'))
+        .values_list('user_id', 'id', 'target', 'current', 'target_date', 'priority')
+    )
+    goal_user = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+    if len(rows):
+        _, keep = wanted(goal_user)
+        rows = [row for row, kept in zip(rows, keep.tolist()) if kept]
+        goal_user = goal_user[keep]
+    count = len(rows)
+    goal_id = np.fromiter((row[1] for row in rows), np.int64, count)
+    target = np.fromiter((row[2] for row in rows), float, count)
+    current = np.fromiter((row[3] for row in rows), float, count)
+    deadline = np.fromiter(
+        (np.nan if row[4] is None else months_between(today, row[4]) for row in rows), float, count,
+    )
+    priority = np.fromiter((PRIORITY_RANK.get(row[5], 1) for row in rows), np.int64, count)
+
+    # Waterfall order: by user, priority, deadline (open-ended last), id.
+    order = np.lexsort((goal_id, np.nan_to_num(deadline, nan=np.inf), priority, goal_user))
+    user_row = np.searchsorted(user_ids, goal_user[order])
+    starts = np.searchsorted(user_row, np.arange(len(user_ids)))
+    slot = np.arange(count) - starts[user_row]
+    width = int(slot.max()) + 1 if count else 0
+
+    def padded(values, fill, dtype=float):
+        out = np.full((len(user_ids), width), fill, dtype=dtype)
+        out[user_row, slot] = values[order]
+        return out
+
+    goals = {
+        'ids': padded(goal_id, 0, np.int64),
+        'current': padded(current, 0.0),
+        'remaining': padded(np.maximum(target - current, 0.0), 0.0),
+        'deadline': padded(deadline, np.nan),
+    }
+    return user_ids, surplus, goals
+
+
+def project(surplus, goals, horizon):
+    """
+    Vectorised waterfall for ``(U,)`` surplus and ``(U, G)`` goal arrays.
+
+    Returns ``completion`` (months until funded, inf if never),
+    ``required`` (monthly surplus needed to meet each deadline, NaN without
+    one), ``feasible`` and ``balances`` of shape ``(U, G, horizon)``.
+    """
+    remaining = goals['remaining']
+    needed = np.cumsum(remaining, axis=1)              # C: this goal and all before it
+    needed_before = needed - remaining                  # C_prev
+    s = surplus[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        completion = np.where(remaining <= 0, 0.0, np.where(s > 0, np.ceil(needed / s), np.inf))
+        deadline = goals['deadline']
+        required = np.where(np.isnan(deadline), np.nan, needed / np.maximum(deadline, 1))
+    feasible = np.where(np.isnan(deadline), np.isfinite(completion), completion <= np.maximum(deadline, 0))
+
+    months = np.arange(1, horizon + 1, dtype=float)
+    paid_in = s[:, :, None] * months[None, None, :] - needed_before[:, :, None]
+    balances = goals['current'][:, :, None] + np.clip(paid_in, 0.0, remaining[:, :, None])
+    return completion, required, feasible, balances
+
+
+def compute_projections(user_ids, horizon=None, today=None):
+    """Projections for ``user_ids`` as ``{user_id: projection}`` (users without goals included)."""
+    horizon = horizon or getattr(settings, 'GOAL_PROJECTION_MONTHS', 60)
+    today = today or timezone.localdate()
+    user_ids, surplus, goals = load_batch(user_ids, today)
+    completion, required, feasible, balances = project(surplus, goals, horizon)
+    labels = {}
+
+    def month_label(offset):
+        if offset not in labels:
+            labels[offset] = add_months(today, offset).strftime('%Y-%m')
+        return labels[offset]
+
+    months = [month_label(m) for m in range(1, horizon + 1)]
+    balances = np.round(balances, 2)
+
+    projections = {}
+    for row, user_id in enumerate(user_ids.tolist()):
+        entries = []
+        for slot in np.flatnonzero(goals['ids'][row]).tolist():
+            done = completion[row, slot]
+            entries.append({
+                'goal_id': int(goals['ids'][row, slot]),
+                'completion_month': month_label(int(done)) if np.isfinite(done) else None,
+                'feasible': bool(feasible[row, slot]),
+                'required_monthly': None if np.isnan(required[row, slot]) else round(float(required[row, slot]), 2),
+                'balances': balances[row, slot].tolist(),
+            })
+        projections[user_id] = {
+            'as_of': today.isoformat(),
+            'surplus': round(float(surplus[row]), 2),
+            'months': months,
+            'goals': entries,
+        }
+    return projections
+
+
+def get_projection(user_id):
+    """A user's projection from the cache, computed and stored on a miss."""
+    cache = _cache()
+    projection = cache.get(_key(user_id))
+    if projection is None:
+        projection = compute_projections([user_id])[user_id]
+        cache.set(_key(user_id), projection, timeout=getattr(settings, 'GOAL_PROJECTION_TTL', 24 * 3600))
+    return projection
+
+
+def invalidate_projections(user_ids, using=None):
+    """Drop cached projections now and again on commit (see ``accounts.cache``)."""
+    keys = [_key(user_id) for user_id in user_ids]
+    _cache().delete_many(keys)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: _cache().delete_many(keys), using=using)
+
+
+def refresh_projections(user_ids, batch_size=5_000, horizon=None):
+    """Recompute and cache projections for ``user_ids`` in batches; returns stats."""
+    stats = ProjectionStats()
+    started = time.perf_counter()
+    user_ids = list(user_ids)
+    timeout = getattr(settings, 'GOAL_PROJECTION_TTL', 24 * 3600)
+    for start in range(0, len(user_ids), batch_size):
+        projections = compute_projections(user_ids[start:start + batch_size], horizon)
+        _cache().set_many({_key(user_id): value for user_id, value in projections.items()}, timeout=timeout)
+        stats.users += len(projections)
+        stats.goals += sum(len(value['goals']) for value in projections.values())
+    stats.elapsed = time.perf_counter() - started
+    return stats
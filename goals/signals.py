@@ -0,0 +1,30 @@
+"""
+Drop cached goal projections when their inputs change.
+
+A projection depends on the user's survey profile (income, needs, limit)
+and their goals. The survey upserts the profile without signals, so
+completing it invalidates through the user save, as in
+``dashboard.signals``. Bulk writers call ``invalidate_projections`` and,
+for the dashboard's goal fragment, ``dashboard.cache.bump_data_version``
+themselves.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from accounts.models import CustomUser, UserProfile
+from .models import Goal
+from .projections import invalidate_projections
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def invalidate_projection(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_projections([instance.user_id], using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_projection_on_onboarding(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'onboarding_completed' in update_fields):
+        invalidate_projections([instance.pk], using=kwargs.get('using'))
@@ -1,3 +1,209 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from django.core.cache import cache
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from accounts.models import UserProfile
+from dashboard.cache import get_data_version
+from goals.models import Goal
+from goals.parsers import ParsedGoal, parse_goals
+from goals.projections import compute_projections, get_projection
 
-# Create your tests here.
+User = get_user_model()
+
+
+class ParseGoalsTests(SimpleTestCase):
+    def test_survey_example(self):
+        """Test the format suggested by the survey help text."""
+        goals = parse_goals('Car: 500000 by Dec 2026, Vacation: 100000 by Jul 2026')
+        self.assertEqual([(g.name, g.amount, g.target_date) for g in goals], [
+            ('Car', Decimal('500000'), date(2026, 12, 31)),
+            ('Vacation', Decimal('100000'), date(2026, 7, 31)),
+        ])
+        self.assertEqual(goals[1].category, 'travel')
+
+    def test_currency_symbols_and_grouping(self):
+        """Test currency prefixes and Indian/Western digit grouping."""
+        goals = parse_goals('House: Rs. 50,00,000; MBA fees = $45,000.50; Bike: 1,20,000/-')
+        self.assertEqual([g.amount for g in goals], [Decimal('5000000'), Decimal('45000.50'), Decimal('120000')])
+
+    def test_suffixes(self):
+        """Test k / lakh / crore / million suffixes."""
+        goals = parse_goals('A: 80k, B: 2.5 lakh, C: 1.2L, D: 1 cr, E: 2M, F: 3 lacs')
+        self.assertEqual([g.amount for g in goals], [
+            Decimal('80000'), Decimal('250000'), Decimal('120000'),
+            Decimal('10000000'), Decimal('2000000'), Decimal('300000'),
+        ])
+
+    def test_date_formats(self):
+        """Test the supported date formats."""
+        cases = {
+            'by 2026-11-05': date(2026, 11, 5),
+            'by 2026-02': date(2026, 2, 28),
+            'by 31/03/2027': date(2027, 3, 31),
+            'by 09/2027': date(2027, 9, 30),
+            'by 15th Aug 2026': date(2026, 8, 15),
+            'by March 15, 2030': date(2030, 3, 15),
+            'in Jan 27': date(2027, 1, 31),
+            'by 2028': date(2028, 12, 31),
+        }
+        for suffix, expected in cases.items():
+            goals = parse_goals(f'Goal: 1000 {suffix}')
+            self.assertEqual(goals[0].target_date, expected, suffix)
+
+    def test_invalid_date_is_dropped(self):
+        """Test an impossible date leaves the goal without a deadline."""
+        self.assertIsNone(parse_goals('Phone: 20000 by 2026-02-30')[0].target_date)
+
+    def test_name_with_digits_and_no_separator(self):
+        """Test names containing digits and entries without a colon."""
+        goals = parse_goals('iPhone 15: 80000 by Dec 12, 2026, Trip 1.2L in Jan 27')
+        self.assertEqual([g.name for g in goals], ['iPhone 15', 'Trip'])
+        self.assertEqual(goals[0].target_date, date(2026, 12, 12))
+
+    def test_relative_deadline(self):
+        """Test "in N months/years" is a deadline, not another goal."""
+        today = date(2026, 8, 31)
+        goals = parse_goals('Bike: 1.2L in 6 months', today)
+        self.assertEqual(goals, [ParsedGoal('Bike', Decimal('120000.00'), date(2027, 2, 28), 'other')])
+        goals = parse_goals('Trip 50k in 3 weeks; House: 40L in 2 yrs', today)
+        self.assertEqual([(g.name, g.target_date) for g in goals],
+                         [('Trip', date(2026, 9, 21)), ('House', date(2028, 8, 31))])
+
+    def test_text_without_amounts(self):
+        """Test free text with no amounts yields no goals."""
+        self.assertEqual(parse_goals('save more, travel someday'), [])
+        self.assertEqual(parse_goals(''), [])
+
+
+class GoalManagerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+
+    def test_replace_from_text_keeps_manual_goals(self):
+        """Test re-parsing replaces survey goals but not manual ones."""
+        Goal.objects.create(user=self.user, name='Manual', target_amount=10)
+        Goal.objects.replace_from_text(self.user, 'Car: 500000, Bike: 90000')
+        Goal.objects.replace_from_text(self.user, 'Car: 600000')
+        self.assertEqual(
+            sorted(Goal.objects.filter(user=self.user).values_list('name', 'target_amount')),
+            [('Car', Decimal('600000.00')), ('Manual', Decimal('10.00'))],
+        )
+
+
+@override_settings(MIDDLEWARE=[
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+])
+class SurveyGoalsTests(TestCase):
+    def test_survey_creates_goal_rows(self):
+        """Test submitting the survey stores parsed goals."""
+        User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.login(username='test@example.com', password='testpass123')
+        self.client.post('/accounts/survey/', data={
+            'monthly_income': '50000',
+            'necessary_needs': '30000',
+            'goals_and_wants': 'Car: 500000 by Dec 2026, Vacation: 100000 by Jul 2026',
+            'monthly_unwanted_limit': '5000',
+        })
+        goals = Goal.objects.order_by('name')
+        self.assertEqual([g.name for g in goals], ['Car', 'Vacation'])
+        self.assertTrue(all(g.from_survey for g in goals))
+
+
+class BackfillGoalsCommandTests(TestCase):
+    def test_backfill_in_batches(self):
+        """Test the command parses every profile and is idempotent."""
+        for i in range(5):
+            user = User.objects.create_user(email=f'user{i}@example.com', password='x')
+            UserProfile.objects.create(user=user, goals_and_wants=f'Car: {i + 1}00000, Trip: 50k')
+        UserProfile.objects.create(
+            user=User.objects.create_user(email='empty@example.com', password='x'),
+        )
+        out = StringIO()
+        call_command('backfill_goals', batch_size=2, stdout=out)
+        call_command('backfill_goals', batch_size=2, stdout=out)
+        self.assertEqual(Goal.objects.count(), 10)
+        self.assertIn('Parsed 5 profiles into 10 goals', out.getvalue())
+
+
+    def test_backfill_invalidates_dashboard_fragments(self):
+        """Test backfilled users' cached dashboard fragments are dropped."""
+        user = User.objects.create_user(email='user@example.com', password='x')
+        UserProfile.objects.create(user=user, goals_and_wants='Car: 500000')
+        before = get_data_version(user.pk)
+        call_command('backfill_goals', stdout=StringIO())
+        self.assertNotEqual(get_data_version(user.pk), before)
+
+class GoalProjectionTests(TestCase):
+    def setUp(self):
+        """Create a user with a 15,000/month surplus and three goals."""
+        cache.clear()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        UserProfile.objects.create(
+            user=self.user, monthly_income=50000, necessary_needs=30000, monthly_unwanted_limit=5000,
+        )
+        self.later = Goal.objects.create(user=self.user, name='Later', target_amount=10000, priority='low')
+        self.bike = Goal.objects.create(
+            user=self.user, name='Bike', target_amount=60000, current_amount=15000,
+            priority='medium', target_date=date(2026, 5, 31),
+        )
+        self.trip = Goal.objects.create(
+            user=self.user, name='Trip', target_amount=30000, priority='high', target_date=date(2026, 4, 30),
+        )
+        Goal.objects.create(user=self.user, name='Done', target_amount=5, status='completed')
+
+    def test_waterfall_by_priority_and_deadline(self):
+        """Test the surplus funds goals in priority order, one after another."""
+        projection = compute_projections([self.user.pk], horizon=6, today=date(2026, 1, 15))[self.user.pk]
+        self.assertEqual(projection['surplus'], 15000)
+        self.assertEqual(projection['months'][0], '2026-02')
+        trip, bike, later = projection['goals']
+        self.assertEqual([trip['goal_id'], bike['goal_id'], later['goal_id']], [self.trip.pk, self.bike.pk, self.later.pk])
+        self.assertEqual((trip['completion_month'], trip['feasible'], trip['required_monthly']), ('2026-03', True, 10000))
+        # Bike starts after the trip is funded: 75,000 needed in 4 months.
+        self.assertEqual((bike['completion_month'], bike['feasible'], bike['required_monthly']), ('2026-06', False, 18750))
+        self.assertEqual(bike['balances'], [15000, 15000, 30000, 45000, 60000, 60000])
+        self.assertEqual((later['completion_month'], later['feasible'], later['required_monthly']), ('2026-07', True, None))
+
+    def test_no_surplus(self):
+        """Test goals are never funded when spending exceeds income."""
+        UserProfile.objects.filter(user=self.user).update(necessary_needs=60000)
+        projection = compute_projections([self.user.pk], horizon=3, today=date(2026, 1, 15))[self.user.pk]
+        self.assertEqual(projection['surplus'], 0)
+        self.assertEqual({goal['completion_month'] for goal in projection['goals']}, {None})
+        self.assertFalse(any(goal['feasible'] for goal in projection['goals']))
+
+    def test_batch_matches_single_user(self):
+        """Test users projected together get the same result as alone."""
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        Goal.objects.create(user=other, name='Laptop', target_amount=90000)
+        today = date(2026, 1, 15)
+        together = compute_projections([other.pk, self.user.pk], horizon=4, today=today)
+        self.assertEqual(together[self.user.pk], compute_projections([self.user.pk], horizon=4, today=today)[self.user.pk])
+        self.assertEqual(together[other.pk]['surplus'], 0)
+        self.assertEqual(len(together[other.pk]['goals']), 1)
+
+    def test_cached_until_goals_or_profile_change(self):
+        """Test the cached projection is dropped when its inputs change."""
+        self.assertEqual(len(get_projection(self.user.pk)['goals']), 3)
+        Goal.objects.filter(pk=self.later.pk).update(status='abandoned')
+        self.assertEqual(len(get_projection(self.user.pk)['goals']), 3)
+        Goal.objects.create(user=self.user, name='House', target_amount=10**6)
+        self.assertEqual(len(get_projection(self.user.pk)['goals']), 3)
+        profile = UserProfile.objects.get(user=self.user)
+        profile.monthly_income = 100000
+        profile.save()
+        self.assertEqual(get_projection(self.user.pk)['surplus'], 65000)
+
+    def test_api_and_command(self):
+        """Test the API endpoint and the refresh command."""
+        self.client.force_login(self.user)
+        self.assertEqual(len(self.client.get('/api/goals/projection/').json()['goals']), 3)
+        User.objects.filter(pk=self.user.pk).update(onboarding_completed=True)
+        out = StringIO()
+        call_command('project_goals', stdout=out)
+        self.assertIn('Projected 3 goals for 1 users', out.getvalue())
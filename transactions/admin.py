@@ -1,3 +1,56 @@
 from django.contrib import admin
+from .models import BankAccount, BankStatement, RecurringScan, Transaction, TransactionExport, TransactionRecurring
 
-# Register your models here.
+
+@admin.register(BankAccount)
+class BankAccountAdmin(admin.ModelAdmin):
+	model = BankAccount
+	list_display = ('account_name', 'user', 'bank_name', 'account_type', 'last_sync', 'is_active')
+	search_fields = ('account_name', 'user__email')
+
+
+@admin.register(Transaction)
+class TransactionAdmin(admin.ModelAdmin):
+	model = Transaction
+	list_display = ('transaction_date', 'description', 'amount', 'transaction_type', 'category', 'user')
+	list_filter = ('transaction_type',)
+	search_fields = ('description', 'merchant', 'user__email')
+	raw_id_fields = ('user', 'bank_account')
+	date_hierarchy = 'transaction_date'
+
+
+@admin.register(BankStatement)
+class BankStatementAdmin(admin.ModelAdmin):
+	model = BankStatement
+	list_display = ('file', 'user', 'status', 'rows_read', 'rows_imported', 'rows_duplicate', 'uploaded_at')
+	list_filter = ('status', 'file_type')
+	search_fields = ('file', 'user__email')
+	raw_id_fields = ('user', 'bank_account')
+	readonly_fields = ('uploaded_at', 'started_at', 'processed_at')
+
+
+@admin.register(TransactionExport)
+class TransactionExportAdmin(admin.ModelAdmin):
+	model = TransactionExport
+	list_display = ('user', 'file_type', 'status', 'rows_total', 'requested_at', 'processed_at')
+	list_filter = ('status', 'file_type')
+	search_fields = ('user__email',)
+	raw_id_fields = ('user',)
+	readonly_fields = ('requested_at', 'processed_at')
+
+
+@admin.register(TransactionRecurring)
+class TransactionRecurringAdmin(admin.ModelAdmin):
+	model = TransactionRecurring
+	list_display = ('name', 'user', 'amount', 'frequency', 'last_date', 'next_expected_date', 'is_active')
+	list_filter = ('frequency', 'is_active')
+	search_fields = ('name', 'merchant_key', 'user__email')
+	raw_id_fields = ('user', 'category')
+	readonly_fields = ('merchant_key', 'amount_band', 'detected_at', 'created_at', 'updated_at')
+
+
+@admin.register(RecurringScan)
+class RecurringScanAdmin(admin.ModelAdmin):
+	model = RecurringScan
+	list_display = ('started_at', 'incremental', 'scoped', 'users', 'transactions', 'detected', 'finished_at')
+	list_filter = ('incremental', 'scoped')
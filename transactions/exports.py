@@ -0,0 +1,171 @@
+"""
+Streaming exports of a user's transaction history.
+
+Rows come from ``values_list().iterator(chunk_size)`` (a server-side
+cursor on PostgreSQL), so no more than one chunk of tuples is held at a
+time:
+
+* CSV is generated line by line and sent through ``StreamingHttpResponse``
+  or written to a file;
+* XLSX goes through openpyxl's write-only workbook, which writes each row
+  to a temporary XML part as it is appended. A zip archive cannot be sent
+  before it is finished, so the workbook is saved to a temporary file and
+  then streamed from disk.
+
+Memory stays flat however long the history is. Building a workbook still
+takes time in proportion to its rows, so the view queues XLSX exports of
+more than ``EXPORT_XLSX_INLINE_ROWS`` rows as a TransactionExport, which
+:func:`process_export` writes in the background for download.
+"""
+import csv
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+from django.core.files import File
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import Transaction, TransactionExport
+
+EXPORT_FIELDS = (
+    'transaction_date', 'description', 'merchant', 'category__name', 'transaction_type', 'amount', 'notes',
+)
+EXPORT_HEADER = ('Date', 'Description', 'Merchant', 'Category', 'Type', 'Amount', 'Notes')
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+@dataclass
+class ExportStats:
+    rows: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def parse_export_date(value):
+    """A ``YYYY-MM-DD`` date, or None when ``value`` is empty; raises ValueError otherwise."""
+    if not value:
+        return None
+    # parse_date returns None for text that is not a date at all.
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"'{value}' is not a YYYY-MM-DD date")
+    return parsed
+
+
+def export_queryset(user, date_from=None, date_to=None):
+    """The user's transactions in date order, as ``EXPORT_FIELDS`` tuples."""
+    queryset = Transaction.objects.filter(user=user)
+    if date_from:
+        queryset = queryset.filter(transaction_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(transaction_date__lte=date_to)
+    return queryset.order_by('transaction_date', 'id').values_list(*EXPORT_FIELDS)
+
+
+def iter_rows(queryset, chunk_size=2_000, stats=None):
+    for row in queryset.iterator(chunk_size=chunk_size):
+        if stats is not None:
+            stats.rows += 1
+        yield row
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, lines_per_chunk=500):
+    """Yield the CSV text for ``rows`` (with a header) in chunks of lines."""
+    writer = csv.writer(_Echo())
+    buffer = [writer.writerow(EXPORT_HEADER)]
+    for row in rows:
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= lines_per_chunk:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def write_xlsx(rows, target):
+    """Write ``rows`` as a one-sheet workbook to ``target`` (path or binary file)."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Transactions')
+    sheet.append(EXPORT_HEADER)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(target)
+
+
+def xlsx_file(rows):
+    """Build the workbook in an anonymous temporary file, rewound for reading."""
+    handle = tempfile.TemporaryFile()
+    write_xlsx(rows, handle)
+    handle.seek(0)
+    return handle
+
+
+def export_to_path(queryset, path, file_type, chunk_size=2_000):
+    """Write an export file; returns :class:`ExportStats`."""
+    stats = ExportStats()
+    started = time.perf_counter()
+    rows = iter_rows(queryset, chunk_size, stats)
+    if file_type == 'xlsx':
+        write_xlsx(rows, path)
+    else:
+        with open(path, 'w', newline='', encoding='utf-8') as handle:
+            for chunk in iter_csv(rows):
+                handle.write(chunk)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def process_export(export_id):
+    """
+    Write a queued TransactionExport to its ``file``, recording its status.
+
+    Only a pending export is claimed, so a retried or duplicated job is a
+    no-op. The file is written to a temporary path and then saved to storage.
+    """
+    exports = TransactionExport.objects.filter(pk=export_id)
+    claimed = exports.filter(status=TransactionExport.STATUS_PENDING).update(
+        status=TransactionExport.STATUS_PROCESSING,
+    )
+    if not claimed:
+        return None
+    export = TransactionExport.objects.select_related('user').get(pk=export_id)
+    queryset = export_queryset(export.user, export.date_from, export.date_to)
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, f'transactions.{export.file_type}')
+            stats = export_to_path(queryset, path, export.file_type)
+            with open(path, 'rb') as handle:
+                export.file.save(f'transactions-{export.pk}.{export.file_type}', File(handle), save=False)
+    except Exception as exc:
+        exports.update(
+            status=TransactionExport.STATUS_FAILED,
+            error_message=str(exc),
+            processed_at=timezone.now(),
+        )
+        if isinstance(exc, OSError):
+            return None
+        raise
+
+    exports.update(
+        status=TransactionExport.STATUS_PROCESSED,
+        file=export.file.name,
+        rows_total=stats.rows,
+        processed_at=timezone.now(),
+    )
+    return stats
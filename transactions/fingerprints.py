@@ -0,0 +1,57 @@
+"""
+Content fingerprints used to de-duplicate repeated statement uploads.
+
+A fingerprint hashes (user, account, date, amount, type, normalised
+description) plus an occurrence index, so two genuinely identical lines on
+the same statement (two coffees of the same price on the same day) stay
+distinct while the same lines uploaded again in an overlapping statement
+produce the same fingerprints.
+"""
+from hashlib import blake2b
+
+import pandas as pd
+
+FINGERPRINT_LENGTH = 32
+_NON_ALNUM = r'[^a-z0-9]+'
+
+
+def normalise_descriptions(series):
+    """Lowercase and reduce descriptions to alphanumeric words."""
+    return series.str.lower().str.replace(_NON_ALNUM, ' ', regex=True).str.strip()
+
+
+def merchant_keys(merchant, description):
+    """Merchant name if set, else the description without digits, normalised."""
+    from_description = normalise_descriptions(description).str.replace(r'\d+', ' ', regex=True)
+    keys = normalise_descriptions(merchant).where(merchant.str.strip() != '', from_description)
+    return keys.str.split().str.join(' ')
+
+
+def compute_fingerprints(frame, user_id, account_id=None, carried_counts=None):
+    """
+    Fingerprint every row of a normalised statement chunk.
+
+    Occurrences are counted within the chunk; ``carried_counts`` (returned
+    by the previous call) continues the count across chunk boundaries,
+    which is enough because statements list each day's lines together.
+    Returns ``(fingerprints, counts)``.
+    """
+    if frame.empty:
+        return pd.Series([], index=frame.index, dtype=object), {}
+    base = (
+        f'{user_id}|{account_id or ""}|'
+        + frame['transaction_date'].astype(str)
+        + '|' + frame['amount'].map('{:.2f}'.format)
+        + '|' + frame['transaction_type']
+        + '|' + normalise_descriptions(frame['description'])
+    )
+    occurrence = base.groupby(base, sort=False).cumcount()
+    if carried_counts:
+        occurrence += base.map(carried_counts).fillna(0).astype(int)
+    keys = base + '|' + occurrence.astype(str)
+    fingerprints = pd.Series(
+        [blake2b(key.encode(), digest_size=FINGERPRINT_LENGTH // 2).hexdigest() for key in keys],
+        index=frame.index,
+    )
+    counts = (occurrence + 1).groupby(base, sort=False).max().to_dict()
+    return fingerprints, counts
@@ -0,0 +1,28 @@
+from django import forms
+from .models import BankAccount, BankStatement
+from .parsers import StatementFormatError, detect_file_type
+
+
+class StatementUploadForm(forms.ModelForm):
+    """Upload a CSV or XLSX bank statement for background import."""
+
+    class Meta:
+        model = BankStatement
+        fields = ('file', 'bank_account')
+        labels = {
+            'file': 'Statement file (.csv or .xlsx)',
+            'bank_account': 'Account',
+        }
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['bank_account'].queryset = BankAccount.objects.filter(user=user, is_active=True)
+        self.fields['file'].widget.attrs['accept'] = '.csv,.xlsx'
+
+    def clean_file(self):
+        upload = self.cleaned_data.get('file')
+        try:
+            self.instance.file_type = detect_file_type(upload.name)
+        except StatementFormatError as exc:
+            raise forms.ValidationError(str(exc))
+        return upload
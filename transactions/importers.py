@@ -0,0 +1,216 @@
+"""
+Bank statement import pipeline.
+
+Reads a statement chunk by chunk (see ``transactions.parsers``), normalises
+each chunk and writes it with ``bulk_create`` inside one transaction per
+chunk, so memory stays bounded by ``chunk_size`` regardless of file size.
+
+Rows already imported from an earlier, overlapping statement are detected
+by fingerprint (see ``transactions.fingerprints``) with one indexed
+``fingerprint__in`` lookup per batch and skipped. New rows are categorised
+a chunk at a time by the user's keyword rules (see
+``transactions.categoriser``).
+"""
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+import pandas as pd
+from django.db import reset_queries, transaction
+from django.utils import timezone
+from agents.incremental import score_imported
+from dashboard.rollups import apply_frame
+from .categoriser import get_categoriser
+from .fingerprints import compute_fingerprints
+from .models import BankStatement, Transaction
+from .parsers import (
+    StatementFormatError, detect_file_type, estimate_row_count, iter_chunks, normalise_chunk, resolve_columns,
+)
+
+
+TRANSACTION_COLUMNS = ['transaction_date', 'amount', 'transaction_type', 'description', 'merchant', 'fingerprint']
+
+
+@dataclass
+class ImportStats:
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_skipped: int = 0
+    rows_duplicate: int = 0
+    rows_categorised: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+
+class StatementImporter:
+    """
+    Import a CSV or XLSX statement into a user's transactions.
+
+    ``chunk_size`` rows are read and normalised at a time; each chunk is
+    written in ``batch_size`` INSERTs inside a single database transaction.
+    """
+
+    def __init__(self, user, bank_account=None, chunk_size=10_000, batch_size=2_000, dayfirst=True):
+        self.user = user
+        self.bank_account = bank_account
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.dayfirst = dayfirst
+
+    def import_file(self, source, file_type=None, on_progress=None):
+        """
+        Import ``source`` (a path or file object) and return ImportStats.
+
+        ``on_progress(stats)`` is called after each committed chunk.
+        """
+        file_type = file_type or detect_file_type(getattr(source, 'name', source))
+        stats = ImportStats()
+        started = time.perf_counter()
+        columns = None
+        counts = None
+        self.categoriser = get_categoriser(self.user.pk)
+
+        for chunk in iter_chunks(source, file_type, self.chunk_size):
+            if columns is None:
+                columns = resolve_columns(chunk.columns)
+            normalised, skipped = normalise_chunk(chunk, columns, dayfirst=self.dayfirst)
+            normalised['fingerprint'], counts = compute_fingerprints(
+                normalised, self.user.pk, self.account_id, carried_counts=counts,
+            )
+            imported, categorised = self.write_chunk(normalised)
+            stats.rows_categorised += categorised
+            stats.rows_read += len(chunk)
+            stats.rows_skipped += skipped
+            stats.rows_imported += imported
+            stats.rows_duplicate += len(normalised) - imported
+            if on_progress is not None:
+                stats.elapsed = time.perf_counter() - started
+                on_progress(stats)
+            # Keep DEBUG's SQL log from growing with the statement.
+            reset_queries()
+
+        if self.bank_account is not None:
+            self.bank_account.last_sync = timezone.now()
+            self.bank_account.save(update_fields=['last_sync'])
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    @property
+    def account_id(self):
+        return self.bank_account.pk if self.bank_account is not None else None
+
+    def build_transactions(self, normalised):
+        user_id = self.user.pk
+        account_id = self.account_id
+        return [
+            Transaction(
+                user_id=user_id,
+                bank_account_id=account_id,
+                transaction_date=transaction_date,
+                amount=Decimal(f'{amount:.2f}'),
+                transaction_type=transaction_type,
+                description=description,
+                merchant=merchant,
+                fingerprint=fingerprint,
+                category_id=None if pd.isna(category_id) else int(category_id),
+            )
+            for transaction_date, amount, transaction_type, description, merchant, fingerprint, category_id
+            in normalised[[*TRANSACTION_COLUMNS, 'category_id']].itertuples(index=False, name=None)
+        ]
+
+    def existing_fingerprints(self, fingerprints):
+        """Return the subset of ``fingerprints`` already stored, batch by batch."""
+        existing = set()
+        for start in range(0, len(fingerprints), self.batch_size):
+            batch = fingerprints[start:start + self.batch_size]
+            existing.update(
+                Transaction.objects.filter(fingerprint__in=batch).values_list('fingerprint', flat=True)
+            )
+        return existing
+
+    def written_fingerprints(self, objs):
+        """
+        Fingerprints of ``objs`` whose stored row is the one they inserted.
+
+        ``bulk_create`` sets each object's ``created_at`` before the insert,
+        so a row a concurrent import won has another timestamp.
+        """
+        stamps = {obj.fingerprint: obj.created_at for obj in objs}
+        fingerprints = list(stamps)
+        written = set()
+        for start in range(0, len(fingerprints), self.batch_size):
+            rows = Transaction.objects.filter(fingerprint__in=fingerprints[start:start + self.batch_size])
+            written.update(
+                fingerprint for fingerprint, created_at in rows.values_list('fingerprint', 'created_at')
+                if created_at == stamps[fingerprint]
+            )
+        return written
+
+    def write_chunk(self, normalised):
+        """
+        Write the new rows of one chunk atomically; return the rows inserted
+        and how many of them got a category.
+        """
+        with transaction.atomic():
+            existing = self.existing_fingerprints(normalised['fingerprint'].tolist())
+            if existing:
+                normalised = normalised[~normalised['fingerprint'].isin(existing)]
+            normalised = normalised.assign(category_id=self.categoriser.categorise_frame(normalised))
+            objs = self.build_transactions(normalised)
+            # ignore_conflicts covers a concurrent import of the same lines;
+            # only the rows this insert actually wrote go downstream.
+            Transaction.objects.bulk_create(objs, batch_size=self.batch_size, ignore_conflicts=True)
+            written = self.written_fingerprints(objs)
+            if len(written) < len(objs):
+                normalised = normalised[normalised['fingerprint'].isin(written)]
+            apply_frame(self.user.pk, normalised)
+            score_imported(self.user.pk, normalised['fingerprint'].tolist(), batch_size=self.batch_size)
+        return len(normalised), int(normalised['category_id'].notna().sum())
+
+
+def process_statement(statement_id):
+    """
+    Import an uploaded BankStatement, recording status and progress on it.
+
+    Only a pending statement is claimed, so a retried or duplicated job is a
+    no-op. Progress is written with plain UPDATEs between chunks; no lock is
+    held on the statement row while the import runs.
+    """
+    rows = BankStatement.objects.filter(pk=statement_id)
+    claimed = rows.filter(status=BankStatement.STATUS_PENDING).update(
+        status=BankStatement.STATUS_PROCESSING,
+        started_at=timezone.now(),
+    )
+    if not claimed:
+        return None
+    statement = BankStatement.objects.select_related('user', 'bank_account').get(pk=statement_id)
+
+    def on_progress(stats):
+        rows.update(
+            rows_read=stats.rows_read,
+            rows_imported=stats.rows_imported,
+            rows_skipped=stats.rows_skipped,
+            rows_duplicate=stats.rows_duplicate,
+        )
+
+    try:
+        with statement.file.open('rb') as handle:
+            rows.update(rows_total=estimate_row_count(handle, statement.file_type))
+            importer = StatementImporter(statement.user, statement.bank_account)
+            stats = importer.import_file(handle, statement.file_type, on_progress=on_progress)
+    except Exception as exc:
+        rows.update(
+            status=BankStatement.STATUS_FAILED,
+            error_message=str(exc),
+            processed_at=timezone.now(),
+        )
+        if isinstance(exc, (StatementFormatError, ValueError, OSError)):
+            return None
+        raise
+
+    on_progress(stats)
+    rows.update(status=BankStatement.STATUS_PROCESSED, processed_at=timezone.now())
+    return stats
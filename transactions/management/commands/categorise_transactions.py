@@ -0,0 +1,91 @@
+import time
+
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from dashboard.rollups import rebuild_for_users
+from transactions.categoriser import get_categoriser
+from transactions.models import Transaction
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Categorise uncategorised transactions with the keyword rules, then rebuild their rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only categorise this user (email).')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Users categorised and updated per transaction (default: 500).',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.for_email(options['user'])
+            if not users.exists():
+                raise CommandError(f"No user with email '{options['user']}'")
+
+        started = time.perf_counter()
+        counts = [0, 0, 0, 0]
+        batch = []
+        for user_id in users.values_list('pk', flat=True).iterator(chunk_size=batch_size):
+            batch.append(user_id)
+            if len(batch) >= batch_size:
+                counts = [a + b for a, b in zip(counts, self._categorise_batch(batch))]
+                batch = []
+        if batch:
+            counts = [a + b for a, b in zip(counts, self._categorise_batch(batch))]
+
+        total, categorised, hits, lookups = counts
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0.0
+        hit_rate = hits / lookups if lookups else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'Categorised {categorised} of {total} uncategorised transactions in {elapsed:.1f}s, '
+            f'{rate:,.0f} transactions/sec, {hit_rate:.0%} description cache hits.'
+        ))
+
+    def _categorise_batch(self, user_ids):
+        """Returns (uncategorised, categorised, cache hits, cache lookups) for the batch."""
+        # One range query for the batch; users without uncategorised rows
+        # never have their rules loaded or their rollups rebuilt.
+        rows = (
+            Transaction.objects
+            .filter(user_id__gte=user_ids[0], user_id__lte=user_ids[-1], category__isnull=True)
+            .order_by('user_id', 'pk')
+            .values_list('user_id', 'pk', 'merchant', 'description')
+        )
+        frame = pd.DataFrame.from_records(rows.iterator(chunk_size=20_000),
+                                          columns=['user_id', 'pk', 'merchant', 'description'])
+        frame = frame[frame['user_id'].isin(user_ids)]
+        total = hits = lookups = 0
+        updates, changed_users = [], []
+        for user_id, rows in frame.groupby('user_id', sort=False):
+            categoriser = get_categoriser(int(user_id))
+            total += len(rows)
+            if categoriser.pattern is None:
+                continue
+            before = categoriser.cache_stats()
+            found = categoriser.categorise_frame(rows)
+            after = categoriser.cache_stats()
+            hits += after['hits'] - before['hits']
+            lookups += after['hits'] + after['misses'] - before['hits'] - before['misses']
+            found = found.dropna().astype(int)
+            if found.empty:
+                continue
+            updates.extend(
+                Transaction(pk=pk, category_id=category_id)
+                for pk, category_id in zip(rows.loc[found.index, 'pk'].tolist(), found.tolist())
+            )
+            changed_users.append(int(user_id))
+        if updates:
+            with transaction.atomic():
+                Transaction.objects.bulk_update(updates, ['category'], batch_size=2_000)
+                # bulk_update sends no signals, so the rollups are rebuilt.
+                rebuild_for_users(changed_users)
+        return total, len(updates), hits, lookups
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from transactions.recurring import detect_recurring
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Detect recurring payments (subscriptions, bills) from users' expenses."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only scan this user (email).')
+        parser.add_argument('--batch-size', type=int, default=1_000, help='Users per batch (default: 1000).')
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only re-examine merchants with expenses added since the last scan.',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['user']:
+            user_ids = list(User.objects.for_email(options['user']).values_list('pk', flat=True))
+            if not user_ids:
+                raise CommandError(f"No user with email '{options['user']}'")
+
+        stats = detect_recurring(user_ids, incremental=options['incremental'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Scanned {stats.transactions} transactions for {stats.users} users, '
+            f'{stats.detected} recurring payments in {stats.elapsed:.1f}s, '
+            f'{stats.transactions_per_second:,.0f} transactions/sec.'
+        ))
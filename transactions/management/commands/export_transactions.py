@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from transactions.exports import export_queryset, export_to_path, parse_export_date
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Write a user's transaction history to a CSV or XLSX file, streaming rows from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Output file (.csv or .xlsx).')
+        parser.add_argument('--user', required=True, help='Email of the user to export.')
+        parser.add_argument('--format', choices=('csv', 'xlsx'), help='Override the type taken from the extension.')
+        parser.add_argument('--from', dest='date_from', help='First date to include (YYYY-MM-DD).')
+        parser.add_argument('--to', dest='date_to', help='Last date to include (YYYY-MM-DD).')
+        parser.add_argument('--chunk-size', type=int, default=2_000, help='Rows fetched per round trip (default: 2000).')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.for_email(options['user']).get()
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email '{options['user']}'")
+        try:
+            date_from, date_to = (parse_export_date(options[key]) for key in ('date_from', 'date_to'))
+        except ValueError:
+            raise CommandError('--from/--to must be dates (YYYY-MM-DD)')
+
+        file_type = options['format'] or ('xlsx' if options['path'].lower().endswith('.xlsx') else 'csv')
+        try:
+            stats = export_to_path(
+                export_queryset(user, date_from, date_to), options['path'], file_type, options['chunk_size'],
+            )
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {stats.rows} transactions to {options["path"]} '
+            f'in {stats.elapsed:.1f}s, {stats.rows_per_second:,.0f} rows/sec.'
+        ))
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from transactions.importers import StatementImporter
+from transactions.models import BankAccount
+from transactions.parsers import StatementFormatError
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or XLSX bank statement into a user's transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the statement file (.csv or .xlsx).')
+        parser.add_argument('--user', required=True, help='Email of the user who owns the statement.')
+        parser.add_argument('--account', type=int, help='BankAccount id to attach transactions to.')
+        parser.add_argument('--format', choices=('csv', 'xlsx'), help='Override the type detected from the extension.')
+        parser.add_argument('--chunk-size', type=int, default=10_000, help='Rows read per chunk (default: 10000).')
+        parser.add_argument('--batch-size', type=int, default=2_000, help='Rows per INSERT (default: 2000).')
+        parser.add_argument('--monthfirst', action='store_true', help='Parse ambiguous dates as MM/DD instead of DD/MM.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.for_email(options['user']).get()
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email '{options['user']}'")
+
+        bank_account = None
+        if options['account'] is not None:
+            try:
+                bank_account = BankAccount.objects.get(pk=options['account'], user=user)
+            except BankAccount.DoesNotExist:
+                raise CommandError(f"User has no bank account with id {options['account']}")
+
+        importer = StatementImporter(
+            user,
+            bank_account=bank_account,
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            dayfirst=not options['monthfirst'],
+        )
+        try:
+            stats = importer.import_file(options['path'], file_type=options['format'])
+        except (OSError, StatementFormatError) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {stats.rows_imported} of {stats.rows_read} rows '
+            f'({stats.rows_skipped} skipped, {stats.rows_duplicate} already imported) '
+            f'in {stats.elapsed:.1f}s, '
+            f'{stats.rows_per_second:,.0f} rows/sec.'
+        ))
@@ -0,0 +1,57 @@
+# Generated by Django 6.0 on 2026-10-17 19:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_name', models.CharField(max_length=100)),
+                ('account_number', models.CharField(blank=True, max_length=20)),
+                ('bank_name', models.CharField(blank=True, max_length=100)),
+                ('account_type', models.CharField(choices=[('savings', 'Savings'), ('checking', 'Checking'), ('credit_card', 'Credit Card'), ('other', 'Other')], default='savings', max_length=20)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('last_sync', models.DateTimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_accounts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Bank Account',
+                'verbose_name_plural': 'Bank Accounts',
+            },
+        ),
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Always positive; the direction is given by transaction_type', max_digits=12)),
+                ('description', models.CharField(max_length=255)),
+                ('transaction_type', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense'), ('transfer', 'Transfer')], max_length=20)),
+                ('merchant', models.CharField(blank=True, max_length=255)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('bank_account', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to='transactions.bankaccount')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Transaction',
+                'verbose_name_plural': 'Transactions',
+                'indexes': [models.Index(fields=['user', 'transaction_date'], name='transaction_user_id_e55ebe_idx')],
+            },
+        ),
+    ]
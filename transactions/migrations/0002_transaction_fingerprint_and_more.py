@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-17 20:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Content hash of imported rows, used to skip re-uploaded lines', max_length=32, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(fields=('fingerprint',), name='unique_transaction_fingerprint'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 21:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('transactions', '0003_bankstatement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to='dashboard.expensecategory'),
+        ),
+    ]
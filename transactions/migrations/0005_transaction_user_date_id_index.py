@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-17 22:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('transactions', '0004_transaction_category'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_id_e55ebe_idx',
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'transaction_date', 'id'], name='transaction_user_id_53d9df_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-17 22:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('transactions', '0005_transaction_user_date_id_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('incremental', models.BooleanField(default=False)),
+                ('last_transaction_id', models.BigIntegerField(default=0)),
+                ('users', models.PositiveIntegerField(default=0)),
+                ('transactions', models.PositiveIntegerField(default=0)),
+                ('detected', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Recurring Scan',
+                'verbose_name_plural': 'Recurring Scans',
+                'get_latest_by': 'started_at',
+            },
+        ),
+        migrations.CreateModel(
+            name='TransactionRecurring',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('frequency', models.CharField(choices=[('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly')], max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('merchant_key', models.CharField(blank=True, editable=False, max_length=255, null=True)),
+                ('amount_band', models.SmallIntegerField(blank=True, editable=False, help_text='Logarithmic amount bucket, so one merchant can have several recurring amounts', null=True)),
+                ('occurrences', models.PositiveIntegerField(default=0)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('next_expected_date', models.DateField(blank=True, null=True)),
+                ('detected_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurring_transactions', to='dashboard.expensecategory')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Recurring Transaction',
+                'verbose_name_plural': 'Recurring Transactions',
+                'constraints': [models.UniqueConstraint(fields=('user', 'merchant_key', 'amount_band'), name='unique_detected_recurring')],
+            },
+        ),
+    ]
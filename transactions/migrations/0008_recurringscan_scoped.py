@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0007_transactionexport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recurringscan',
+            name='scoped',
+            field=models.BooleanField(default=False),
+        ),
+    ]
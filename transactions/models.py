@@ -1,3 +1,276 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class BankAccount(models.Model):
+    """A user's bank account that statements are imported into."""
+    ACCOUNT_TYPES = (
+        ('savings', 'Savings'),
+        ('checking', 'Checking'),
+        ('credit_card', 'Credit Card'),
+        ('other', 'Other'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bank_accounts')
+    account_name = models.CharField(max_length=100)
+    account_number = models.CharField(max_length=20, blank=True)
+    bank_name = models.CharField(max_length=100, blank=True)
+    account_type = models.CharField(max_length=20, choices=ACCOUNT_TYPES, default='savings')
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_sync = models.DateTimeField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Bank Account"
+        verbose_name_plural = "Bank Accounts"
+
+    def __str__(self):
+        return f"{self.account_name} ({self.user.email})"
+
+
+class Transaction(models.Model):
+    """A single income or expense line, usually imported from a statement."""
+    TRANSACTION_TYPES = (
+        ('income', 'Income'),
+        ('expense', 'Expense'),
+        ('transfer', 'Transfer'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='transactions')
+    bank_account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='transactions'
+    )
+    transaction_date = models.DateField()
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        help_text="Always positive; the direction is given by transaction_type"
+    )
+    description = models.CharField(max_length=255)
+    category = models.ForeignKey(
+        'dashboard.ExpenseCategory',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='transactions'
+    )
+    transaction_type = models.CharField(max_length=20, choices=TRANSACTION_TYPES)
+    merchant = models.CharField(max_length=255, blank=True)
+    notes = models.TextField(blank=True)
+    fingerprint = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Content hash of imported rows, used to skip re-uploaded lines"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Transaction"
+        verbose_name_plural = "Transactions"
+        indexes = [
+            # id breaks ties so the API's keyset pages on (date, id) are
+            # read straight from the index.
+            models.Index(fields=['user', 'transaction_date', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['fingerprint'], name='unique_transaction_fingerprint'),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_date} {self.description} {self.amount}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded values so a later save can be diffed against
+        # them (used to maintain the monthly rollups).
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class TransactionRecurring(models.Model):
+    """
+    A recurring payment (subscription or bill).
+
+    Entries are added by hand or found by the recurring-payment detector
+    (see ``transactions.recurring``). Detected entries carry the normalised
+    merchant key and amount band they were grouped by, which identify them
+    across runs; hand-made entries leave both empty.
+    """
+    FREQUENCY_CHOICES = (
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('yearly', 'Yearly'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recurring_transactions')
+    name = models.CharField(max_length=100)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    frequency = models.CharField(max_length=20, choices=FREQUENCY_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    category = models.ForeignKey(
+        'dashboard.ExpenseCategory',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='recurring_transactions'
+    )
+    is_active = models.BooleanField(default=True)
+    merchant_key = models.CharField(max_length=255, null=True, blank=True, editable=False)
+    amount_band = models.SmallIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Logarithmic amount bucket, so one merchant can have several recurring amounts"
+    )
+    occurrences = models.PositiveIntegerField(default=0)
+    last_date = models.DateField(null=True, blank=True)
+    next_expected_date = models.DateField(null=True, blank=True)
+    detected_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Recurring Transaction"
+        verbose_name_plural = "Recurring Transactions"
+        constraints = [
+            # NULL keys (hand-made entries) never conflict.
+            models.UniqueConstraint(
+                fields=['user', 'merchant_key', 'amount_band'], name='unique_detected_recurring',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} {self.amount} ({self.frequency})"
+
+
+class RecurringScan(models.Model):
+    """
+    One run of the recurring-payment detector.
+
+    ``last_transaction_id`` is the highest transaction id the run saw; an
+    incremental run only re-examines merchants with transactions after the
+    previous unscoped run's mark. A ``scoped`` run (limited to some users)
+    marks only its users' transactions and is never used as that mark.
+    """
+    incremental = models.BooleanField(default=False)
+    scoped = models.BooleanField(default=False)
+    last_transaction_id = models.BigIntegerField(default=0)
+    users = models.PositiveIntegerField(default=0)
+    transactions = models.PositiveIntegerField(default=0)
+    detected = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Recurring Scan"
+        verbose_name_plural = "Recurring Scans"
+        get_latest_by = 'started_at'
+
+    def __str__(self):
+        return f"{'Incremental' if self.incremental else 'Full'} scan at {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class BankStatement(models.Model):
+    """
+    An uploaded statement file and the state of its background import.
+
+    Progress counters are updated after every chunk with a single UPDATE
+    outside the import's own transactions, so polling never waits on the
+    import.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_PROCESSED = 'processed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_PROCESSED, 'Processed'),
+        (STATUS_FAILED, 'Failed'),
+    )
+    FILE_TYPES = (
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='statements')
+    bank_account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='statements'
+    )
+    file = models.FileField(upload_to='statements/%Y/%m/')
+    file_type = models.CharField(max_length=10, choices=FILE_TYPES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    rows_total = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Estimated number of data rows, used for progress"
+    )
+    rows_read = models.PositiveIntegerField(default=0)
+    rows_imported = models.PositiveIntegerField(default=0)
+    rows_skipped = models.PositiveIntegerField(default=0)
+    rows_duplicate = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Bank Statement"
+        verbose_name_plural = "Bank Statements"
+        ordering = ['-uploaded_at']
+
+    def __str__(self):
+        return f"{self.file.name} ({self.status})"
+
+    @property
+    def progress_percentage(self):
+        if self.status == self.STATUS_PROCESSED:
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(99, int(self.rows_read * 100 / self.rows_total))
+
+
+class TransactionExport(models.Model):
+    """
+    An export too large to build inside a request, generated in the
+    background into ``file`` and downloaded once processed.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_PROCESSED = 'processed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = BankStatement.STATUS_CHOICES
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='exports')
+    file_type = models.CharField(max_length=10, choices=BankStatement.FILE_TYPES)
+    date_from = models.DateField(null=True, blank=True)
+    date_to = models.DateField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    file = models.FileField(upload_to='exports/%Y/%m/', blank=True)
+    rows_total = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Transaction Export"
+        verbose_name_plural = "Transaction Exports"
+        ordering = ['-requested_at']
+
+    def __str__(self):
+        return f"{self.user} {self.file_type} export ({self.status})"
@@ -0,0 +1,219 @@
+"""
+Streaming readers for uploaded bank statements (CSV and XLSX).
+
+Statements are never loaded whole: CSV files are read with chunked
+``pandas.read_csv`` and XLSX files are iterated with openpyxl's read-only
+mode, ``chunk_size`` rows at a time. Each chunk is normalised with
+vectorised pandas operations into a frame with the columns in
+``NORMALISED_COLUMNS``.
+"""
+import re
+from pathlib import Path
+
+import pandas as pd
+
+
+NORMALISED_COLUMNS = ['transaction_date', 'amount', 'transaction_type', 'description', 'merchant']
+
+# Canonical column -> header spellings seen on common bank statements.
+COLUMN_ALIASES = {
+    'date': ('date', 'transaction date', 'txn date', 'tran date', 'value date', 'posting date', 'booking date'),
+    'description': ('description', 'narration', 'particulars', 'details', 'transaction details', 'remarks'),
+    'amount': ('amount', 'transaction amount', 'amt', 'amount (inr)'),
+    'debit': ('debit', 'withdrawal', 'withdrawals', 'withdrawal amt', 'debit amount', 'dr'),
+    'credit': ('credit', 'deposit', 'deposits', 'deposit amt', 'credit amount', 'cr'),
+    'type': ('type', 'dr/cr', 'cr/dr', 'debit/credit', 'transaction type'),
+    'merchant': ('merchant', 'payee', 'beneficiary'),
+}
+
+_ALIAS_LOOKUP = {alias: canonical for canonical, aliases in COLUMN_ALIASES.items() for alias in aliases}
+_HEADER_JUNK_RE = re.compile(r'[.\s]+')
+_WHITESPACE = r'\s+'
+
+
+class StatementFormatError(ValueError):
+    """Raised when a statement file cannot be understood."""
+
+
+def _normalise_header(header):
+    return _HEADER_JUNK_RE.sub(' ', str(header or '')).strip().lower()
+
+
+def resolve_columns(headers):
+    """
+    Map canonical column names to the statement's own headers.
+
+    Requires a date, a description and either an amount column or a pair
+    of debit/credit columns.
+    """
+    columns = {}
+    for header in headers:
+        canonical = _ALIAS_LOOKUP.get(_normalise_header(header))
+        if canonical and canonical not in columns:
+            columns[canonical] = header
+    missing = [name for name in ('date', 'description') if name not in columns]
+    if 'amount' not in columns and not ('debit' in columns or 'credit' in columns):
+        missing.append('amount (or debit/credit)')
+    if missing:
+        raise StatementFormatError(f"Statement is missing required columns: {', '.join(missing)}")
+    return columns
+
+
+def detect_file_type(path):
+    suffix = Path(str(path)).suffix.lower().lstrip('.')
+    if suffix in ('csv', 'txt'):
+        return 'csv'
+    if suffix in ('xlsx', 'xlsm'):
+        return 'xlsx'
+    raise StatementFormatError(f"Unsupported statement file type: '{suffix}'")
+
+
+def iter_csv_chunks(source, chunk_size):
+    """Yield raw DataFrame chunks of a CSV statement."""
+    reader = pd.read_csv(
+        source,
+        chunksize=chunk_size,
+        dtype=str,
+        keep_default_na=False,
+        skipinitialspace=True,
+    )
+    with reader:
+        yield from reader
+
+
+def iter_xlsx_chunks(source, chunk_size):
+    """Yield raw DataFrame chunks of the first sheet of an XLSX statement."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        # Skip any title rows above the header.
+        header = None
+        for row in rows:
+            if sum(cell is not None and str(cell).strip() != '' for cell in row) >= 2:
+                header = [str(cell).strip() if cell is not None else '' for cell in row]
+                break
+        if header is None:
+            return
+        width = len(header)
+        padding = (None,) * width
+        buffer = []
+        for row in rows:
+            # Read-only rows omit trailing empty cells.
+            buffer.append((row + padding)[:width] if len(row) < width else row[:width])
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header)
+    finally:
+        workbook.close()
+
+
+def estimate_row_count(source, file_type):
+    """
+    Cheaply estimate the number of data rows, for progress reporting.
+
+    ``source`` may be a path or a binary file object, which is rewound
+    afterwards. Returns None when the size cannot be known up front.
+    """
+    if file_type == 'xlsx':
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(source, read_only=True)
+        try:
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+            if hasattr(source, 'seek'):
+                source.seek(0)
+        return max(max_row - 1, 0) if max_row else None
+
+    handle = source if hasattr(source, 'read') else open(source, 'rb')
+    try:
+        lines = 0
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            lines += block.count(b'\n')
+    finally:
+        if handle is source:
+            source.seek(0)
+        else:
+            handle.close()
+    return max(lines - 1, 0)
+
+
+def iter_chunks(source, file_type, chunk_size):
+    if file_type == 'csv':
+        return iter_csv_chunks(source, chunk_size)
+    if file_type == 'xlsx':
+        return iter_xlsx_chunks(source, chunk_size)
+    raise StatementFormatError(f"Unsupported statement file type: '{file_type}'")
+
+
+def parse_amounts(series):
+    """
+    Convert amount cells to signed floats.
+
+    Handles currency symbols, thousands separators, ``(123.45)`` and
+    ``123.45 Dr`` style negatives. Unparseable cells become NaN.
+    """
+    text = series.astype(str).str.strip()
+    lowered = text.str.lower()
+    negative = text.str.startswith('-') | text.str.startswith('(') | lowered.str.endswith('dr')
+    values = pd.to_numeric(text.str.replace(r'[^\d.]', '', regex=True), errors='coerce')
+    return values.where(~negative, -values)
+
+
+def parse_dates(series, dayfirst=True):
+    """Convert date cells to timestamps; unparseable cells become NaT."""
+    present = series.notna() & series.astype(str).str.strip().ne('')
+    # ISO dates first (pandas would otherwise read 2026-02-03 day-first),
+    # then one format inferred from the first remaining value, and finally
+    # any stragglers written in yet another format, one by one.
+    parsed = pd.to_datetime(series, format='ISO8601', errors='coerce')
+    for options in ({}, {'format': 'mixed'}):
+        retry = parsed.isna() & present
+        if not retry.any():
+            break
+        parsed[retry] = pd.to_datetime(series[retry], dayfirst=dayfirst, errors='coerce', **options)
+    return parsed
+
+
+def _text(series):
+    return series.fillna('').astype(str).str.strip().str.slice(0, 255)
+
+
+def normalise_chunk(frame, columns, dayfirst=True):
+    """
+    Normalise one raw chunk.
+
+    Returns ``(normalised, skipped)`` where ``normalised`` has the columns in
+    NORMALISED_COLUMNS, positive amounts and an income/expense type, and
+    ``skipped`` counts rows dropped for an invalid date or amount.
+    """
+    dates = parse_dates(frame[columns['date']], dayfirst=dayfirst)
+
+    if 'amount' in columns:
+        amounts = parse_amounts(frame[columns['amount']])
+        if 'type' in columns:
+            debit = frame[columns['type']].astype(str).str.strip().str.lower().str.startswith(('dr', 'debit', 'withdrawal'))
+            amounts = amounts.abs().where(~debit, -amounts.abs())
+    else:
+        credit = parse_amounts(frame[columns['credit']]) if 'credit' in columns else pd.Series(float('nan'), index=frame.index)
+        debit = parse_amounts(frame[columns['debit']]) if 'debit' in columns else pd.Series(float('nan'), index=frame.index)
+        amounts = credit.fillna(0) - debit.abs().fillna(0)
+        amounts[credit.isna() & debit.isna()] = float('nan')
+
+    valid = dates.notna() & amounts.notna() & amounts.ne(0)
+    skipped = int((~valid).sum())
+    amounts = amounts[valid]
+
+    normalised = pd.DataFrame({
+        'transaction_date': dates[valid].dt.date,
+        'amount': amounts.abs().round(2),
+        'transaction_type': amounts.gt(0).map({True: 'income', False: 'expense'}),
+        'description': _text(frame.loc[valid, columns['description']]).str.replace(_WHITESPACE, ' ', regex=True),
+        'merchant': _text(frame.loc[valid, columns['merchant']]) if 'merchant' in columns else '',
+    }, columns=NORMALISED_COLUMNS)
+    return normalised, skipped
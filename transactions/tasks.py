@@ -0,0 +1,72 @@
+"""
+Background execution of statement imports and queued exports.
+
+When a Celery broker is configured jobs run on Celery workers; otherwise
+they run on a small in-process thread pool so the request still returns
+immediately. ``STATEMENT_IMPORT_BACKEND = 'sync'`` runs them inline.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from celery import shared_task
+from django.conf import settings
+from django.db import connection, transaction
+from .exports import process_export
+from .importers import process_statement
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+@shared_task(ignore_result=True)
+def import_statement_task(statement_id):
+    process_statement(statement_id)
+
+
+@shared_task(ignore_result=True)
+def export_transactions_task(export_id):
+    process_export(export_id)
+
+
+def _local_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'STATEMENT_IMPORT_WORKERS', 2),
+                thread_name_prefix='statement-import',
+            )
+        return _executor
+
+
+def _run_in_thread(job, object_id):
+    try:
+        job(object_id)
+    finally:
+        # Each worker thread has its own connection; don't leak it.
+        connection.close()
+
+
+def _enqueue(task, job, object_id):
+    """Run ``job(object_id)`` (``task`` on Celery) once the current transaction commits."""
+    backend = getattr(settings, 'STATEMENT_IMPORT_BACKEND', 'thread')
+
+    def dispatch():
+        if backend == 'celery':
+            task.delay(object_id)
+        elif backend == 'thread':
+            _local_executor().submit(_run_in_thread, job, object_id)
+        else:
+            job(object_id)
+
+    transaction.on_commit(dispatch)
+
+
+def enqueue_statement_import(statement):
+    """Schedule the import of ``statement`` once its row is committed."""
+    _enqueue(import_statement_task, process_statement, statement.pk)
+
+
+def enqueue_export(export):
+    """Schedule the TransactionExport ``export`` once its row is committed."""
+    _enqueue(export_transactions_task, process_export, export.pk)
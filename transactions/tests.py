@@ -1,3 +1,563 @@
-from django.test import TestCase
+import csv
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+import openpyxl
+import pandas as pd
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from agents.models import AnomalyBaseline
+from dashboard.models import CategoryRule, ExpenseCategory, MonthlyBudget
+from transactions.categoriser import Categoriser, clear_categorisers, get_categoriser, trie_pattern
+from transactions.fingerprints import compute_fingerprints
+from transactions.importers import StatementImporter, process_statement
+from transactions.models import (
+    BankAccount, BankStatement, RecurringScan, Transaction, TransactionExport, TransactionRecurring,
+)
+from transactions.parsers import (
+    StatementFormatError, iter_chunks, normalise_chunk, parse_amounts, resolve_columns,
+)
+from transactions.recurring import detect_frame
 
-# Create your tests here.
+User = get_user_model()
+
+CSV_STATEMENT = """Txn Date,Narration,Withdrawal Amt.,Deposit Amt.,Closing Balance
+01/02/2026,UPI/SWIGGY/PAYMENT,"1,250.50",,98749.50
+02/02/2026,NEFT CR SALARY,,50000.00,148749.50
+2026-02-03,  AMAZON   PAY ,(300.00),,148449.50
+not a date,BROKEN ROW,10.00,,148439.50
+05/02/2026,ZERO ROW,,,148439.50
+"""
+
+
+class ParserTests(SimpleTestCase):
+    def test_resolve_columns_aliases(self):
+        """Test bank-specific headers map to canonical columns."""
+        columns = resolve_columns(['Txn Date', 'Narration', 'Withdrawal Amt.', 'Deposit Amt.'])
+        self.assertEqual(columns, {
+            'date': 'Txn Date', 'description': 'Narration',
+            'debit': 'Withdrawal Amt.', 'credit': 'Deposit Amt.',
+        })
+
+    def test_resolve_columns_missing(self):
+        """Test a statement without an amount column is rejected."""
+        with self.assertRaises(StatementFormatError):
+            resolve_columns(['Date', 'Description', 'Balance'])
+
+    def test_parse_amounts(self):
+        """Test currency symbols, separators and negative notations."""
+        values = parse_amounts(pd.Series(['₹1,234.50', '(20.00)', '-5', '300 Dr', 'abc', '']))
+        self.assertEqual(values[:4].tolist(), [1234.5, -20.0, -5.0, -300.0])
+        self.assertTrue(values[4:].isna().all())
+
+    def test_signed_amount_with_type_column(self):
+        """Test a DR/CR column sets the direction of an unsigned amount."""
+        frame = pd.DataFrame({
+            'Date': ['2026-01-01', '2026-01-02'],
+            'Description': ['Rent', 'Refund'],
+            'Amount': ['15000', '200'],
+            'Dr/Cr': ['DR', 'CR'],
+        })
+        normalised, skipped = normalise_chunk(frame, resolve_columns(frame.columns))
+        self.assertEqual(skipped, 0)
+        self.assertEqual(normalised['transaction_type'].tolist(), ['expense', 'income'])
+
+
+class StatementImporterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.account = BankAccount.objects.create(user=self.user, account_name='Savings')
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_csv(self, content=CSV_STATEMENT):
+        path = os.path.join(self.tmpdir.name, 'statement.csv')
+        with open(path, 'w') as handle:
+            handle.write(content)
+        return path
+
+    def test_csv_import_in_chunks(self):
+        """Test CSV rows are normalised and written across several chunks."""
+        importer = StatementImporter(self.user, self.account, chunk_size=2, batch_size=1)
+        stats = importer.import_file(self.write_csv())
+        self.assertEqual((stats.rows_read, stats.rows_imported, stats.rows_skipped), (5, 3, 2))
+        rows = list(Transaction.objects.order_by('transaction_date').values_list(
+            'transaction_date', 'amount', 'transaction_type', 'description'))
+        self.assertEqual(rows, [
+            (date(2026, 2, 1), Decimal('1250.50'), 'expense', 'UPI/SWIGGY/PAYMENT'),
+            (date(2026, 2, 2), Decimal('50000.00'), 'income', 'NEFT CR SALARY'),
+            (date(2026, 2, 3), Decimal('300.00'), 'expense', 'AMAZON PAY'),
+        ])
+        self.account.refresh_from_db()
+        self.assertIsNotNone(self.account.last_sync)
+
+    def test_xlsx_import_read_only(self):
+        """Test XLSX statements with a title row and native cell types."""
+        path = os.path.join(self.tmpdir.name, 'statement.xlsx')
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(['HDFC Bank statement'])
+        sheet.append(['Date', 'Particulars', 'Debit', 'Credit'])
+        sheet.append([date(2026, 3, 1), 'RENT', 15000, None])
+        sheet.append([date(2026, 3, 2), 'INTEREST', None, 12.5])
+        workbook.save(path)
+
+        stats = StatementImporter(self.user, chunk_size=1).import_file(path)
+        self.assertEqual(stats.rows_imported, 2)
+        self.assertEqual(
+            sorted(Transaction.objects.values_list('description', 'amount', 'transaction_type')),
+            [('INTEREST', Decimal('12.50'), 'income'), ('RENT', Decimal('15000.00'), 'expense')],
+        )
+
+    def test_import_statement_command(self):
+        """Test the management command reports throughput."""
+        out = StringIO()
+        call_command('import_statement', self.write_csv(), user='TEST@example.com',
+                     account=self.account.pk, stdout=out)
+        self.assertIn('Imported 3 of 5 rows (2 skipped, 0 already imported)', out.getvalue())
+        self.assertIn('rows/sec', out.getvalue())
+
+    def test_import_statement_command_bad_file(self):
+        """Test unreadable statements surface as CommandError."""
+        path = self.write_csv('Foo,Bar\n1,2\n')
+        with self.assertRaises(CommandError):
+            call_command('import_statement', path, user='test@example.com', stdout=StringIO())
+
+
+class DeduplicationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.account = BankAccount.objects.create(user=self.user, account_name='Savings')
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_csv(self, name, lines):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as handle:
+            handle.write('Date,Description,Amount\n' + '\n'.join(lines) + '\n')
+        return path
+
+    def test_identical_lines_in_one_statement_are_kept(self):
+        """Test two identical same-day lines get distinct fingerprints."""
+        frame = pd.DataFrame({
+            'transaction_date': [date(2026, 1, 1)] * 2,
+            'amount': [120.0, 120.0],
+            'transaction_type': ['expense'] * 2,
+            'description': ['STARBUCKS', 'starbucks '],
+        })
+        fingerprints, counts = compute_fingerprints(frame, self.user.pk, self.account.pk)
+        self.assertEqual(fingerprints.nunique(), 2)
+        # A later chunk continues the occurrence count.
+        more, _ = compute_fingerprints(frame.iloc[:1], self.user.pk, self.account.pk, carried_counts=counts)
+        self.assertNotIn(more.iloc[0], set(fingerprints))
+
+    def test_overlapping_statement_reimport(self):
+        """Test re-uploading overlapping statements only adds new lines."""
+        january = self.write_csv('jan.csv', [
+            '2026-01-10,COFFEE,-120', '2026-01-10,COFFEE,-120', '2026-01-20,RENT,-15000',
+        ])
+        overlap = self.write_csv('overlap.csv', [
+            '2026-01-10,COFFEE,-120', '2026-01-10,COFFEE,-120', '2026-01-20,RENT,-15000',
+            '2026-02-01,SALARY,50000',
+        ])
+        importer = StatementImporter(self.user, self.account, chunk_size=2, batch_size=1)
+        first = importer.import_file(january)
+        second = importer.import_file(overlap)
+        again = importer.import_file(overlap)
+        self.assertEqual((first.rows_imported, first.rows_duplicate), (3, 0))
+        self.assertEqual((second.rows_imported, second.rows_duplicate), (1, 3))
+        self.assertEqual((again.rows_imported, again.rows_duplicate), (0, 4))
+        self.assertEqual(Transaction.objects.count(), 4)
+
+    def test_other_accounts_are_not_duplicates(self):
+        """Test the same line in another account is imported."""
+        path = self.write_csv('jan.csv', ['2026-01-10,COFFEE,-120'])
+        other = BankAccount.objects.create(user=self.user, account_name='Card')
+        StatementImporter(self.user, self.account).import_file(path)
+        stats = StatementImporter(self.user, other).import_file(path)
+        self.assertEqual(stats.rows_imported, 1)
+
+
+    def test_chunk_lost_to_concurrent_import_is_not_counted(self):
+        """Test rows skipped on conflict are left out of counts, rollups and baselines."""
+        path = self.write_csv('jan.csv', ['2026-01-10,COFFEE,-120', '2026-01-20,RENT,-15000'])
+        importer = StatementImporter(self.user, self.account)
+        importer.categoriser = get_categoriser(self.user.pk)
+        chunk = next(iter_chunks(path, 'csv', 100))
+        normalised, _ = normalise_chunk(chunk, resolve_columns(chunk.columns))
+        normalised['fingerprint'], _ = compute_fingerprints(normalised, self.user.pk, self.account.pk)
+        self.assertEqual(importer.write_chunk(normalised.copy())[0], 2)
+        # A concurrent import would not have seen the first one's rows.
+        importer.existing_fingerprints = lambda fingerprints: set()
+        self.assertEqual(importer.write_chunk(normalised.copy())[0], 0)
+        self.assertEqual(Transaction.objects.count(), 2)
+        rollup = MonthlyBudget.objects.get(user=self.user, month=date(2026, 1, 1))
+        self.assertEqual((rollup.spent_amount, rollup.transaction_count), (Decimal('15120.00'), 2))
+        self.assertEqual(AnomalyBaseline.objects.get(scope='category').count, 2)
+
+
+class BackgroundImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.account = BankAccount.objects.create(user=self.user, account_name='Savings')
+        self.client.login(username='test@example.com', password='testpass123')
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media = override_settings(MEDIA_ROOT=media.name)
+        self.media.enable()
+        self.addCleanup(self.media.disable)
+
+    def upload(self, content=CSV_STATEMENT, name='statement.csv'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/transactions/statements/upload/', data={
+                'file': SimpleUploadedFile(name, content.encode()),
+                'bank_account': self.account.pk,
+            })
+
+    @override_settings(STATEMENT_IMPORT_BACKEND='sync')
+    def test_upload_enqueues_and_reports_progress(self):
+        """Test an upload is imported and its status can be polled."""
+        response = self.upload()
+        statement = BankStatement.objects.get()
+        self.assertRedirects(response, f'/transactions/statements/{statement.pk}/')
+        self.assertContains(self.client.get(f'/transactions/statements/{statement.pk}/'), 'Processed')
+        status = self.client.get(f'/transactions/statements/{statement.pk}/status/').json()
+        self.assertEqual(status['status'], 'processed')
+        self.assertEqual(status['progress'], 100)
+        self.assertEqual((status['rows_total'], status['rows_read'], status['rows_imported']), (5, 5, 3))
+        self.assertEqual(Transaction.objects.filter(bank_account=self.account).count(), 3)
+
+    @override_settings(STATEMENT_IMPORT_BACKEND='celery')
+    def test_celery_backend_runs_eagerly_without_broker(self):
+        """Test the Celery task path works offline via eager execution."""
+        self.upload()
+        self.assertEqual(BankStatement.objects.get().status, BankStatement.STATUS_PROCESSED)
+
+    @override_settings(STATEMENT_IMPORT_BACKEND='sync')
+    def test_bad_statement_is_marked_failed(self):
+        """Test an unreadable statement records the error."""
+        self.upload('Foo,Bar\n1,2\n')
+        statement = BankStatement.objects.get()
+        self.assertEqual(statement.status, BankStatement.STATUS_FAILED)
+        self.assertIn('missing required columns', statement.error_message)
+
+    def test_unsupported_file_type_rejected(self):
+        """Test the form only accepts CSV and XLSX files."""
+        response = self.upload(name='statement.pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(BankStatement.objects.exists())
+
+    @override_settings(STATEMENT_IMPORT_BACKEND='sync')
+    def test_process_statement_is_idempotent(self):
+        """Test a duplicated job does not import twice."""
+        self.upload()
+        statement = BankStatement.objects.get()
+        self.assertIsNone(process_statement(statement.pk))
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_status_of_other_users_statement(self):
+        """Test users cannot poll someone else's statement."""
+        other = User.objects.create_user(email='other@example.com', password='x')
+        statement = BankStatement.objects.create(user=other, file='x.csv', file_type='csv')
+        response = self.client.get(f'/transactions/statements/{statement.pk}/status/')
+        self.assertEqual(response.status_code, 404)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        """Create a user with a few transactions and log in."""
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123', onboarding_completed=True)
+        self.client.force_login(self.user)
+        for day, description, amount in (
+            (date(2026, 1, 5), 'Rent, January', Decimal('15000.00')),
+            (date(2026, 2, 1), 'Coffee "large"', Decimal('4.50')),
+            (date(2026, 3, 9), 'Books', Decimal('120.00')),
+        ):
+            Transaction.objects.create(
+                user=self.user, transaction_date=day, description=description, amount=amount,
+                transaction_type='expense',
+            )
+        other = User.objects.create_user(email='other@example.com', password='x')
+        Transaction.objects.create(
+            user=other, transaction_date=date(2026, 1, 1), description='Not mine', amount=1, transaction_type='expense',
+        )
+
+    def test_csv_is_streamed(self):
+        """Test the CSV export streams the user's rows in date order, quoted."""
+        response = self.client.get('/transactions/export/')
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:2], ['Date', 'Description'])
+        self.assertEqual([row[1] for row in rows[1:]], ['Rent, January', 'Coffee "large"', 'Books'])
+        self.assertIn('attachment', response['Content-Disposition'])
+
+    def test_xlsx_with_date_range(self):
+        """Test the XLSX export honours from/to."""
+        response = self.client.get('/transactions/export/?format=xlsx&from=2026-02-01&to=2026-03-31')
+        workbook = openpyxl.load_workbook(BytesIO(b''.join(response.streaming_content)), read_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual([row[1] for row in rows[1:]], ['Coffee "large"', 'Books'])
+        self.assertEqual(rows[2][5], 120)
+
+    def test_bad_parameters(self):
+        """Test unknown formats and malformed dates are rejected."""
+        self.assertEqual(self.client.get('/transactions/export/?format=pdf').status_code, 400)
+        self.assertEqual(self.client.get('/transactions/export/?from=2026-13-01').status_code, 400)
+        self.assertEqual(self.client.get('/transactions/export/?from=garbage').status_code, 400)
+        self.assertEqual(self.client.get('/transactions/export/?to=01/02/2026').status_code, 400)
+
+    @override_settings(EXPORT_XLSX_INLINE_ROWS=2, STATEMENT_IMPORT_BACKEND='sync')
+    def test_large_xlsx_is_queued(self):
+        """Test an XLSX export over the inline limit is generated in the background and downloaded."""
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        with override_settings(MEDIA_ROOT=media.name), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get('/transactions/export/?format=xlsx')
+        export = TransactionExport.objects.get()
+        self.assertRedirects(response, f'/transactions/exports/{export.pk}/')
+        status = self.client.get(f'/transactions/exports/{export.pk}/status/').json()
+        self.assertEqual((status['status'], status['rows_total']), ('processed', 3))
+        with override_settings(MEDIA_ROOT=media.name):
+            self.assertContains(self.client.get(f'/transactions/exports/{export.pk}/'), 'Download')
+            response = self.client.get(f'/transactions/exports/{export.pk}/download/')
+            workbook = openpyxl.load_workbook(BytesIO(b''.join(response.streaming_content)), read_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual([row[1] for row in rows[1:]], ['Rent, January', 'Coffee "large"', 'Books'])
+
+        other = User.objects.get(email='other@example.com')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(f'/transactions/exports/{export.pk}/download/').status_code, 404)
+
+    def test_command(self):
+        """Test export_transactions writes the file and reports the count."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'history.csv')
+            out = StringIO()
+            call_command('export_transactions', path, user='TEST@example.com', stdout=out)
+            with open(path, newline='') as handle:
+                self.assertEqual(len(list(csv.reader(handle))), 4)
+        self.assertIn('Exported 3 transactions', out.getvalue())
+
+
+class DetectRecurringFrameTests(SimpleTestCase):
+    def frame(self, rows):
+        return pd.DataFrame.from_records(rows, columns=['user_id', 'transaction_date', 'amount', 'merchant', 'category_id'])
+
+    def test_periods_and_bands(self):
+        """Test weekly, monthly and yearly payments are found and noise is not."""
+        rows = []
+        for i in range(6):
+            rows.append((1, date(2026, 1 + i, 15 + (i % 2)), 499.0, 'netflix', 3))      # monthly, +-1 day
+            rows.append((1, date(2026, 1 + i, 3), 1000.0 + 40 * i, 'bescom', None))     # drifting bill
+            rows.append((1, date(2026, 1, 5) + timedelta(days=7 * i), 200.0, 'gym', None))
+            rows.append((1, date(2026, 1, 1) + timedelta(days=i * i * 5), 80.0 + 17 * i, 'swiggy', None))
+            rows.append((2, date(2026, 1 + i, 20), 119.0, 'spotify', None))
+            rows.append((2, date(2026, 1 + i, 20), 119.0, 'spotify', None))            # same-day duplicate
+        for day in (date(2023, 5, 28), date(2024, 6, 1), date(2025, 6, 3)):               # second plan, yearly
+            rows.append((2, day, 1189.0, 'spotify', None))
+        found = detect_frame(self.frame(rows), as_of=date(2026, 6, 25))
+        summary = sorted(zip(found['user_id'], found['merchant'], found['frequency'], found['occurrences'], found['is_active']))
+        self.assertEqual(summary, [
+            (1, 'bescom', 'monthly', 6, True),
+            (1, 'gym', 'weekly', 6, False),
+            (1, 'netflix', 'monthly', 6, True),
+            (2, 'spotify', 'monthly', 6, True),
+            (2, 'spotify', 'yearly', 3, False),
+        ])
+        netflix = found[found['merchant'] == 'netflix'].iloc[0]
+        self.assertEqual((netflix['amount'], netflix['category_id']), (499.0, 3))
+        self.assertEqual(netflix['start_date'], date(2026, 1, 15))
+        self.assertEqual(netflix['next_expected_date'], date(2026, 7, 18))  # last + median gap
+
+    def test_too_few_payments(self):
+        """Test two monthly payments are not yet a subscription."""
+        rows = [(1, date(2026, 1, 1), 99.0, 'icloud', None), (1, date(2026, 2, 1), 99.0, 'icloud', None)]
+        self.assertTrue(detect_frame(self.frame(rows), as_of=date(2026, 2, 10)).empty)
+
+
+class DetectRecurringTests(TestCase):
+    def setUp(self):
+        """Create a user paying Netflix monthly and groceries irregularly."""
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.today = timezone.localdate()
+        self.pay('NETFLIX', 649, [self.today - timedelta(days=30 * i) for i in range(5)])
+        self.pay('BIGBASKET', 1234, [self.today - timedelta(days=d) for d in (1, 4, 19, 23, 60)])
+        self.manual = TransactionRecurring.objects.create(
+            user=self.user, name='Rent', amount=15000, frequency='monthly', start_date=date(2025, 1, 1),
+        )
+
+    def pay(self, merchant, amount, days, user=None):
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=user or self.user, transaction_date=day, amount=amount, description=f'UPI/{merchant}/{i}',
+                merchant=merchant, transaction_type='expense',
+            )
+            for i, day in enumerate(days)
+        ])
+
+    def detected(self):
+        return sorted(
+            TransactionRecurring.objects.filter(merchant_key__isnull=False)
+            .values_list('merchant_key', 'frequency', 'occurrences', 'is_active')
+        )
+
+    def test_full_and_incremental_scans(self):
+        """Test a full scan upserts, and an incremental one only adds what changed."""
+        out = StringIO()
+        call_command('detect_recurring', stdout=out)
+        call_command('detect_recurring', stdout=out)
+        self.assertEqual(self.detected(), [('netflix', 'monthly', 5, True)])
+        self.assertIn('1 recurring payments', out.getvalue())
+
+        self.pay('GYM', 999, [self.today - timedelta(days=7 * i) for i in range(6)])
+        call_command('detect_recurring', incremental=True, stdout=out)
+        scan = RecurringScan.objects.latest()
+        self.assertTrue(scan.incremental)
+        self.assertEqual(scan.detected, 1)
+        self.assertEqual(self.detected(), [('gym', 'weekly', 6, True), ('netflix', 'monthly', 5, True)])
+        self.assertTrue(TransactionRecurring.objects.get(pk=self.manual.pk).is_active)
+
+    def test_scoped_scan_does_not_hide_other_users(self):
+        """Test an incremental scan after a --user scan still sees other users' new expenses."""
+        call_command('detect_recurring', stdout=StringIO())
+        other = User.objects.create_user(email='other@example.com', password='x')
+        self.pay('GYM', 999, [self.today - timedelta(days=7 * i) for i in range(6)], user=other)
+        call_command('detect_recurring', user='test@example.com', stdout=StringIO())
+        scoped = RecurringScan.objects.latest()
+        self.assertTrue(scoped.scoped)
+        self.assertLess(scoped.last_transaction_id, Transaction.objects.filter(user=other).order_by('pk').first().pk)
+
+        call_command('detect_recurring', incremental=True, stdout=StringIO())
+        self.assertEqual(
+            TransactionRecurring.objects.get(user=other, merchant_key='gym').frequency, 'weekly',
+        )
+
+    def test_full_scan_deactivates_missing(self):
+        """Test a detected payment that is no longer found is deactivated."""
+        call_command('detect_recurring', stdout=StringIO())
+        Transaction.objects.filter(merchant='NETFLIX').delete()
+        call_command('detect_recurring', stdout=StringIO())
+        self.assertEqual(self.detected(), [('netflix', 'monthly', 5, False)])
+        self.assertTrue(TransactionRecurring.objects.get(pk=self.manual.pk).is_active)
+
+
+class CategoriserTests(SimpleTestCase):
+    def test_trie_pattern(self):
+        """Test keywords compile into one trie-shaped alternation."""
+        self.assertEqual(trie_pattern(['swiggy', 'swiggy instamart', 'swift']), r'swi(?:ft|ggy(?:\ instamart)?)')
+
+    def test_best_ranked_whole_word_match(self):
+        """Test whole-word matching and that the best-ranked rule wins."""
+        categoriser = Categoriser([
+            ('Swiggy', 1, (1, 0, -6)),
+            ('swiggy instamart', 2, (1, 0, -16)),
+            ('ola', 3, (1, 0, -3)),
+            ('rent', 4, (0, 0, -4)),
+        ])
+        self.assertEqual(categoriser.classify_many([
+            'upi swiggy order', 'swiggy instamart', 'coca cola', 'upi ola cabs', 'swiggy rent', 'salary',
+        ]), [1, 2, None, 3, 4, None])
+
+    def test_user_rule_inside_longer_default_wins(self):
+        """Test a user's keyword still wins where a longer default keyword overlaps it."""
+        categoriser = Categoriser([
+            ('uber eats', 1, (1, 0, -9)),
+            ('uber', 2, (0, 0, -4)),
+            ('electricity bill', 3, (1, 0, -16)),
+            ('bill', 4, (0, 0, -4)),
+        ])
+        self.assertEqual(
+            categoriser.classify_many(['upi uber eats order', 'electricity bill jan', 'uber eats']), [2, 4, 2],
+        )
+        self.assertEqual(Categoriser([('uber eats', 1, (1, 0, -9))]).classify('uber ride'), None)
+
+    def test_frame_and_cache_stats(self):
+        """Test frames are normalised, classified once per text and counted."""
+        categoriser = Categoriser([('netflix', 7, (1, 0, -7))])
+        frame = pd.DataFrame({
+            'merchant': ['', '', 'Netflix.com'],
+            'description': ['NETFLIX/8812', 'NETFLIX/9921', 'card 4421'],
+        })
+        self.assertEqual(categoriser.categorise_frame(frame).tolist(), [7.0, 7.0, 7.0])
+        stats = categoriser.cache_stats()
+        self.assertEqual((stats['misses'], stats['hits']), (2, 0))
+        categoriser.classify('netflix')
+        self.assertEqual(categoriser.cache_stats()['hits'], 1)
+
+
+class CategoriseImportTests(TestCase):
+    def setUp(self):
+        """Create default and personal rules."""
+        clear_categorisers()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.food = ExpenseCategory.objects.create(name='Food')
+        self.shopping = ExpenseCategory.objects.create(name='Shopping')
+        CategoryRule.objects.create(keyword='swiggy', category=self.food)
+        CategoryRule.objects.create(keyword='amazon', category=self.food)
+        CategoryRule.objects.create(keyword='amazon pay', category=self.shopping, user=self.user)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_import_categorises_rows_and_rollups(self):
+        """Test imported rows get categories and the rollup is split by them."""
+        path = os.path.join(self.tmpdir.name, 'statement.csv')
+        with open(path, 'w') as handle:
+            handle.write(CSV_STATEMENT)
+        stats = StatementImporter(self.user, chunk_size=2).import_file(path)
+        self.assertEqual(stats.rows_categorised, 2)
+        self.assertEqual(
+            dict(Transaction.objects.values_list('description', 'category__name')),
+            {'UPI/SWIGGY/PAYMENT': 'Food', 'NEFT CR SALARY': None, 'AMAZON PAY': 'Shopping'},
+        )
+        self.assertEqual(
+            MonthlyBudget.objects.get(user=self.user, category=self.food).spent_amount, Decimal('1250.50'),
+        )
+
+    def test_rule_changes_recompile(self):
+        """Test editing a rule gives a freshly compiled categoriser."""
+        first = get_categoriser(self.user.pk)
+        self.assertIs(get_categoriser(self.user.pk), first)
+        CategoryRule.objects.filter(keyword='swiggy').update(keyword='zomato', updated_at=timezone.now())
+        second = get_categoriser(self.user.pk)
+        self.assertIsNot(second, first)
+        self.assertIsNone(second.classify('swiggy'))
+
+    def test_command_categorises_existing(self):
+        """Test the command fills in uncategorised rows and rebuilds rollups."""
+        for description in ('SWIGGY 1', 'SWIGGY 2', 'RENT'):
+            Transaction.objects.create(
+                user=self.user, transaction_date=date(2026, 1, 1), amount=100, description=description,
+                transaction_type='expense',
+            )
+        out = StringIO()
+        call_command('categorise_transactions', stdout=out)
+        self.assertIn('Categorised 2 of 3 uncategorised transactions', out.getvalue())
+        self.assertEqual(MonthlyBudget.objects.get(user=self.user, category=self.food).transaction_count, 2)
+        self.assertEqual(MonthlyBudget.objects.get(user=self.user, category=None).transaction_count, 1)
+
+    def test_command_skips_users_with_nothing_to_categorise(self):
+        """Test batches of users are categorised and users with nothing uncategorised are left alone."""
+        done = User.objects.create_user(email='done@example.com', password='x')
+        last = User.objects.create_user(email='last@example.com', password='x')
+        for user, category in ((self.user, None), (done, self.shopping), (last, None)):
+            Transaction.objects.create(
+                user=user, transaction_date=date(2026, 1, 1), amount=100, description='SWIGGY',
+                transaction_type='expense', category=category,
+            )
+        # A stale rollup that only a rebuild would correct.
+        MonthlyBudget.objects.filter(user=done).update(transaction_count=99)
+        out = StringIO()
+        call_command('categorise_transactions', batch_size=2, stdout=out)
+        self.assertIn('Categorised 2 of 2 uncategorised transactions', out.getvalue())
+        self.assertEqual(
+            set(Transaction.objects.values_list('user__email', 'category__name')),
+            {('test@example.com', 'Food'), ('done@example.com', 'Shopping'), ('last@example.com', 'Food')},
+        )
+        self.assertEqual(MonthlyBudget.objects.get(user=last, category=self.food).transaction_count, 1)
+        self.assertEqual(MonthlyBudget.objects.get(user=done).transaction_count, 99)
@@ -0,0 +1,14 @@
+from django.urls import path
+from . import views
+
+app_name = 'transactions'
+
+urlpatterns = [
+    path('statements/upload/', views.upload_statement, name='upload_statement'),
+    path('statements/<int:pk>/', views.statement_detail, name='statement_detail'),
+    path('statements/<int:pk>/status/', views.statement_status, name='statement_status'),
+    path('export/', views.export_transactions, name='export'),
+    path('exports/<int:pk>/', views.export_detail, name='export_detail'),
+    path('exports/<int:pk>/status/', views.export_status, name='export_status'),
+    path('exports/<int:pk>/download/', views.download_export, name='download_export'),
+]
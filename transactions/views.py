@@ -1,3 +1,128 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, HttpResponseBadRequest, JsonResponse, Http404, StreamingHttpResponse
+from django.views.decorators.http import require_http_methods, require_GET
+from .exports import CONTENT_TYPES, export_queryset, iter_csv, iter_rows, parse_export_date, xlsx_file
+from .forms import StatementUploadForm
+from .models import BankStatement, TransactionExport
+from .tasks import enqueue_export, enqueue_statement_import
 
-# Create your views here.
+
+@login_required(login_url='accounts:login')
+@require_http_methods(['GET', 'POST'])
+def upload_statement(request):
+	"""Accept a statement upload and queue it for background import."""
+	if request.method == 'POST':
+		form = StatementUploadForm(request.POST, request.FILES, user=request.user)
+		if form.is_valid():
+			statement = form.save(commit=False)
+			statement.user = request.user
+			statement.save()
+			enqueue_statement_import(statement)
+			messages.success(request, 'Statement uploaded. We are importing it in the background.')
+			return redirect('transactions:statement_detail', pk=statement.pk)
+	else:
+		form = StatementUploadForm(user=request.user)
+	return render(request, 'transactions/upload.html', {'form': form})
+
+
+@login_required(login_url='accounts:login')
+@require_GET
+def statement_detail(request, pk):
+	"""Show an uploaded statement; the page polls statement_status."""
+	statement = get_object_or_404(BankStatement, pk=pk, user=request.user)
+	return render(request, 'transactions/statement.html', {'statement': statement})
+
+
+@login_required(login_url='accounts:login')
+@require_GET
+def statement_status(request, pk):
+	"""
+	Return import progress as JSON.
+
+	Reads only the counter columns of the statement row; the import commits
+	per chunk, so this never waits on it.
+	"""
+	status = (
+		BankStatement.objects
+		.filter(pk=pk, user=request.user)
+		.values('status', 'rows_total', 'rows_read', 'rows_imported', 'rows_skipped',
+				'rows_duplicate', 'error_message', 'processed_at')
+		.first()
+	)
+	if status is None:
+		raise Http404('No such statement')
+	status['progress'] = BankStatement(status=status['status'], rows_total=status['rows_total'],
+										rows_read=status['rows_read']).progress_percentage
+	return JsonResponse(status)
+
+
+@login_required(login_url='accounts:login')
+@require_GET
+def export_transactions(request):
+	"""
+	Download the user's transactions as CSV (streamed) or XLSX.
+
+	Optional ``from``/``to`` ISO dates limit the range; ``format`` is csv
+	(default) or xlsx. An XLSX export of more than EXPORT_XLSX_INLINE_ROWS
+	rows is queued instead, redirecting to a page that links the file once
+	it is ready.
+	"""
+	file_type = request.GET.get('format', 'csv')
+	if file_type not in CONTENT_TYPES:
+		return HttpResponseBadRequest('format must be csv or xlsx')
+	try:
+		date_from, date_to = (parse_export_date(request.GET.get(param, '')) for param in ('from', 'to'))
+	except ValueError:
+		return HttpResponseBadRequest('from/to must be ISO dates (YYYY-MM-DD)')
+
+	queryset = export_queryset(request.user, date_from, date_to)
+	filename = f'transactions.{file_type}'
+	if file_type == 'xlsx':
+		if queryset.count() > getattr(settings, 'EXPORT_XLSX_INLINE_ROWS', 20_000):
+			export = TransactionExport.objects.create(
+				user=request.user, file_type=file_type, date_from=date_from, date_to=date_to,
+			)
+			enqueue_export(export)
+			return redirect('transactions:export_detail', pk=export.pk)
+		return FileResponse(xlsx_file(iter_rows(queryset)), as_attachment=True, filename=filename,
+							content_type=CONTENT_TYPES['xlsx'])
+	response = StreamingHttpResponse(iter_csv(iter_rows(queryset)), content_type=CONTENT_TYPES['csv'])
+	response['Content-Disposition'] = f'attachment; filename="{filename}"'
+	return response
+
+
+@login_required(login_url='accounts:login')
+@require_GET
+def export_detail(request, pk):
+	"""Show a queued export; the page polls export_status until it can be downloaded."""
+	export = get_object_or_404(TransactionExport, pk=pk, user=request.user)
+	return render(request, 'transactions/export.html', {'export': export})
+
+
+@login_required(login_url='accounts:login')
+@require_GET
+def export_status(request, pk):
+	"""Return a queued export's status as JSON."""
+	status = (
+		TransactionExport.objects
+		.filter(pk=pk, user=request.user)
+		.values('status', 'rows_total', 'error_message', 'processed_at')
+		.first()
+	)
+	if status is None:
+		raise Http404('No such export')
+	return JsonResponse(status)
+
+
+@login_required(login_url='accounts:login')
+@require_GET
+def download_export(request, pk):
+	"""Send the file of a processed export."""
+	export = get_object_or_404(
+		TransactionExport, pk=pk, user=request.user, status=TransactionExport.STATUS_PROCESSED,
+	)
+	return FileResponse(export.file.open('rb'), as_attachment=True, filename=f'transactions.{export.file_type}',
+						content_type=CONTENT_TYPES[export.file_type])